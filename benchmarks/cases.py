@@ -0,0 +1,272 @@
+'''Benchmark cases for items, blocks and highlevel functions.
+
+Each case is setup function taking size of data, kind of values and
+depth of nesting. It returns function whose call gets measured. Setup
+runs again before each measured call so that indexes and caches built
+by previous call do not affect results(unless case is 'warm').'''
+import collections
+
+import pemap
+
+
+# Kinds of values items can have.
+value_kinds = ("int", "str", "callable")
+# Levels of nested blocks used by flattening cases.
+nesting_depths = (1, 2, 4)
+# Number of distinct values, keeps queries returning few items.
+_distinct_values = 1000
+
+Case = collections.namedtuple("Case",
+    ["name", "group", "setup", "kinds", "depths", "warm"])
+
+cases = []
+
+
+def case(group, kinds=value_kinds, depths=(None,), warm=False):
+    '''Registers setup function as benchmark case of group'''
+    def register(setup):
+        cases.append(Case(setup.__name__, group, setup, kinds, depths,
+            warm))
+        return setup
+    return register
+
+
+def make_value(position, kind):
+    # Returns value of kind for item at position.
+    number = position % _distinct_values
+    if kind == "int":
+        return number
+    elif kind == "str":
+        return str(number)
+    return lambda: number
+
+def make_query_value(kind):
+    # Returns value matching items of kind, used by queries.
+    # Callable values are matched by their return values.
+    if kind == "callable":
+        kind = "int"
+    return make_value(_distinct_values // 2, kind)
+
+def make_objects(size):
+    return ["object-{}".format(position) for position in range(size)]
+
+def make_values(size, kind):
+    return [make_value(position, kind) for position in range(size)]
+
+def make_items(size, kind):
+    return [pemap.Item(_object, _value) for _object, _value
+        in zip(make_objects(size), make_values(size, kind))]
+
+def make_block(size, kind, **kwargs):
+    return pemap.Block(make_items(size, kind), **kwargs)
+
+def make_nested_items(size, kind, depth):
+    # Returns items containing blocks nested to depth.
+    # Items at lowest level total to size.
+    items = make_items(size, kind)
+    for _ in range(depth):
+        # Each level groups items into blocks of 10 items.
+        items = [pemap.Item("block", pemap.Block(items[start:start + 10]))
+            for start in range(0, len(items), 10)]
+    return items
+
+
+# Construction of items and blocks.
+
+@case("construction")
+def create_items(size, kind, depth):
+    objects, values = make_objects(size), make_values(size, kind)
+    return lambda: [pemap.Item(_object, _value) for _object, _value
+        in zip(objects, values)]
+
+@case("construction")
+def create_block(size, kind, depth):
+    items = make_items(size, kind)
+    return lambda: pemap.Block(items)
+
+@case("construction")
+def create_block_from_columns(size, kind, depth):
+    objects, values = make_objects(size), make_values(size, kind)
+    return lambda: pemap.Block.from_columns(values, objects)
+
+@case("construction")
+def create_compact_block(size, kind, depth):
+    objects, values = make_objects(size), make_values(size, kind)
+    return lambda: pemap.Block.from_columns(values, objects,
+        item_type=pemap.CompactItem)
+
+@case("construction")
+def copy_items(size, kind, depth):
+    return make_block(size, kind).copy_items
+
+
+# Queries of block, cold cases include building of indexes.
+
+@case("query")
+def get_items_by_value(size, kind, depth):
+    block, value = make_block(size, kind), make_query_value(kind)
+    return lambda: block.get_items_by_value(value)
+
+@case("query", warm=True)
+def get_items_by_value_warm(size, kind, depth):
+    return get_items_by_value(size, kind, depth)
+
+@case("query")
+def get_item_by_value(size, kind, depth):
+    block, value = make_block(size, kind), make_query_value(kind)
+    return lambda: block.get_item_by_value(value)
+
+@case("query")
+def get_items_by_values(size, kind, depth):
+    block, value = make_block(size, kind), make_query_value(kind)
+    return lambda: block.get_items_by_values([value])
+
+@case("query")
+def get_item_by_values(size, kind, depth):
+    block, value = make_block(size, kind), make_query_value(kind)
+    return lambda: block.get_item_by_values([value])
+
+@case("query")
+def get_items_by_type(size, kind, depth):
+    block = make_block(size, kind)
+    return lambda: block.get_items_by_type(str)
+
+@case("query", warm=True)
+def get_items_by_type_warm(size, kind, depth):
+    return get_items_by_type(size, kind, depth)
+
+@case("query")
+def get_item_by_type(size, kind, depth):
+    block = make_block(size, kind)
+    return lambda: block.get_item_by_type(int)
+
+@case("query")
+def get_true_items(size, kind, depth):
+    return make_block(size, kind).get_true_items
+
+@case("query")
+def get_true_item(size, kind, depth):
+    return make_block(size, kind).get_true_item
+
+@case("query")
+def get_false_items(size, kind, depth):
+    return make_block(size, kind).get_false_items
+
+@case("query")
+def get_false_item(size, kind, depth):
+    return make_block(size, kind).get_false_item
+
+@case("query", kinds=("int", "str"))
+def get_items_in_range(size, kind, depth):
+    block = make_block(size, kind)
+    low, high = make_value(10, kind), make_value(20, kind)
+    return lambda: block.get_items_in_range(low, high)
+
+@case("query")
+def find_items_by_values(size, kind, depth):
+    items, value = make_items(size, kind), make_query_value(kind)
+    return lambda: pemap.find_items_by_values(items, [value])
+
+@case("query")
+def find_item_by_values(size, kind, depth):
+    items, value = make_items(size, kind), make_query_value(kind)
+    return lambda: pemap.find_item_by_values(items, [value])
+
+@case("query")
+def find_items_by_type(size, kind, depth):
+    items = make_items(size, kind)
+    return lambda: pemap.find_items_by_type(items, str)
+
+@case("query")
+def find_item_by_type(size, kind, depth):
+    items = make_items(size, kind)
+    return lambda: pemap.find_item_by_type(items, int)
+
+@case("query")
+def find_true_items(size, kind, depth):
+    items = make_items(size, kind)
+    return lambda: pemap.find_true_items(items)
+
+@case("query")
+def find_true_item(size, kind, depth):
+    items = make_items(size, kind)
+    return lambda: pemap.find_true_item(items)
+
+@case("query")
+def find_false_items(size, kind, depth):
+    items = make_items(size, kind)
+    return lambda: pemap.find_false_items(items)
+
+@case("query")
+def find_false_item(size, kind, depth):
+    items = make_items(size, kind)
+    return lambda: pemap.find_false_item(items)
+
+
+# Conversions of blocks to other python objects.
+
+@case("conversion")
+def to_tuple(size, kind, depth):
+    return make_block(size, kind).to_tuple
+
+@case("conversion")
+def to_dict(size, kind, depth):
+    return make_block(size, kind).to_dict
+
+@case("conversion")
+def to_multi_dict(size, kind, depth):
+    return make_block(size, kind).to_multi_dict
+
+@case("conversion")
+def get_objects(size, kind, depth):
+    return make_block(size, kind).get_objects
+
+@case("conversion")
+def extract_objects(size, kind, depth):
+    items = make_items(size, kind)
+    return lambda: pemap.extract_objects(items)
+
+@case("conversion")
+def items_to_tuple(size, kind, depth):
+    items = make_items(size, kind)
+    return lambda: pemap.items_to_tuple(items)
+
+
+# Sorting of items by values.
+
+@case("sorting")
+def get_sorted_items(size, kind, depth):
+    return make_block(size, kind).get_sorted_items
+
+@case("sorting")
+def get_sorted_items_reverse(size, kind, depth):
+    block = make_block(size, kind)
+    return lambda: block.get_sorted_items(reverse=True)
+
+@case("sorting")
+def sort_items_by_value(size, kind, depth):
+    items = make_items(size, kind)
+    return lambda: pemap.sort_items_by_value(items)
+
+@case("sorting")
+def top_k(size, kind, depth):
+    block = make_block(size, kind)
+    return lambda: block.top_k(10)
+
+
+# Flattening of nested blocks.
+
+@case("flattening", depths=nesting_depths)
+def create_deep_block(size, kind, depth):
+    items = make_nested_items(size, kind, depth)
+    return lambda: pemap.DeepBlock(items)
+
+@case("flattening", depths=nesting_depths)
+def flatten_items(size, kind, depth):
+    items = make_nested_items(size, kind, depth)
+    return lambda: pemap.flatten_items(items)
+
+@case("flattening", depths=nesting_depths)
+def find_true_items_flatten(size, kind, depth):
+    items = make_nested_items(size, kind, depth)
+    return lambda: pemap.find_true_items(items, flatten=True)
@@ -0,0 +1,174 @@
+'''Runs benchmark cases reporting time and peak memory.
+
+Usage(from root of repository):
+    python -m benchmarks.run --sizes 1000 10000 --save baseline.json
+    python -m benchmarks.run --compare baseline.json
+
+Time is best of repeated calls in seconds. Peak memory is measured with
+tracemalloc on separate call as tracing slows down calls. Results are
+compared with saved baseline, reporting cases slower than threshold.'''
+import argparse
+import gc
+import json
+import os
+import platform
+import re
+import sys
+import time
+import tracemalloc
+
+# Benchmarks measure pemap of this repository not installed one.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "source"))
+
+from benchmarks import cases as cases_
+
+
+default_sizes = (1000, 10000, 100000, 1000000)
+
+
+def get_key(case, size, kind, depth):
+    # Returns key identifying results of case within results file.
+    key = "{}/{}/{}".format(case.name, kind, size)
+    if depth is not None:
+        key += "/depth={}".format(depth)
+    return key
+
+def measure_time(case, size, kind, depth, repeat):
+    # Returns best time of calls to function of case.
+    times = []
+    func = None
+    for _ in range(repeat):
+        if func is None or not case.warm:
+            func = case.setup(size, kind, depth)
+            if case.warm:
+                func()
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def measure_memory(case, size, kind, depth):
+    # Returns peak memory in bytes allocated by call to function.
+    func = case.setup(size, kind, depth)
+    if case.warm:
+        func()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def iter_runs(sizes, pattern=None, groups=None):
+    # Yields (case, size, kind, depth) for each run of benchmarks.
+    for case in cases_.cases:
+        if groups and case.group not in groups:
+            continue
+        if pattern and not re.search(pattern, case.name):
+            continue
+        for size in sizes:
+            for kind in case.kinds:
+                for depth in case.depths:
+                    yield case, size, kind, depth
+
+def run(sizes, pattern=None, groups=None, repeat=3, memory=True,
+output=sys.stdout):
+    '''Runs benchmarks returning results keyed by name of run'''
+    results = {}
+    for case, size, kind, depth in iter_runs(sizes, pattern, groups):
+        key = get_key(case, size, kind, depth)
+        result = {"time": measure_time(case, size, kind, depth, repeat)}
+        if memory:
+            result["peak"] = measure_memory(case, size, kind, depth)
+        results[key] = result
+        print(format_result(key, result), file=output, flush=True)
+    return results
+
+def format_result(key, result, baseline=None):
+    # Returns line describing result and its change from baseline.
+    line = "{:<60} {:>12.3f} ms".format(key, result["time"] * 1000)
+    if "peak" in result:
+        line += " {:>12.1f} KiB".format(result["peak"] / 1024)
+    if baseline is not None:
+        line += " {:>8.2f}x".format(result["time"] / baseline["time"])
+    return line
+
+def compare(results, baseline_results, threshold=1.2, output=sys.stdout):
+    '''Prints results against baseline returning keys of regressions.
+
+    Regression is result taking longer than 'threshold' times of its
+    baseline time. Results missing from baseline are skipped.'''
+    regressions = []
+    for key, result in results.items():
+        baseline = baseline_results.get(key)
+        if baseline is None:
+            continue
+        print(format_result(key, result, baseline), file=output)
+        if result["time"] > baseline["time"] * threshold:
+            regressions.append(key)
+    return regressions
+
+def get_metadata():
+    # Returns information on environment results were taken on.
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform()
+    }
+
+def save_results(path, results):
+    with open(path, "w") as file:
+        json.dump({"metadata": get_metadata(), "results": results}, file,
+            indent=2, sort_keys=True)
+
+def load_results(path):
+    with open(path) as file:
+        return json.load(file)["results"]
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Runs pemap benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+",
+        default=default_sizes, help="numbers of items to benchmark with")
+    parser.add_argument("--filter", help="regex selecting names of cases")
+    parser.add_argument("--group", action="append", dest="groups",
+        help="group of cases to run, e.g query(can be repeated)")
+    parser.add_argument("--repeat", type=int, default=3,
+        help="number of timed calls for each case")
+    parser.add_argument("--no-memory", action="store_false",
+        dest="memory", help="skip measuring peak memory")
+    parser.add_argument("--save", help="path to save results as json")
+    parser.add_argument("--compare", help="path of baseline json")
+    parser.add_argument("--threshold", type=float, default=1.2,
+        help="slowdown against baseline reported as regression")
+    parser.add_argument("--list", action="store_true",
+        help="list cases without running them")
+    args = parser.parse_args(args)
+
+    if args.list:
+        for case in cases_.cases:
+            print("{:<12} {}".format(case.group, case.name))
+        return 0
+    results = run(args.sizes, args.filter, args.groups, args.repeat,
+        args.memory)
+    if args.save:
+        save_results(args.save, results)
+    if args.compare:
+        print("\nCompared with '{}':".format(args.compare))
+        regressions = compare(results, load_results(args.compare),
+            args.threshold)
+        if regressions:
+            print("\n{} regression(s) slower than {}x:".format(
+                len(regressions), args.threshold))
+            for key in regressions:
+                print("  " + key)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
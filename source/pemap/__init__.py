@@ -1,15 +1,47 @@
+import importlib
+
 from pemap.reference import Reference
 from pemap.value import Value
+from pemap.value import CachedValue
 
 from pemap.items import BaseItem
 from pemap.items import Item
+from pemap.items import CompactItem
+from pemap.items import CachedItem
 
 from pemap.block import BaseBlock
 from pemap.block import Block
 from pemap.block import DeepBlock
+from pemap.mapped import MMapBlock
+
+from pemap.cache import ValueCache
+from pemap.parallel import ValueEvaluationError
+
+from pemap.query import value_in
+from pemap.query import value_equals
+from pemap.query import value_between
+from pemap.query import of_type
+from pemap.query import truthy
+from pemap.query import falsy
+from pemap.query import where
 
 from pemap.highlevel import *
 
 
+# Blocks importing numpy, asyncio or multiprocessing are imported on
+# first access so that importing pemap does not import them.
+_lazy_blocks = {
+    "ColumnarBlock": "pemap.columnar",
+    "AsyncBlock": "pemap.asynchronous",
+    "PartitionedBlock": "pemap.partitioned"
+}
+
+def __getattr__(name):
+    if name in _lazy_blocks:
+        return getattr(importlib.import_module(_lazy_blocks[name]), name)
+    err_msg = "module 'pemap' has no attribute {!r}"
+    raise AttributeError(err_msg.format(name))
+
+
 __name__ = "pemap"
 ___version__ = "0.2.0"
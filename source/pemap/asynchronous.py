@@ -0,0 +1,145 @@
+from pemap import block as block_
+from pemap import cache as cache_
+from pemap import items as items_
+
+import asyncio
+
+
+class AsyncBlock(block_.Block):
+    '''Varient of Block supporting values that are coroutine functions.
+
+    Values of items can be coroutine functions(async def) whose results
+    get awaited concurrently by methods starting with 'a' such as 
+    `aget_values()`. Number of values awaited at same time can be
+    limited with 'concurrency' argument.
+
+    Queries evaluate values first and then use same filtering as Block.
+    Methods of Block not starting with 'a' do not await values.'''
+
+    def __init__(self, items, _type=object, strict=True, indexed=True,
+    value_cache=None, concurrency=None):
+        '''
+        items: Iterator
+            Collection of Item objects
+        _type: Type
+            Type of items this block expectes, default: object
+        strict: Bool
+            Prevents block from containing items containing other blocks.
+        indexed: Bool
+            Enables lazily built indexes for value lookups, default: True.
+        value_cache: ValueCache
+            Cache remembering values of items that are functions.
+        concurrency: Int
+            Maximum number of values awaited at same time, default: None.
+        '''
+        self._concurrency = concurrency
+        super().__init__(items, _type, strict, indexed, value_cache)
+
+    def get_concurrency(self):
+        return self._concurrency
+
+    def _get_init_kwargs(self):
+        init_kwargs = super()._get_init_kwargs()
+        init_kwargs["concurrency"] = self._concurrency
+        return init_kwargs
+
+    async def _aevaluate_values(self, items):
+        # Returns values of items awaiting values concurrently.
+        # Results of coroutine functions are stored on value cache.
+        values = [None] * len(items)
+        pending = []
+        for position, _item in enumerate(items):
+            if not _item.is_value_dynamic():
+                values[position] = self._value_getter(_item)
+                continue
+            if self._value_cache is not None:
+                _value = self._value_cache.get_cached(_item, cache_._missing)
+                if _value is not cache_._missing:
+                    values[position] = _value
+                    continue
+            pending.append(position)
+        # Semaphore is created here as it needs running event loop.
+        if self._concurrency is None:
+            semaphore = None
+        else:
+            semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def evaluate(position):
+            _item = items[position]
+            if semaphore is None:
+                _value = await _item.aget_value()
+            else:
+                async with semaphore:
+                    _value = await _item.aget_value()
+            if self._value_cache is not None:
+                self._value_cache.set_cached(_item, _value)
+            values[position] = _value
+
+        await asyncio.gather(*[evaluate(position) for position in pending])
+        return values
+
+    async def _aget_evaluated_block(self):
+        # Returns block with awaited values and items as objects.
+        # Block methods are used on it to find items.
+        values = await self._aevaluate_values(self._items)
+        return block_.Block.from_columns(values, self._items, False, 
+            items_.CompactItem, strict=False, indexed=False)
+
+    async def _afind_items(self, method_name, *args):
+        # Calls block method on evaluated block returning our items.
+        evaluated_block = await self._aget_evaluated_block()
+        items = getattr(evaluated_block, method_name)(*args)
+        return evaluated_block.extract_objects_from_items(items)
+
+    async def _afind_item(self, method_name, *args):
+        # Calls block method on evaluated block returning our item.
+        evaluated_block = await self._aget_evaluated_block()
+        _item = getattr(evaluated_block, method_name)(*args)
+        if _item is not None: return _item.get_object()
+
+    async def aget_values(self):
+        '''Gets values of block items awaiting them concurrently'''
+        return await self._aevaluate_values(self._items)
+
+    async def ato_tuple(self):
+        '''Returns tuple form of block awaiting values concurrently'''
+        values = await self._aevaluate_values(self._items)
+        objects = self.extract_objects_from_items(self._items)
+        return tuple(zip(values, objects))
+
+    async def aget_items_by_value(self, value):
+        '''Gets item objects matching value'''
+        return await self._afind_items("get_items_by_value", value)
+
+    async def aget_item_by_value(self, value):
+        '''Gets first item matching value'''
+        return await self._afind_item("get_item_by_value", value)
+
+    async def aget_items_by_values(self, values):
+        '''Gets item objects matching any of values'''
+        return await self._afind_items("get_items_by_values", values)
+
+    async def aget_item_by_values(self, values):
+        '''Gets first item matching any of values'''
+        return await self._afind_item("get_item_by_values", values)
+
+    async def aget_true_items(self):
+        # Gets items that evaluates to true.
+        return await self._afind_items("get_true_items")
+
+    async def aget_false_items(self):
+        # Gets items that evaluates to false.
+        return await self._afind_items("get_false_items")
+
+    async def aget_sorted_items(self):
+        '''Returns items of block sorted by their awaited values'''
+        return await self._afind_items("get_sorted_items")
+
+    async def _aiter_sorted_items(self):
+        # Yields items sorted by awaited values.
+        for _item in await self.aget_sorted_items():
+            yield _item
+
+    def __aiter__(self):
+        # Iterates items sorted by value after awaiting values.
+        return self._aiter_sorted_items()
@@ -1,7 +1,17 @@
 from pemap import items as items_
 from pemap import value as value_
+from pemap import cache as cache_
+from pemap import grouping
+from pemap import parallel
+from pemap import query as query_
+from pemap import serialization
+from pemap import util
 
 from collections import defaultdict
+import bisect
+import collections
+import heapq
+import operator
 
 
 class BaseBlock():
@@ -12,6 +22,8 @@ class BaseBlock():
     def __init__(self, items, _type=object) -> None:
         self._items = items
         self._type = _type
+        # Function used by block to get value of item.
+        self._value_getter = operator.methodcaller("get_value")
 
     def _to_items(self, _items_like):
         # Returns item objects from iterator of objects.
@@ -19,9 +31,11 @@ class BaseBlock():
         # Non item objects will  result in item objects.
         return  [self._item_type.to_item(_item) for _item in _items_like]
 
-    def copy_items(self):
-        # Copies current items of block
-        return [_item.copy() for _item in self._items]
+    def copy_items(self, deep=False):
+        # Copies current items of block.
+        # Copies share objects and values until they are changed,
+        # deep copies get copies of objects and values.
+        return [_item.copy(deep) for _item in self._items]
 
     def get_items(self):
         # Returns items stored in block object
@@ -29,6 +43,8 @@ class BaseBlock():
     
     def get_objects(self, value_sort=False):
         '''Gets items underlying objects'''
+        if value_sort:
+            return self.extract_objects_from_items(self.get_sorted_items())
         return self.extract_objects_from_items(self._items)
 
     @classmethod
@@ -41,6 +57,45 @@ class BaseBlock():
         '''Returns items sorted by their values'''
         return sorted(items, key=lambda _item: _item.get_value())
 
+    def _evaluate_values(self, items, executor=None):
+        # Returns values of items in order of items.
+        return list(map(self._value_getter, items))
+
+    def _sort_positions(self, items, key=None, reverse=False, 
+    tiebreak=None):
+        # Returns positions of items in sorted order and their keys.
+        # Keys are extracted in one pass and positions sorted by them
+        # (decorate-sort-undecorate). Sorting is stable.
+        keys = self._evaluate_values(items)
+        if key is not None:
+            keys = list(map(key, keys))
+        if tiebreak is not None:
+            keys = list(zip(keys, map(tiebreak, items)))
+        order = sorted(range(len(keys)), key=keys.__getitem__, 
+            reverse=reverse)
+        return order, keys
+
+    def get_sorted_items(self, key=None, reverse=False, tiebreak=None):
+        '''Returns items of block sorted by their values
+
+        key: Callable
+            Function applied to value of item to get its sort key.
+        reverse: Bool
+            Sorts items from largest to smallest, default: False.
+        tiebreak: Callable
+            Function applied to item to order items with equal keys.'''
+        order, _ = self._sort_positions(self._items, key, reverse, tiebreak)
+        return [self._items[position] for position in order]
+
+    def top_k(self, k, largest=True):
+        '''Gets k items with largest(or smallest) values.
+
+        Items are ordered same as `get_sorted_items(reverse=largest)` 
+        would order them. Heap of k items is used, taking O(n log k).'''
+        if largest:
+            return heapq.nlargest(k, self._items, key=self._value_getter)
+        return heapq.nsmallest(k, self._items, key=self._value_getter)
+
     def filter_items(self, key=None, limit=None):
         '''Filters item objects filtered by key function'''
         if limit == None: 
@@ -49,64 +104,102 @@ class BaseBlock():
             items = self._items[:limit]
         return list(filter(key, items))
 
+    def _filter_item(self, key=None):
+        # Returns first item matching key function, stops once found.
+        return next(filter(key, self._items), None)
 
 
     def get_values(self):
         '''Gets values of block item objects'''
-        return [_item.get_value() for _item in self._items]
+        return list(map(self._value_getter, self._items))
 
     def get_items_by_value(self, value):
         '''Gets item objects matching value'''
+        get_value = self._value_getter
         def func(_item):
-            return _item.get_value() == value
+            return get_value(_item) == value
         return self.filter_items(func)
 
     def get_item_by_value(self, value):
         '''Gets first item matching value'''
-        items = self.get_items_by_value(value)
-        if items: return items[0]
+        get_value = self._value_getter
+        return self._filter_item(lambda _item: get_value(_item) == value)
 
     def get_items_by_values(self, values):
         '''Gets item objects matching any of values'''
+        get_value = self._value_getter
         def func(_item):
-            return _item.get_value() in values
+            return get_value(_item) in values
         return self.filter_items(func)
 
     def get_item_by_values(self, values):
         '''Gets first item matching any of values'''
-        items = self.get_items_by_values(values)
-        if items: return items[0]
+        get_value = self._value_getter
+        return self._filter_item(lambda _item: get_value(_item) in values)
 
     def get_items_by_type(self, _type):
         '''Gets item objects of provided type'''
         # Type is defined as type of object underlying item.
-        def func(_item):
-            return isinstance(_item.get_object(), _type)
-        return self.filter_items(func)   
+        # Each class of objects is checked against type only once.
+        matches_type = util.get_type_matcher(_type)
+        return self.filter_items(
+            lambda _item: matches_type(_item.get_object()))
 
     def get_item_by_type(self, _type):
         '''Gets first item of provided type'''
-        items = self.get_items_by_type(_type)
-        if items: return items[0] 
+        matches_type = util.get_type_matcher(_type)
+        return self._filter_item(
+            lambda _item: matches_type(_item.get_object()))
 
 
     def get_true_items(self):
         # Gets items that evaluates to true.
-        return self.filter_items(lambda item: item.get_value())
+        return self.filter_items(self._value_getter)
 
     def get_true_item(self):
         # Gets first item evaluating to true.
-        items = self.filter_items(lambda item: item.get_value(), 1)
-        if items: return items[0]
+        return self._filter_item(self._value_getter)
 
     def get_false_items(self):
         # Gets items that evaluates to false.
-        return self.filter_items(lambda item: not item.get_value())
+        get_value = self._value_getter
+        return self.filter_items(lambda item: not get_value(item))
 
     def get_false_item(self):
         # Gets first item evaluating to false.
-        items = self.filter_items(lambda item: not item.get_value(), 1)
-        if items: return items[0]
+        get_value = self._value_getter
+        return self._filter_item(lambda item: not get_value(item))
+
+
+
+    def _plan_query(self, conditions):
+        # Returns items that can match conditions in block order and
+        # conditions left to be tested on them.
+        return self._items, conditions
+
+    def _select_items(self, items, conditions, limit=None):
+        # Returns items matching conditions in one pass over items.
+        return query_.select_items(items, conditions, limit, 
+            self._value_getter)
+
+    def query(self, condition, limit=None):
+        '''Gets items matching condition built from `pemap.query`.
+
+        condition: Condition
+            Conditions combined with &, | and ~, e.g
+            `value_in([1, 2]) & of_type(str) & truthy()`.
+        limit: Int
+            Maximum number of items returned, scan stops once found.
+
+        Items are returned in block order. Whole condition is tested in
+        one pass over items evaluating each value at most once.'''
+        items, conditions = self._plan_query(
+            query_.split_conditions((condition,)))
+        return self._select_items(items, conditions, limit)
+
+    def query_first(self, condition):
+        '''Gets first item matching condition or None'''
+        return next(iter(self.query(condition, 1)), None)
 
 
 
@@ -114,10 +207,9 @@ class BaseBlock():
         '''Returns tuple form of block with values and objects'''
         # Value will be used as tuple key and object as value.
         # object is the object under reference object of items
-        results = []
-        for _item in self._items:
-            results.append((_item.get_value(), _item.get_object()))
-        return tuple(results)
+        get_value = self._value_getter
+        return tuple([(get_value(_item), _item.get_object()) 
+            for _item in self._items])
 
     def to_dict(self):
         '''Returns dict form of block with values and objects'''
@@ -127,9 +219,11 @@ class BaseBlock():
     def _to_multi_dict(self):
         # Returns multi dict from items values and underlying objects
         # Key is value and values are underlying objects.
+        # Items are walked once without creating tuple form first.
         result_dict = defaultdict(set)
-        for _value, _object in self.to_tuple():
-            result_dict[_value].add(_object)
+        get_value = self._value_getter
+        for _item in self._items:
+            result_dict[get_value(_item)].add(_item.get_object())
         return result_dict
 
     def to_multi_dict(self):
@@ -155,7 +249,14 @@ class Block(BaseBlock):
     another block. This is by default set to True to avoid confusion
     but can be set to True to allow nested block instances.'''
 
-    def __init__(self, items, _type=object, strict=True):
+    # Collections of values that can be looked up through value index.
+    # Other containers are scanned as they may define own membership.
+    _indexable_values_types = (list, tuple, set, frozenset)
+    # Maximum number of remembered sorted orders besides sorted index.
+    _max_sorted_orders = 8
+
+    def __init__(self, items, _type=object, strict=True, indexed=True,
+    value_cache=None):
         '''
         items: Iterator
             Collection of Item objects
@@ -172,11 +273,23 @@ class Block(BaseBlock):
             'median'.
         update_values: Bool
             Enables and disables updating of block and items values.
+        indexed: Bool
+            Enables lazily built indexes for value lookups, default: True.
+        value_cache: ValueCache
+            Cache remembering values of items that are functions.
+            True creates unbounded cache, default: None.
         '''
         super().__init__(items, _type)
         self._items = items
         self._type = _type
         self._strict = strict
+        self._indexed = indexed
+        self._setup_value_cache(value_cache)
+        # Executor for evaluating values of items in parallel.
+        self._executor = None
+        self._chunksize = None
+        # Indexes are built on first lookup that needs them.
+        self.reset_indexes()
         # Setup items after value have been set from existing items.
         # The method may modify values for items.
         # Value is passed as argument since value argument may
@@ -192,29 +305,1152 @@ class Block(BaseBlock):
         # Item objects will be created when neccessary.
         # This could make find bugs hard but it simplifies things.
         # This method is not meant to be overiden(take care)
-        new_items = []
-        for _item in items:
-            new_item = items_.Item.to_item(_item)
-            # Gets object underlying item.
-            _object = new_item.get_object()
-            # Check if strict is respected(Block objects not allowed).
-            # Exception is raised if not respected.
-            if self._strict and isinstance(_object, Block):
-                err_msg = "Nested Block objects not allowed when " +\
-                    "'strict' is enabled"
-                raise TypeError(err_msg)
-            # Check if type for object is correct.
-            # Exception is if type of object does not match expected one.
-            if not isinstance(_object, self._type):
-                err_msg = "Item should have reference of type '{}' not '{}'"
-                type_name = _object.__class__.__name__
-                err_msg = err_msg.format(self._type.__name__, type_name)
-                raise TypeError(err_msg)
-            # Appends new item to items list
-            new_items.append(new_item)
-        self._items = new_items
+        if isinstance(items, Block):
+            self._share_items(items)
+            return
+        new_items = [self._item_type.to_item(_item) for _item in items]
+        self._set_items(new_items)
         #self._items_dict = dict(self._to_multi_dict())
 
+    def _set_items(self, items, validate=True):
+        # Sets item objects of block checking their objects in bulk.
+        # Items are expected to already be item objects.
+        if validate:
+            self._check_objects(self.extract_objects_from_items(items))
+        self._items = items
+        self.reset_indexes()
+
+    def _share_items(self, block_object):
+        # Sets items of other block without setting them up again.
+        # Items are shared in order of other block and sorted index it
+        # already built is copied instead of being rebuilt.
+        validate = not self._is_checked_by(block_object)
+        self._set_items(list(block_object.get_items()), validate)
+        # Items may have been replaced(e.g by flattening of DeepBlock).
+        if len(self._items) == len(block_object._items) and \
+            all(map(operator.is_, self._items, block_object._items)):
+            self._copy_indexes(block_object)
+
+    def _is_checked_by(self, block_object):
+        # Checks if objects checked by other block pass checks of this.
+        # Types other than classes and tuples of classes are not compared
+        # leaving objects to be checked again.
+        if not (util.is_plain_type(block_object._type) and 
+            util.is_plain_type(self._type)):
+            return False
+        return util.is_plain_subtype(block_object._type, self._type) and \
+            (block_object._strict or not self._strict)
+
+    def _copy_indexes(self, block_object):
+        # Copies sorted index built by other block with same items.
+        # Index is copied as it is updated in place. Value index is 
+        # left to be built lazily as copying it costs same as building.
+        if self._indexed and block_object._sorted_index is not None:
+            sorted_values, sorted_items = block_object._sorted_index
+            self._sorted_index = (list(sorted_values), list(sorted_items))
+
+    def _check_objects(self, objects):
+        # Checks if objects respect 'strict' and type of block.
+        # Objects of plain class are checked once for each class, only 
+        # those of classes failing check are checked on their own as
+        # they may still be instances(e.g overriden __class__).
+        # Exception is raised if objects are not respected.
+        if not self._strict and self._type is object:
+            return
+        if util.is_plain_type(self._type):
+            failed_types = set(object_type for object_type 
+                in set(map(type, objects))
+                if (self._strict and issubclass(object_type, Block)) or
+                not issubclass(object_type, self._type))
+            if not failed_types:
+                return
+            objects = [_object for _object in objects 
+                if type(_object) in failed_types]
+        for _object in objects:
+            self._check_object(_object)
+
+    def _check_object(self, _object):
+        # Raises exception if object does not respect 'strict' and type.
+        # Check if strict is respected(Block objects not allowed).
+        if self._strict and isinstance(_object, Block):
+            err_msg = "Nested Block objects not allowed when " +\
+                "'strict' is enabled"
+            raise TypeError(err_msg)
+        # Check if type for object is correct.
+        if not isinstance(_object, self._type):
+            err_msg = "Item should have reference of type '{}' not '{}'"
+            err_msg = err_msg.format(getattr(self._type, "__name__", 
+                self._type), _object.__class__.__name__)
+            raise TypeError(err_msg)
+
+    @classmethod
+    def _from_items(cls, items, validate=True, **kwargs):
+        # Creates block from item objects without setting them up.
+        block_object = cls([], **kwargs)
+        block_object._set_items(items, validate)
+        return block_object
+
+    @classmethod
+    def from_columns(cls, values, objects, validate=True, item_type=None, 
+    **kwargs):
+        '''Creates block from parallel collections of values and objects.
+
+        values: Iterator
+            Values for items, in same order as objects.
+        objects: Iterator
+            Objects for items.
+        validate: Bool
+            Enables checking objects against type and 'strict' of block.
+            Objects are checked in bulk, once for each distinct type.
+        item_type: Type
+            Item class used to create items, default: block item type.
+            CompactItem avoids creating Reference and Value objects.
+
+        Other keyword arguments are passed to block initialiser.
+        Values are used as they are, they are not taken from objects.'''
+        if item_type is None:
+            item_type = cls._item_type
+        values = list(values)
+        objects = list(objects)
+        if len(values) != len(objects):
+            err_msg = "Number of values({}) and objects({}) do not match"
+            raise ValueError(err_msg.format(len(values), len(objects)))
+        create_item = item_type._from_object_value
+        items = list(map(create_item, objects, values))
+        return cls._from_items(items, validate, **kwargs)
+
+    @classmethod
+    def from_pairs(cls, pairs, validate=True, item_type=None, **kwargs):
+        '''Creates block from (value, object) pairs.
+
+        Pairs are in same form as returned by `to_tuple()`. See 
+        `from_columns()` for other arguments.'''
+        if item_type is None:
+            item_type = cls._item_type
+        create_item = item_type._from_object_value
+        items = [create_item(_object, _value) for _value, _object in pairs]
+        return cls._from_items(items, validate, **kwargs)
+
+    @classmethod
+    def from_dict(cls, mapping, validate=True, item_type=None, **kwargs):
+        '''Creates block from dict mapping values to objects.
+
+        Dict is in same form as returned by `to_dict()`. See 
+        `from_columns()` for other arguments.'''
+        return cls.from_pairs(mapping.items(), validate, item_type, 
+            **kwargs)
+
+    def _restore_items(self, items):
+        # Sets items that were already setup by block of same type.
+        # Items are not checked or flattened again.
+        self._items = items
+        self.reset_indexes()
+
+    def _restore_sorted_index(self, positions):
+        # Sets sorted index from positions of items in sorted order.
+        if not self._indexed or not self._are_values_static():
+            return
+        sorted_items = [self._items[position] for position in positions]
+        sorted_values = list(map(self._value_getter, sorted_items))
+        self._sorted_index = (sorted_values, sorted_items)
+
+    def save(self, path, index=True):
+        '''Writes block to file at path.
+
+        path: Str
+            Path of file to write block to.
+        index: Bool
+            Enables writing sorted index if already built, default: True.
+
+        Values and objects are written in separate columns without 
+        item objects. Numeric values are packed into arrays. Values and 
+        objects need to be picklable, value cache is not written.'''
+        with open(path, "wb") as file:
+            serialization.dump_block(self, file, index)
+
+    @classmethod
+    def load(cls, path):
+        '''Reads block written by `save()` from file at path.
+
+        Block is created without checking its objects again. Block type
+        is same as of written block which can be sub class of this.'''
+        with open(path, "rb") as file:
+            return serialization.load_block(file, cls)
+
+    def dumps(self, index=True, buffer_callback=None):
+        '''Returns bytes of block, see `save()`.
+
+        buffer_callback: Callable
+            Receives buffers of numeric values to be kept out-of-band
+            (pickle protocol 5), default: None.'''
+        return serialization.dumps_block(self, index, buffer_callback)
+
+    @classmethod
+    def loads(cls, data, buffers=None):
+        '''Creates block from bytes returned by `dumps()`.
+
+        buffers: Iterator
+            Buffers received by 'buffer_callback' of `dumps()`.'''
+        return serialization.loads_block(data, cls, buffers)
+
+    def _setup_value_cache(self, value_cache):
+        # Makes block get values of items through value cache.
+        if value_cache is True:
+            value_cache = cache_.ValueCache()
+        self._value_cache = value_cache
+        if value_cache is not None:
+            self._value_getter = value_cache.get_value
+
+    def get_value_cache(self):
+        # Returns value cache of block or None.
+        return self._value_cache
+
+    def set_executor(self, executor=None, chunksize=None):
+        '''Sets executor for evaluating values that are functions.
+
+        executor: Executor
+            ThreadPoolExecutor or ProcessPoolExecutor, None disables
+            parallel evaluation.
+        chunksize: Int
+            Number of items sent to executor at once, default: None.
+
+        Executor is used by `get_values()`, `to_tuple()` and sorting.
+        Order of items is preserved and ValueEvaluationError is raised 
+        with errors of each failed item.'''
+        self._executor = executor
+        self._chunksize = chunksize
+
+    def get_executor(self):
+        # Returns executor for evaluating values or None.
+        return self._executor
+
+    def _evaluate_values(self, items, executor=None):
+        # Returns values of items evaluating them with executor.
+        # Block executor is used if executor is not provided.
+        if executor is None:
+            executor = self._executor
+        if executor is None:
+            return super()._evaluate_values(items)
+        if self._value_cache is None:
+            return parallel.evaluate_values(items, executor, 
+                self._chunksize, self._value_getter)
+        # Only values not remembered by cache are evaluated.
+        values = [self._value_cache.get_cached(_item, cache_._missing)
+            for _item in items]
+        missing_positions = [position for position, _value 
+            in enumerate(values) if _value is cache_._missing]
+        missing_items = [items[position] for position in missing_positions]
+        missing_values = parallel.evaluate_values(missing_items, executor, 
+            self._chunksize, self._value_getter)
+        for position, _value in zip(missing_positions, missing_values):
+            values[position] = _value
+            if items[position].is_value_dynamic():
+                self._value_cache.set_cached(items[position], _value)
+        return values
+
+    def get_values(self, executor=None):
+        '''Gets values of block item objects
+
+        executor: Executor
+            Executor for evaluating values that are functions, default:
+            executor set with `set_executor()`.'''
+        return self._evaluate_values(self._items, executor)
+
+    def to_tuple(self, executor=None):
+        '''Returns tuple form of block with values and objects'''
+        values = self._evaluate_values(self._items, executor)
+        objects = self.extract_objects_from_items(self._items)
+        return tuple(zip(values, objects))
+
+    def invalidate_values(self, items=None):
+        '''Discards remembered values of items or all items.
+
+        Values remembered by value cache of block and by items such as
+        CachedItem get discarded.'''
+        if items is None:
+            items = self._items
+            if self._value_cache is not None:
+                self._value_cache.invalidate()
+        elif self._value_cache is not None:
+            self._value_cache.invalidate(items)
+        for _item in items:
+            _item.invalidate_value()
+
+    def materialize_values(self):
+        '''Returns new block with values of items evaluated once.
+
+        Items of new block hold return values of value functions instead
+        of the functions. This allows indexes to be used on them.'''
+        get_value = self._value_getter
+        items = [_item.__class__._from_object_value(_item.get_object(), 
+            get_value(_item)) for _item in self._items]
+        return self._from_items(items, False, **self._get_init_kwargs())
+
+    def _get_init_kwargs(self):
+        # Returns keyword arguments to create block like this one.
+        return {"_type": self._type, "strict": self._strict, 
+            "indexed": self._indexed, "value_cache": self._value_cache}
+
+    def reset_indexes(self):
+        '''Discards indexes so that they get rebuilt on next lookup.
+        
+        Indexes reflect values at time they were built. Call this method
+        after changing values of items already in block.'''
+        self._value_index = None
+        self._value_index_built = False
+        # Sequence numbers give order of items within value and type
+        # indexes. They are kept while any of these indexes is built.
+        self._seqs = None
+        self._next_seq = 0
+        self._type_index = None
+        # Classes of objects in type index matching queried types.
+        self._type_matches = {}
+        self._sorted_index = None
+        # Items in other sorted orders keyed by sorting arguments.
+        self._sorted_orders = collections.OrderedDict()
+        # Whether values of items are not functions(None if unknown).
+        self._static_values = None
+
+    def _on_items_changed(self):
+        # Called after items were added or removed from block.
+        # Sub classes can discard data not updated incrementally.
+        self._sorted_orders.clear()
+        self._static_values = None
+
+    def _are_values_static(self):
+        # Checks if values of items are not functions.
+        # Structures depending on values can only be kept if True.
+        if self._static_values is None:
+            self._static_values = not any(
+                _item.is_value_dynamic() for _item in self._items)
+        return self._static_values
+
+    def _build_value_index(self):
+        # Maps hashable values to buckets of items with that value.
+        # Bucket is pair of sequence numbers and items in block order.
+        # Items with unhashable values are kept in separate bucket
+        # which gets scanned on every lookup.
+        # None is returned if values cannot be indexed.
+        buckets = {}
+        unhashable_bucket = ([], [])
+        for seq, _item in zip(self._get_seqs(), self._items):
+            # Values of functions may change between calls.
+            if _item.is_value_dynamic():
+                return None
+            self._add_to_bucket(buckets, unhashable_bucket, seq, _item)
+        return buckets, unhashable_bucket
+
+    def _get_seqs(self):
+        # Returns sequence numbers of items numbering them if needed.
+        if self._seqs is None:
+            self._seqs = list(range(len(self._items)))
+            self._next_seq = len(self._items)
+        return self._seqs
+
+    @staticmethod
+    def _add_to_bucket(buckets, unhashable_bucket, seq, _item):
+        # Appends item with its sequence number to bucket of its value.
+        try:
+            bucket = buckets.setdefault(_item.get_value(), ([], []))
+        except TypeError:
+            bucket = unhashable_bucket
+        bucket[0].append(seq)
+        bucket[1].append(_item)
+
+    def _get_value_index(self):
+        # Returns value index building it when not yet built.
+        # None is returned if index is disabled or cannot be built.
+        if not self._indexed:
+            return None
+        if not self._value_index_built:
+            self._value_index = self._build_value_index()
+            self._value_index_built = True
+        return self._value_index
+
+    def _lookup_value_buckets(self, values):
+        # Returns buckets with items matching any of values.
+        # None is returned if index cannot be used for values.
+        index = self._get_value_index()
+        if index is None:
+            return None
+        try:
+            lookup_values = set(values)
+        except TypeError:
+            # Unhashable values can only be found by scanning.
+            return None
+        buckets, unhashable_bucket = index
+        found_buckets = []
+        for _value in lookup_values:
+            if _value in buckets:
+                found_buckets.append(buckets[_value])
+        if unhashable_bucket[1]:
+            matches = [(seq, _item) for seq, _item in zip(*unhashable_bucket)
+                if _item.get_value() in values]
+            if matches:
+                found_buckets.append(tuple(map(list, zip(*matches))))
+        return found_buckets
+
+    @staticmethod
+    def _merge_buckets(found_buckets):
+        # Returns items of buckets in block order.
+        if len(found_buckets) == 1:
+            return list(found_buckets[0][1])
+        # Buckets are in block order but may be mixed with each other.
+        pairs = heapq.merge(*[zip(*bucket) for bucket in found_buckets], 
+            key=operator.itemgetter(0))
+        return [_item for _, _item in pairs]
+
+    @staticmethod
+    def _first_in_buckets(found_buckets):
+        # Returns first item of buckets in block order or None.
+        found_buckets = [bucket for bucket in found_buckets if bucket[0]]
+        if found_buckets:
+            bucket = min(found_buckets, key=lambda bucket: bucket[0][0])
+            return bucket[1][0]
+
+    def _lookup_value_items(self, values):
+        # Returns items matching any of values in block order.
+        # None is returned if index cannot be used for values.
+        found_buckets = self._lookup_value_buckets(values)
+        if found_buckets is None:
+            return None
+        return self._merge_buckets(found_buckets)
+
+    def _lookup_value_item(self, values):
+        # Returns first item matching any of values.
+        # False is returned if index cannot be used for values.
+        found_buckets = self._lookup_value_buckets(values)
+        if found_buckets is None:
+            return False
+        return self._first_in_buckets(found_buckets)
+
+    def get_items_by_value(self, value):
+        '''Gets item objects matching value'''
+        items = self._lookup_value_items((value,))
+        if items is None:
+            return super().get_items_by_value(value)
+        return items
+
+    def get_item_by_value(self, value):
+        '''Gets first item matching value'''
+        _item = self._lookup_value_item((value,))
+        if _item is False:
+            return super().get_item_by_value(value)
+        return _item
+
+    def get_items_by_values(self, values):
+        '''Gets item objects matching any of values'''
+        items = None
+        if isinstance(values, self._indexable_values_types):
+            items = self._lookup_value_items(values)
+        if items is None:
+            return super().get_items_by_values(values)
+        return items
+
+    def get_item_by_values(self, values):
+        '''Gets first item matching any of values'''
+        _item = False
+        if isinstance(values, self._indexable_values_types):
+            _item = self._lookup_value_item(values)
+        if _item is False:
+            return super().get_item_by_values(values)
+        return _item
+
+    def _build_type_index(self):
+        # Maps classes of objects to buckets of items of that class.
+        # Bucket is pair of sequence numbers and items in block order.
+        self._type_index = {}
+        self._type_matches.clear()
+        for seq, _item in zip(self._get_seqs(), self._items):
+            self._add_to_type_bucket(seq, _item)
+        return self._type_index
+
+    def _add_to_type_bucket(self, seq, _item):
+        # Appends item with its sequence number to bucket of its class.
+        object_type = _item.get_type()
+        bucket = self._type_index.get(object_type)
+        if bucket is None:
+            bucket = ([], [])
+            self._type_index[object_type] = bucket
+            # New class may match types that were already queried.
+            self._type_matches.clear()
+        bucket[0].append(seq)
+        bucket[1].append(_item)
+
+    def _get_type_index(self):
+        # Returns type index building it when not yet built.
+        # None is returned if index is disabled.
+        if not self._indexed:
+            return None
+        if self._type_index is None:
+            self._build_type_index()
+        return self._type_index
+
+    def _lookup_type_buckets(self, _type):
+        # Returns buckets with items whose objects are instances of type.
+        # None is returned if index is disabled or type is not plain
+        # class as it may not match objects through their classes.
+        if not util.is_plain_type(_type):
+            return None
+        index = self._get_type_index()
+        if index is None:
+            return None
+        object_types = self._type_matches.get(_type)
+        if object_types is None:
+            # Buckets are not removed once empty, so classes matching 
+            # type only change when class is added to index.
+            object_types = [object_type for object_type in index
+                if util.is_subtype(object_type, _type)]
+            self._type_matches[_type] = object_types
+        return [index[object_type] for object_type in object_types]
+
+    def get_items_by_type(self, _type):
+        '''Gets item objects of provided type.
+
+        Items are looked up in type index mapping classes of objects to
+        items. Index is built on first lookup and kept updated as items
+        are added and removed. Call `reset_indexes()` after replacing
+        objects of items already in block. Types other than classes and
+        tuples of classes(e.g abstract classes) are checked on objects.'''
+        found_buckets = self._lookup_type_buckets(_type)
+        if found_buckets is None:
+            return super().get_items_by_type(_type)
+        if sum(len(bucket[0]) for bucket in found_buckets) == \
+            len(self._items):
+            # All items match and are already in block order.
+            return list(self._items)
+        return self._merge_buckets(found_buckets)
+
+    def get_item_by_type(self, _type):
+        '''Gets first item of provided type'''
+        found_buckets = self._lookup_type_buckets(_type)
+        if found_buckets is None:
+            return super().get_item_by_type(_type)
+        return self._first_in_buckets(found_buckets)
+
+    def _lookup_condition_buckets(self, condition):
+        # Returns buckets with items matching condition.
+        # Only indexes already built are used, building index for one
+        # query costs more than scanning that can stop early.
+        # None is returned if no index can be used for condition.
+        values = condition.get_values()
+        if values is not None:
+            if not self._value_index_built:
+                return None
+            return self._lookup_value_buckets(values)
+        _type = condition.get_type()
+        if _type is not None:
+            if self._type_index is None:
+                return None
+            return self._lookup_type_buckets(_type)
+        value_range = condition.get_range()
+        if value_range is not None and self._sorted_index is not None \
+            and self._value_index_built:
+            return self._lookup_range_buckets(*value_range)
+        return None
+
+    def _lookup_range_buckets(self, low, high):
+        # Returns buckets with items whose values are between low and 
+        # high. Values are found in sorted index and their items in value
+        # index which keeps them in order of block.
+        sorted_values = self._sorted_index[0]
+        try:
+            start = 0 if low is None else \
+                bisect.bisect_left(sorted_values, low)
+            end = len(sorted_values) if high is None else \
+                bisect.bisect_right(sorted_values, high)
+        except TypeError:
+            return None
+        return self._lookup_value_buckets(sorted_values[start:end])
+
+    def _plan_query(self, conditions):
+        # Uses value or type index for condition matching fewest items.
+        # Indexes are not built by queries, only those already built by
+        # lookups are used. Ranges of values are answered when sorted
+        # and value indexes are built.
+        # Other conditions are tested only on items found by index.
+        best = None
+        for position, condition in enumerate(conditions):
+            found_buckets = self._lookup_condition_buckets(condition)
+            if found_buckets is None:
+                continue
+            count = sum(len(bucket[0]) for bucket in found_buckets)
+            if best is None or count < best[0]:
+                best = (count, position, found_buckets)
+        if best is None:
+            return super()._plan_query(conditions)
+        _, position, found_buckets = best
+        return self._merge_buckets(found_buckets), \
+            conditions[:position] + conditions[position + 1:]
+
+    def _build_sorted_index(self):
+        # Returns values and items of block sorted by values.
+        # Sorting is stable, equal values keep order of block.
+        order, values = self._sort_positions(self._items)
+        sorted_values = [values[position] for position in order]
+        sorted_items = [self._items[position] for position in order]
+        return sorted_values, sorted_items
+
+    def _get_sorted_index(self):
+        # Returns sorted index building it when not yet built.
+        # Index is not kept if values are functions as they may change.
+        # Index is rebuilt if values were replaced since it was built.
+        if self._sorted_index is not None:
+            if self._is_sorted_index_current():
+                return self._sorted_index
+            self._sorted_index = None
+        sorted_index = self._build_sorted_index()
+        if self._indexed and self._are_values_static():
+            self._sorted_index = sorted_index
+        return sorted_index
+
+    def _is_sorted_index_current(self):
+        # Checks if values of items are same objects as in sorted index.
+        # Values replaced by set_value() are not the same objects.
+        sorted_values, sorted_items = self._sorted_index
+        return all(map(operator.is_, sorted_values, 
+            map(operator.methodcaller("_get_raw_value"), sorted_items)))
+
+    def get_sorted_items(self, key=None, reverse=False, tiebreak=None):
+        '''Returns items of block sorted by their values
+
+        key: Callable
+            Function applied to value of item to get its sort key.
+        reverse: Bool
+            Sorts items from largest to smallest, default: False.
+        tiebreak: Callable
+            Function applied to item to order items with equal keys.
+
+        Sorted order is remembered until items of block or their values
+        change, or `reset_indexes()` is called. Pass same key and 
+        tiebreak functions(not new lambdas) to reuse remembered order.'''
+        if key is None and not reverse and tiebreak is None:
+            return list(self._get_sorted_index()[1])
+        order_key = (key, reverse, tiebreak)
+        raw_values = [_item._get_raw_value() for _item in self._items]
+        sorted_order = self._sorted_orders.get(order_key)
+        # Values replaced by set_value() are not the same objects.
+        if sorted_order is None or \
+            not all(map(operator.is_, sorted_order[0], raw_values)):
+            sorted_items = super().get_sorted_items(key, reverse, tiebreak)
+            if self._indexed and self._are_values_static():
+                self._sorted_orders[order_key] = (raw_values, sorted_items)
+                if len(self._sorted_orders) > self._max_sorted_orders:
+                    self._sorted_orders.popitem(last=False)
+        else:
+            sorted_items = sorted_order[1]
+            self._sorted_orders.move_to_end(order_key)
+        return list(sorted_items)
+
+    def get_items_in_range(self, low, high):
+        '''Gets items with values between low and high(inclusive)'''
+        sorted_values, sorted_items = self._get_sorted_index()
+        start = bisect.bisect_left(sorted_values, low)
+        end = bisect.bisect_right(sorted_values, high)
+        return sorted_items[start:end]
+
+    def get_items_below(self, value):
+        '''Gets items with values less than value'''
+        sorted_values, sorted_items = self._get_sorted_index()
+        return sorted_items[:bisect.bisect_left(sorted_values, value)]
+
+    def get_items_above(self, value):
+        '''Gets items with values greater than value'''
+        sorted_values, sorted_items = self._get_sorted_index()
+        return sorted_items[bisect.bisect_right(sorted_values, value):]
+
+    def min_item(self):
+        '''Gets item with smallest value'''
+        sorted_items = self._get_sorted_index()[1]
+        if sorted_items: return sorted_items[0]
+
+    def max_item(self):
+        '''Gets item with largest value'''
+        sorted_items = self._get_sorted_index()[1]
+        if sorted_items: return sorted_items[-1]
+
+    def __iter__(self):
+        # Iterates items sorted by value without copying them.
+        return iter(self._get_sorted_index()[1])
+
+    def top_k(self, k, largest=True):
+        '''Gets k items with largest(or smallest) values.
+
+        Items are ordered same as `get_sorted_items(reverse=largest)` 
+        would order them. Sorted index is used if already built, 
+        otherwise heap of k items is used taking O(n log k).'''
+        if self._sorted_index is None:
+            return super().top_k(k, largest)
+        sorted_values, sorted_items = self._sorted_index
+        if not largest:
+            return sorted_items[:max(k, 0)]
+        # Items with equal values are taken in order of block.
+        top_items = []
+        end = len(sorted_values)
+        while end > 0 and len(top_items) < k:
+            start = bisect.bisect_left(sorted_values, sorted_values[end - 1], 
+                0, end)
+            top_items.extend(sorted_items[start:end])
+            end = start
+        return top_items[:max(k, 0)]
+
+
+
+    def _add_to_indexes(self, items):
+        # Updates built indexes with items appended to block.
+        if any(_item.is_value_dynamic() for _item in items):
+            # Indexes find out on rebuild that they cannot be kept.
+            self.reset_indexes()
+            return
+        if self._seqs is not None:
+            seqs = range(self._next_seq, self._next_seq + len(items))
+            self._seqs.extend(seqs)
+            self._next_seq += len(items)
+            if self._value_index is not None:
+                buckets, unhashable_bucket = self._value_index
+                for seq, _item in zip(seqs, items):
+                    self._add_to_bucket(buckets, unhashable_bucket, seq,
+                        _item)
+            if self._type_index is not None:
+                for seq, _item in zip(seqs, items):
+                    self._add_to_type_bucket(seq, _item)
+        if self._sorted_index is not None:
+            sorted_values, sorted_items = self._sorted_index
+            try:
+                for _item in items:
+                    _value = _item.get_value()
+                    # Item goes after equal values as it is last in block.
+                    position = bisect.bisect_right(sorted_values, _value)
+                    sorted_values.insert(position, _value)
+                    sorted_items.insert(position, _item)
+            except TypeError:
+                # Value cannot be compared, sorting will raise error.
+                self._sorted_index = None
+
+    def _remove_from_indexes(self, _item, position):
+        # Updates built indexes with item removed from position.
+        # Indexes get rebuilt if value of item changed after indexing.
+        _value = _item.get_value()
+        if self._seqs is not None:
+            seq = self._seqs.pop(position)
+            self._remove_from_type_index((seq,), (_item,))
+        if self._value_index is not None:
+            buckets, unhashable_bucket = self._value_index
+            try:
+                bucket = buckets.get(_value, unhashable_bucket)
+            except TypeError:
+                bucket = unhashable_bucket
+            bucket_position = bisect.bisect_left(bucket[0], seq)
+            if bucket_position == len(bucket[0]) or \
+                bucket[1][bucket_position] is not _item:
+                self.reset_indexes()
+                return
+            del bucket[0][bucket_position]
+            del bucket[1][bucket_position]
+            if not bucket[0] and bucket is not unhashable_bucket:
+                del buckets[_value]
+        if self._sorted_index is not None:
+            sorted_values, sorted_items = self._sorted_index
+            try:
+                start = bisect.bisect_left(sorted_values, _value)
+                end = bisect.bisect_right(sorted_values, _value)
+            except TypeError:
+                # Value cannot be compared(e.g None), index is rebuilt.
+                self._sorted_index = None
+                return
+            for sorted_position in range(start, end):
+                if sorted_items[sorted_position] is _item:
+                    del sorted_values[sorted_position]
+                    del sorted_items[sorted_position]
+                    break
+            else:
+                self._sorted_index = None
+
+    def _remove_from_type_index(self, seqs, items):
+        # Removes items with their sequence numbers from type index.
+        # Index gets rebuilt if class of object changed after indexing.
+        if self._type_index is None:
+            return
+        for seq, _item in zip(seqs, items):
+            bucket = self._type_index.get(_item.get_type(), ([], []))
+            bucket_position = bisect.bisect_left(bucket[0], seq)
+            if bucket_position == len(bucket[0]) or \
+                bucket[1][bucket_position] is not _item:
+                self._type_index = None
+                return
+            del bucket[0][bucket_position]
+            del bucket[1][bucket_position]
+
+    def extend(self, items):
+        '''Adds items to end of block.
+
+        Only the new items are checked and indexes of block get updated
+        with them instead of being rebuilt.'''
+        new_items = [self._item_type.to_item(_item) for _item in items]
+        new_items = self._prepare_new_items(new_items)
+        self._check_objects(self.extract_objects_from_items(new_items))
+        self._items.extend(new_items)
+        self._add_to_indexes(new_items)
+        self._on_items_changed()
+
+    def _prepare_new_items(self, items):
+        # Returns item objects to be added to block.
+        # Sub classes may replace items with other items.
+        return items
+
+    def add_item(self, _item):
+        '''Adds item to end of block'''
+        self.extend((_item,))
+
+    def remove_item(self, _item):
+        '''Removes first occurrence of item from block.
+
+        ValueError is raised if item is not in block.'''
+        try:
+            position = self._items.index(_item)
+        except ValueError:
+            raise ValueError("Item is not in block") from None
+        self._remove_from_indexes(_item, position)
+        del self._items[position]
+        self._forget_values((_item,))
+        self._on_items_changed()
+
+    def _forget_values(self, items):
+        # Discards values of removed items remembered by value cache.
+        # Cache would otherwise keep removed items alive.
+        if self._value_cache is not None:
+            self._value_cache.invalidate(items)
+
+    def remove_items_by_value(self, value):
+        '''Removes items matching value and returns them'''
+        removed_items = self.get_items_by_value(value)
+        if not removed_items:
+            return removed_items
+        removed_ids = set(map(id, removed_items))
+        if self._seqs is not None:
+            kept, removed = [], []
+            for pair in zip(self._seqs, self._items):
+                if id(pair[1]) in removed_ids:
+                    removed.append(pair)
+                else:
+                    kept.append(pair)
+            self._seqs = [seq for seq, _ in kept]
+            self._items[:] = [_item for _, _item in kept]
+            self._remove_from_type_index(*zip(*removed))
+        else:
+            self._items[:] = [_item for _item in self._items 
+                if id(_item) not in removed_ids]
+        self._remove_value_from_indexes(value, len(removed_items))
+        self._forget_values(removed_items)
+        self._on_items_changed()
+        return removed_items
+
+    def _remove_value_from_indexes(self, value, count):
+        # Updates built indexes with items of value removed.
+        # Count is number of items that were removed.
+        if self._value_index is not None:
+            buckets, unhashable_bucket = self._value_index
+            try:
+                bucket = buckets.pop(value, ([], []))
+            except TypeError:
+                bucket = ([], [])
+            if len(bucket[1]) != count:
+                # Items were also in unhashable bucket or index is stale.
+                self.reset_indexes()
+                return
+        if self._sorted_index is not None:
+            sorted_values, sorted_items = self._sorted_index
+            try:
+                start = bisect.bisect_left(sorted_values, value)
+                end = bisect.bisect_right(sorted_values, value)
+            except TypeError:
+                # Value cannot be compared(e.g None), index is rebuilt.
+                self._sorted_index = None
+                return
+            if end - start == count:
+                del sorted_values[start:end]
+                del sorted_items[start:end]
+            else:
+                self._sorted_index = None
+
+    def clear(self):
+        '''Removes all items from block'''
+        self._items = []
+        if self._value_cache is not None:
+            self._value_cache.invalidate()
+        self.reset_indexes()
+        self._on_items_changed()
+
+    @staticmethod
+    def _get_keys(block_object, key="value"):
+        # Returns items of block with their keys for comparing items.
+        items = block_object.get_items()
+        if callable(key):
+            keys = list(map(key, items))
+        elif key == "value":
+            keys = block_object._evaluate_values(items)
+        elif key == "object":
+            keys = block_object.extract_objects_from_items(items)
+        else:
+            err_msg = "key should be 'value', 'object' or callable not {!r}"
+            raise ValueError(err_msg.format(key))
+        return items, keys
+
+    def _get_item_key(self, _item, key="value"):
+        # Returns key of item, same as _get_keys() returns for items.
+        if callable(key):
+            return key(_item)
+        elif key == "value":
+            return self._value_getter(_item)
+        return _item.get_object()
+
+    def _filter_by_keys(self, items, keys, other_keys, keep_found, 
+    added_keys=None):
+        # Returns items whose keys are(or are not) in other keys.
+        # Only first item with each key is returned. Keys of returned 
+        # items are added to added keys which can be shared by calls.
+        key_set = util.KeyMap(other_keys)
+        if added_keys is None:
+            added_keys = util.KeyMap(())
+        filtered_items = []
+        for _item, _key in zip(items, keys):
+            if (_key in key_set) is keep_found and _key not in added_keys:
+                added_keys.add(_key)
+                filtered_items.append(_item)
+        return filtered_items
+
+    def _new_block(self, items, other=None):
+        # Creates block like this one from items of this and other block.
+        # Items of other block are checked unless checks of other block
+        # already cover checks of this block.
+        validate = other is not None and not (isinstance(other, Block) 
+            and self._is_checked_by(other))
+        return self._from_items(items, validate, **self._get_init_kwargs())
+
+    def union(self, other, key="value"):
+        '''Creates block with items of this block and items of other 
+        block whose keys are not in this block.
+
+        other: BaseBlock
+            Block whose items are compared with items of this block.
+        key: Str|Callable
+            'value', 'object' or function applied to item returning key
+            to compare items with, default: 'value'.
+
+        Keys are looked up in hash set, keys that cannot be hashed are 
+        looked up through sorting. Only first item with each key is kept
+        in result of this and other set operations. Items keep their 
+        order, items of this block come first. Items are shared with new 
+        block.'''
+        items, keys = self._get_keys(self, key)
+        other_items, other_keys = self._get_keys(other, key)
+        added_keys = util.KeyMap(())
+        new_items = self._filter_by_keys(items, keys, (), False, added_keys)
+        new_items.extend(self._filter_by_keys(other_items, other_keys, (), 
+            False, added_keys))
+        return self._new_block(new_items, other)
+
+    def intersection(self, other, key="value"):
+        '''Creates block with items whose keys are also in other block.
+
+        Only first item with each key is kept. See `union()` for 
+        arguments.'''
+        items, keys = self._get_keys(self, key)
+        other_keys = self._get_keys(other, key)[1]
+        return self._new_block(self._filter_by_keys(items, keys, other_keys,
+            True))
+
+    def difference(self, other, key="value"):
+        '''Creates block with items whose keys are not in other block.
+
+        Only first item with each key is kept. See `union()` for 
+        arguments.'''
+        items, keys = self._get_keys(self, key)
+        other_keys = self._get_keys(other, key)[1]
+        return self._new_block(self._filter_by_keys(items, keys, other_keys,
+            False))
+
+    def symmetric_difference(self, other, key="value"):
+        '''Creates block with items whose keys are in only one of blocks.
+
+        Items of this block come before items of other block. Only first 
+        item with each key is kept. See `union()` for arguments.'''
+        items, keys = self._get_keys(self, key)
+        other_items, other_keys = self._get_keys(other, key)
+        new_items = self._filter_by_keys(items, keys, other_keys, False)
+        new_items.extend(self._filter_by_keys(other_items, other_keys, keys, 
+            False))
+        return self._new_block(new_items, other)
+
+    def group_by(self, key=None, as_blocks=False):
+        '''Groups items of block by their keys in one pass.
+
+        key: None|Str|Callable
+            None or 'value' groups by values, 'object' groups by objects
+            and function is applied to item to get its key.
+        as_blocks: Bool
+            Returns mapping of blocks created when group is accessed
+            instead of lists of items, default: False.
+
+        Returns dict mapping keys to lists of items in order of block.
+        Keys need to be hashable. Value index is used when built.'''
+        groups = None
+        if key is None or key == "value":
+            groups = self._get_value_groups()
+        if groups is None:
+            groups = grouping.group_items(self._items, key, 
+                self._value_getter)
+        if not as_blocks:
+            return groups
+        init_kwargs = self._get_init_kwargs()
+        return grouping.GroupBlocks(groups, 
+            lambda items: self._from_items(items, False, **init_kwargs))
+
+    def _get_value_groups(self):
+        # Returns items grouped by values from value index if built.
+        # None is returned if index is not built or cannot be used.
+        if not self._value_index_built or self._value_index is None:
+            return None
+        buckets, unhashable_bucket = self._value_index
+        if unhashable_bucket[1]:
+            return None
+        return {_value: list(bucket[1]) for _value, bucket in buckets.items()}
+
+    def aggregate(self, key=None, aggregations=("count",)):
+        '''Aggregates values and objects of items grouped by keys.
+
+        aggregations: Iterator
+            Names of aggregations: 'count', 'sum', 'min', 'max', 'mean' 
+            of values and 'first', 'last' objects, default: ('count',).
+
+        Returns dict mapping keys to dicts of aggregation results. Items
+        are walked once, see `group_by()` for 'key' argument.'''
+        return grouping.aggregate_items(self._items, key, aggregations,
+            self._value_getter)
+
+    # Kinds of joins supported by join().
+    _join_types = ("inner", "left", "outer")
+
+    def join(self, other, on="value", how="inner", as_block=False, 
+    sort=False):
+        '''Pairs items of this block with items of other block.
+
+        other: BaseBlock
+            Block whose items are paired with items of this block.
+        on: Str|Callable
+            'value', 'object' or function applied to item returning key
+            items are paired by, default: 'value'.
+        how: Str
+            'inner' keeps only paired items, 'left' also keeps items of 
+            this block without pair and 'outer' also keeps items of both 
+            blocks without pair, default: 'inner'.
+        as_block: Bool
+            Returns block of items whose objects are pairs of objects
+            and values are keys, default: False.
+        sort: Bool
+            Pairs items walking both blocks sorted by values(merge join)
+            returning pairs in order of values, default: False. Only
+            supported when joining on values.
+
+        Returns list of (item, other_item) pairs with None in place of 
+        missing item. Pairs are in order of this block then in order of
+        other block unless 'sort' is True. Sorting falls back to order 
+        of blocks if values of blocks cannot be compared.'''
+        if how not in self._join_types:
+            err_msg = "how should be one of {} not {!r}"
+            raise ValueError(err_msg.format(self._join_types, how))
+        if sort and on != "value":
+            raise ValueError("sort is only supported when joining on values")
+        pairs = None
+        if sort:
+            try:
+                pairs = self._merge_join(other, how)
+            except TypeError:
+                # Values of blocks cannot be ordered against each other.
+                pairs = None
+        if pairs is None:
+            pairs = self._hash_join(other, on, how)
+        if not as_block:
+            return pairs
+        return self._pairs_to_block(pairs, on)
+
+    def _hash_join(self, other, on, how):
+        # Pairs items looking up keys of this block in keys of other.
+        items, keys = self._get_keys(self, on)
+        other_items, other_keys = self._get_keys(other, on)
+        other_map = util.KeyMap(other_keys, other_items)
+        pairs = []
+        for _item, _key in zip(items, keys):
+            matches = other_map.get(_key)
+            if matches is not None:
+                pairs.extend([(_item, other_item) for other_item in matches])
+            elif how != "inner":
+                pairs.append((_item, None))
+        if how == "outer":
+            key_map = util.KeyMap(keys)
+            pairs.extend([(None, other_item) for other_item, _key 
+                in zip(other_items, other_keys) if _key not in key_map])
+        return pairs
+
+    @staticmethod
+    def _get_sorted_values_items(block_object):
+        # Returns values and items of block sorted by values.
+        # Sorted index of block is used and built if block has one.
+        if isinstance(block_object, Block):
+            return block_object._get_sorted_index()
+        items = block_object.get_items()
+        order, values = block_object._sort_positions(items)
+        return [values[position] for position in order], \
+            [items[position] for position in order]
+
+    def _merge_join(self, other, how):
+        # Pairs items walking sorted values of both blocks together.
+        values, items = self._get_sorted_values_items(self)
+        other_values, other_items = self._get_sorted_values_items(other)
+        pairs = []
+        position, other_position = 0, 0
+        while position < len(values) and other_position < len(other_values):
+            _value, other_value = values[position], other_values[other_position]
+            if _value < other_value:
+                if how != "inner":
+                    pairs.append((items[position], None))
+                position += 1
+            elif other_value < _value:
+                if how == "outer":
+                    pairs.append((None, other_items[other_position]))
+                other_position += 1
+            elif _value == other_value:
+                # Pairs each item of equal values with each other.
+                end = bisect.bisect_right(values, _value, position)
+                other_end = bisect.bisect_right(other_values, _value, 
+                    other_position)
+                for _item in items[position:end]:
+                    pairs.extend([(_item, other_item) for other_item 
+                        in other_items[other_position:other_end]])
+                position, other_position = end, other_end
+            else:
+                # Values are partially ordered(e.g sets) or NaN.
+                err_msg = "values {!r} and {!r} are not ordered"
+                raise TypeError(err_msg.format(_value, other_value))
+        if how != "inner":
+            pairs.extend([(_item, None) for _item in items[position:]])
+        if how == "outer":
+            pairs.extend([(None, other_item) 
+                for other_item in other_items[other_position:]])
+        return pairs
+
+    def _pairs_to_block(self, pairs, on):
+        # Creates block of items with pairs of objects and their keys.
+        create_item = self._item_type._from_object_value
+        items = []
+        for _item, other_item in pairs:
+            _object = None if _item is None else _item.get_object()
+            other_object = None if other_item is None else \
+                other_item.get_object()
+            paired_item = _item if _item is not None else other_item
+            items.append(create_item((_object, other_object), 
+                self._get_item_key(paired_item, on)))
+        return Block._from_items(items, False, strict=False)
 
 
 class DeepBlock(Block):
@@ -235,42 +1471,109 @@ class DeepBlock(Block):
     
     values for block and items will be updated accordinly as similar
     to its parent class.'''
-    def __init__(self, items, _type=object, strict=False):
-        super().__init__(items, _type, strict)
+    def __init__(self, items, _type=object, strict=False, indexed=True,
+    value_cache=None, max_depth=None):
+        '''
+        items: Iterator
+            Collection of Item objects
+        _type: Type
+            Type of items this block expectes, default: object
+        strict: Bool
+            Prevents block from containing items containing other blocks.
+        indexed: Bool
+            Enables lazily built indexes for value lookups, default: True.
+        value_cache: ValueCache
+            Cache remembering values of items that are functions.
+        max_depth: Int
+            Levels of nested blocks to extract items from, default: None.
+            Items containing blocks deeper than this are kept as they are.
+        '''
+        # Depth is needed by _setup_items() called by parent initialiser.
+        self._max_depth = max_depth
+        super().__init__(items, _type, strict, indexed, value_cache)
+
+    def _get_init_kwargs(self):
+        init_kwargs = super()._get_init_kwargs()
+        init_kwargs["max_depth"] = self._max_depth
+        return init_kwargs
+
+    def is_fully_flat(self):
+        # Checks if items of block are guaranteed to not contain blocks.
+        return self._max_depth is None
     
     @classmethod
-    def _extract_deep_items(cls, _block):
-        # Extracts low level(deep) items from block object.
+    def _extract_deep_items(cls, items, max_depth=None):
+        # Extracts low level(deep) items from item objects.
         # This include item objects not containing block object.
-        # This method is called by _setup_items().
+        # This method is called by _set_items().
         # Take care when extensing it on sub classes.
+        return cls._walk_deep_items(items, max_depth)[0]
+
+    @classmethod
+    def _walk_deep_items(cls, items, max_depth=None):
+        # Returns deep items and deepest level of nested blocks walked.
+        #
+        # Nested blocks are walked with explicit stack instead of 
+        # recursion. Items of each block are extracted once per call
+        # even if block is shared by many items.
         deep_items = []
-        # Gets item objects of block(not sorted by value)
-        items = _block.get_items()
-        for _item in items: 
-            # Gets value for item.
-            _object = _item.get_value() 
-            # Checks if object of reference is block object.
-            # Uses recursion if the object is block object.
-            # Recursion continues until non block item is found.
-            if isinstance(_object, Block):
-                # Extract non block items from the block object.
-                block_deep_items = cls._extract_deep_items(_object)
-                deep_items.extend(block_deep_items)
+        deepest = 0
+        # Extracted items of blocks keyed by block id and depth.
+        extracted = {}
+        # Ids of blocks currently being extracted(used to find cycles).
+        active_ids = set()
+        # Frames of stack are (items iterator, key, results, depth).
+        stack = [(iter(items), None, deep_items, 0)]
+        while stack:
+            items_iter, key, results, depth = stack[-1]
+            for _item in items_iter:
+                # Gets value for item.
+                _object = _item.get_value()
+                # Items of blocks after max depth are kept as they are.
+                if not isinstance(_object, Block) or depth == max_depth:
+                    results.append(_item)
+                    continue
+                # Depth matters only when extraction is limited.
+                if max_depth is None:
+                    object_key = (id(_object), None)
+                else:
+                    object_key = (id(_object), depth)
+                if object_key in extracted:
+                    results.extend(extracted[object_key])
+                elif id(_object) in active_ids:
+                    err_msg = "Block object cannot be nested within itself"
+                    raise ValueError(err_msg)
+                elif isinstance(_object, DeepBlock) and \
+                    _object.is_fully_flat():
+                    # Deep block already extracted its items.
+                    deepest = max(deepest, depth + 1)
+                    results.extend(_object.get_items())
+                else:
+                    # Extracts items of nested block before continuing.
+                    active_ids.add(id(_object))
+                    deepest = max(deepest, depth + 1)
+                    stack.append((iter(_object.get_items()), object_key, 
+                        [], depth + 1))
+                    break
             else:
-                # This item does not contain block object
-                deep_items.append(_item)
-        return deep_items
+                # All items of frame were extracted.
+                stack.pop()
+                if key is not None:
+                    active_ids.discard(key[0])
+                    extracted[key] = results
+                    stack[-1][2].extend(results)
+        return deep_items, deepest
 
-    def _setup_items(self, items,):
+    def _set_items(self, items, validate=True):
         # Setup deep items overiding existing item objects.
-        # Ensures all items are really item objects.
         # _extract_deep_items() expectes item objects.
-        self._items = self._to_items(self._items)
-        _items = self._extract_deep_items(self)
-        # Now asks super class to setup items as usual.
-        # Items values will be updated as expected.
-        super()._setup_items(_items)
+        _items = self._extract_deep_items(items, self._max_depth)
+        # Now asks super class to set items as usual.
+        super()._set_items(_items, validate)
+
+    def _prepare_new_items(self, items):
+        # Extracts deep items from items being added to block.
+        return self._extract_deep_items(items, self._max_depth)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+import collections
+import time
+
+
+# Marks value that is not remembered by cache.
+_missing = object()
+
+
+class ValueCache():
+    '''Remembers values of items whose values are functions.
+
+    Value of item is computed on first access and reused for later
+    accesses until invalidated. Cache can be bounded by number of items
+    (least recently used are discarded first) and by time to live.
+
+    Items with values that are not functions are not cached as getting
+    their values is already cheap.'''
+    # Function used to get current time for time to live.
+    _timer = time.monotonic
+
+    def __init__(self, maxsize=None, ttl=None) -> None:
+        '''
+        maxsize: Int
+            Maximum number of values to remember, default: None.
+        ttl: Float
+            Seconds remembered value is valid for, default: None.
+        '''
+        self._maxsize = maxsize
+        self._ttl = ttl
+        # Entries are (item, value, time) keyed by id of item.
+        # Item is kept to prevent its id from being reused.
+        self._entries = collections.OrderedDict()
+
+    def get_maxsize(self):
+        return self._maxsize
+
+    def get_ttl(self):
+        return self._ttl
+
+    def _is_entry_valid(self, entry):
+        # Checks if entry has not expired.
+        if self._ttl is None:
+            return True
+        return self._timer() - entry[2] < self._ttl
+
+    def get_value(self, _item):
+        '''Gets value of item computing it if not remembered'''
+        if not _item.is_value_dynamic():
+            return _item.get_value()
+        _value = self.get_cached(_item, _missing)
+        if _value is _missing:
+            _value = _item.get_value()
+            self.set_cached(_item, _value)
+        return _value
+
+    def get_cached(self, _item, default=None):
+        '''Gets remembered value of item or default if not remembered'''
+        key = id(_item)
+        entry = self._entries.get(key)
+        if entry is None or not self._is_entry_valid(entry):
+            return default
+        if self._maxsize is not None:
+            self._entries.move_to_end(key)
+        return entry[1]
+
+    def set_cached(self, _item, _value):
+        '''Remembers value of item computed elsewhere'''
+        key = id(_item)
+        self._entries[key] = (_item, _value, self._timer())
+        if self._maxsize is not None:
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, items=None):
+        '''Discards remembered values of items or of all items'''
+        if items is None:
+            self._entries.clear()
+            return
+        for _item in items:
+            self._entries.pop(id(_item), None)
+
+    def __contains__(self, _item):
+        return id(_item) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
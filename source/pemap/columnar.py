@@ -0,0 +1,256 @@
+from pemap import block as block_
+
+import numbers
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Largest integer float array keeps exactly.
+_max_exact_float_int = 2 ** 53
+# Range of integers in array of 64 bits integers.
+_min_int, _max_int = -2 ** 63, 2 ** 63 - 1
+
+
+class ColumnarBlock(block_.Block):
+    '''Varient of Block keeping numeric values in NumPy array.
+
+    Values of items are kept in contiguous NumPy array next to array of
+    the items. Queries on values then run as vectorized operations
+    instead of calling each item from python. Same item objects are
+    returned as with Block.
+
+    Columns are only used when all values are numbers(bool, int or
+    float). Blocks with other values or with values being functions
+    use same methods as Block.
+
+    NumPy is required to create instances of this class.'''
+
+    def __init__(self, items, _type=object, strict=True, indexed=True,
+    value_cache=None):
+        '''
+        items: Iterator
+            Collection of Item objects
+        _type: Type
+            Type of items this block expectes, default: object
+        strict: Bool
+            Prevents block from containing items containing other blocks.
+        indexed: Bool
+            Enables lazily built indexes for value lookups, default: True.
+        value_cache: ValueCache
+            Cache remembering values of items that are functions.
+        '''
+        if numpy is None:
+            err_msg = "NumPy is required for '{}'"
+            raise ImportError(err_msg.format(self.__class__.__name__))
+        # Columns are built on first query like other indexes.
+        self._columns = None
+        self._columns_built = False
+        # Whether values array holds integers float cannot represent.
+        self._large_ints = False
+        super().__init__(items, _type, strict, indexed, value_cache)
+
+    def reset_indexes(self):
+        super().reset_indexes()
+        self._on_items_changed()
+
+    def _on_items_changed(self):
+        # Arrays are rebuilt on next query as they have fixed size.
+        super()._on_items_changed()
+        self._columns = None
+        self._columns_built = False
+        self._large_ints = False
+
+    def _is_sorted_index_current(self):
+        # Columns hold same values sorted index was built from.
+        current = super()._is_sorted_index_current()
+        if not current:
+            self._columns = None
+            self._columns_built = False
+            self._large_ints = False
+        return current
+
+    def _build_columns(self):
+        # Returns items array, values array and values list.
+        # Values list keeps values with their original types.
+        # None is returned if values are not all numbers.
+        values = []
+        for _item in self._items:
+            if _item.is_value_dynamic():
+                return None
+            _value = _item.get_value()
+            if not isinstance(_value, numbers.Real):
+                return None
+            values.append(_value)
+        values_column = numpy.array(values)
+        # Large integers result in arrays of python objects.
+        if values_column.dtype.kind not in "biuf":
+            return None
+        self._large_ints = any(isinstance(_value, numbers.Integral) and 
+            abs(_value) > _max_exact_float_int for _value in values)
+        if self._large_ints and values_column.dtype.kind == "f":
+            # Integers mixed with floats got rounded by float array.
+            return None
+        # Items are assigned to prevent numpy from inspecting them.
+        items_column = numpy.empty(len(self._items), dtype=object)
+        items_column[:] = self._items
+        return items_column, values_column, values
+
+    def _get_columns(self):
+        # Returns columns building them when not yet built.
+        if not self._columns_built:
+            self._columns = self._build_columns()
+            self._columns_built = True
+        return self._columns
+
+    def _is_number(self, _object):
+        # Checks if object compares with values array same as it would
+        # with values. NumPy compares integers with floats as floats.
+        if isinstance(_object, numbers.Integral):
+            if self._get_columns()[1].dtype.kind == "f":
+                return abs(_object) <= _max_exact_float_int
+            return _min_int <= _object <= _max_int
+        if isinstance(_object, numbers.Real):
+            return not self._large_ints
+        return False
+
+    def _get_values_mask(self, values):
+        # Returns mask of items matching any of values.
+        # None is returned if mask cannot be created for values.
+        columns = self._get_columns()
+        if columns is None:
+            return None
+        if not isinstance(values, self._indexable_values_types):
+            return None
+        values = list(values)
+        if not all(self._is_number(_value) for _value in values):
+            return None
+        return numpy.isin(columns[1], values)
+
+    def _get_value_mask(self, value):
+        # Returns mask of items matching value.
+        columns = self._get_columns()
+        if columns is None or not self._is_number(value):
+            return None
+        return columns[1] == value
+
+    def _get_truth_mask(self):
+        # Returns mask of items whose values evaluates to true.
+        columns = self._get_columns()
+        if columns is None:
+            return None
+        return columns[1] != 0
+
+    def _mask_items(self, mask):
+        # Returns items selected by mask in order of block.
+        return self._get_columns()[0][mask].tolist()
+
+    def _mask_item(self, mask):
+        # Returns first item selected by mask.
+        positions = numpy.flatnonzero(mask)
+        if len(positions): return self._items[positions[0]]
+
+    def get_values(self, executor=None):
+        '''Gets values of block item objects'''
+        columns = self._get_columns()
+        if columns is None:
+            return super().get_values(executor)
+        # Array may have converted types of values(e.g bool to int).
+        return list(columns[2])
+
+    def get_items_by_value(self, value):
+        '''Gets item objects matching value'''
+        mask = self._get_value_mask(value)
+        if mask is None:
+            return super().get_items_by_value(value)
+        return self._mask_items(mask)
+
+    def get_item_by_value(self, value):
+        '''Gets first item matching value'''
+        mask = self._get_value_mask(value)
+        if mask is None:
+            return super().get_item_by_value(value)
+        return self._mask_item(mask)
+
+    def get_items_by_values(self, values):
+        '''Gets item objects matching any of values'''
+        mask = self._get_values_mask(values)
+        if mask is None:
+            return super().get_items_by_values(values)
+        return self._mask_items(mask)
+
+    def get_item_by_values(self, values):
+        '''Gets first item matching any of values'''
+        mask = self._get_values_mask(values)
+        if mask is None:
+            return super().get_item_by_values(values)
+        return self._mask_item(mask)
+
+    def get_true_items(self):
+        # Gets items that evaluates to true.
+        mask = self._get_truth_mask()
+        if mask is None:
+            return super().get_true_items()
+        return self._mask_items(mask)
+
+    def get_true_item(self):
+        # Gets first item evaluating to true.
+        mask = self._get_truth_mask()
+        if mask is None:
+            return super().get_true_item()
+        return self._mask_item(mask)
+
+    def get_false_items(self):
+        # Gets items that evaluates to false.
+        mask = self._get_truth_mask()
+        if mask is None:
+            return super().get_false_items()
+        return self._mask_items(~mask)
+
+    def get_false_item(self):
+        # Gets first item evaluating to false.
+        mask = self._get_truth_mask()
+        if mask is None:
+            return super().get_false_item()
+        return self._mask_item(~mask)
+
+    def _build_sorted_index(self):
+        # Sorts values with stable argsort keeping order of equal values.
+        columns = self._get_columns()
+        if columns is None:
+            return super()._build_sorted_index()
+        items_column, values_column, values = columns
+        order = numpy.argsort(values_column, kind="stable")
+        sorted_values = [values[position] for position in order.tolist()]
+        return sorted_values, items_column[order].tolist()
+
+    def top_k(self, k, largest=True):
+        '''Gets k items with largest(or smallest) values.
+
+        Items are selected with partitioning of values array taking O(n)
+        followed by sorting of the selected items.'''
+        columns = self._get_columns()
+        if columns is None or self._sorted_index is not None or \
+            k >= len(self._items) or k <= 0:
+            return super().top_k(k, largest)
+        items_column, values_column, _ = columns
+        count = len(values_column)
+        if largest:
+            threshold = numpy.partition(values_column, count - k)[count - k]
+            selected = numpy.flatnonzero(values_column > threshold)
+        else:
+            threshold = numpy.partition(values_column, k - 1)[k - 1]
+            selected = numpy.flatnonzero(values_column < threshold)
+        # Items equal to threshold are taken in order of block.
+        equal = numpy.flatnonzero(values_column == threshold)
+        positions = numpy.concatenate((selected, equal[:k - len(selected)]))
+        selected_values = values_column[positions]
+        if largest:
+            # Reversing order of (value, -position) gives largest values
+            # first while keeping order of block for equal values.
+            order = numpy.lexsort((-positions, selected_values))[::-1]
+        else:
+            order = numpy.lexsort((positions, selected_values))
+        return items_column[positions[order]].tolist()
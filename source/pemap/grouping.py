@@ -0,0 +1,145 @@
+import collections.abc
+import operator
+
+
+# Aggregations supported by aggregate_items().
+aggregation_names = ("count", "sum", "min", "max", "mean", "first", "last")
+# Aggregations needing values of items.
+_value_aggregations = frozenset(("sum", "min", "max", "mean"))
+
+
+def get_key_function(key=None, value_getter=None):
+    '''Returns function getting key of item for grouping items.
+
+    key: None|Str|Callable
+        None or 'value' groups by values, 'object' groups by objects
+        and function is applied to item to get its key.
+    value_getter: Callable
+        Function getting value of item, default: calls get_value().'''
+    if callable(key):
+        return key
+    elif key is None or key == "value":
+        return value_getter or operator.methodcaller("get_value")
+    elif key == "object":
+        return operator.methodcaller("get_object")
+    err_msg = "key should be 'value', 'object' or callable not {!r}"
+    raise ValueError(err_msg.format(key))
+
+def group_items(items, key=None, value_getter=None):
+    '''Groups items by their keys in one pass over items.
+
+    Returns dict mapping keys to lists of items in order they were
+    iterated. Keys need to be hashable. See `get_key_function()` for
+    arguments.'''
+    get_key = get_key_function(key, value_getter)
+    groups = {}
+    for _item in items:
+        _key = get_key(_item)
+        group = groups.get(_key)
+        if group is None:
+            groups[_key] = [_item]
+        else:
+            group.append(_item)
+    return groups
+
+def aggregate_items(items, key=None, aggregations=("count",),
+value_getter=None):
+    '''Aggregates values and objects of items grouped by their keys.
+
+    aggregations: Iterator
+        Names of aggregations: 'count', 'sum', 'min', 'max', 'mean' of
+        values and 'first', 'last' objects, default: ('count',).
+
+    Returns dict mapping keys to dicts of aggregation results. Items are
+    iterated once without being kept, values are evaluated at most once
+    for each item and only if aggregations need them. See
+    `get_key_function()` for other arguments.'''
+    aggregations = tuple(aggregations)
+    for name in aggregations:
+        if name not in aggregation_names:
+            err_msg = "Unknown aggregation {!r}, expected one of {}"
+            raise ValueError(err_msg.format(name, aggregation_names))
+    if value_getter is None:
+        value_getter = operator.methodcaller("get_value")
+    # Value is used as key without getting it again.
+    by_value = key is None or key == "value"
+    get_key = None if by_value else get_key_function(key, value_getter)
+    need_values = by_value or \
+        not _value_aggregations.isdisjoint(aggregations)
+    need_sum = "sum" in aggregations or "mean" in aggregations
+    need_min = "min" in aggregations
+    need_max = "max" in aggregations
+    need_last = "last" in aggregations
+    # State of group is [count, sum, min, max, first item, last item].
+    states = {}
+    for _item in items:
+        _value = value_getter(_item) if need_values else None
+        _key = _value if by_value else get_key(_item)
+        state = states.get(_key)
+        if state is None:
+            states[_key] = [1, _value if need_sum else 0, _value, _value,
+                _item, _item]
+            continue
+        state[0] += 1
+        if need_sum:
+            state[1] += _value
+        if need_min and _value < state[2]:
+            state[2] = _value
+        if need_max and _value > state[3]:
+            state[3] = _value
+        if need_last:
+            state[5] = _item
+    return {_key: _finish_aggregations(state, aggregations)
+        for _key, state in states.items()}
+
+def _finish_aggregations(state, aggregations):
+    # Returns results of aggregations from state of group.
+    count, total, minimum, maximum, first_item, last_item = state
+    results = {}
+    for name in aggregations:
+        if name == "count":
+            results[name] = count
+        elif name == "sum":
+            results[name] = total
+        elif name == "min":
+            results[name] = minimum
+        elif name == "max":
+            results[name] = maximum
+        elif name == "mean":
+            results[name] = total / count
+        elif name == "first":
+            results[name] = first_item.get_object()
+        else:
+            results[name] = last_item.get_object()
+    return results
+
+
+class GroupBlocks(collections.abc.Mapping):
+    '''Maps keys of groups to blocks created on first access.
+
+    Items of groups are kept as lists and block of group is only
+    created when group is accessed.'''
+
+    def __init__(self, groups, create_block) -> None:
+        '''
+        groups: Dict
+            Lists of items keyed by keys of groups.
+        create_block: Callable
+            Function creating block from list of items.
+        '''
+        self._groups = groups
+        self._create_block = create_block
+        self._blocks = {}
+
+    def __getitem__(self, key):
+        block_object = self._blocks.get(key)
+        if block_object is None:
+            block_object = self._create_block(self._groups[key])
+            self._blocks[key] = block_object
+        return block_object
+
+    def __iter__(self):
+        return iter(self._groups)
+
+    def __len__(self):
+        return len(self._groups)
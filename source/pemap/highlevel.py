@@ -1,13 +1,23 @@
 from pemap import block
-from pemap import items
+from pemap import grouping
+from pemap import items as items_
+from pemap import query
+from pemap import util
 from pemap import value
 
+import heapq
+import operator
+
 
 __all__ = [
     "create_item",
+    "create_compact_item",
     "create_block",
     "create_deep_block",
     "create_mapping",
+    "create_block_from_pairs",
+    "create_block_from_dict",
+    "create_block_from_columns",
 
     "items_to_tuple",
     "items_to_dict",
@@ -15,6 +25,9 @@ __all__ = [
     "flatten_items",
     "extract_objects",
     "sort_items_by_value",
+    "find_top_items",
+    "group_items",
+    "aggregate_items",
 
     "find_items_by_values",
     "find_item_by_values",
@@ -25,7 +38,16 @@ __all__ = [
     "find_true_item",
     "find_true_items",
     "find_false_item",
-    "find_false_items"
+    "find_false_items",
+
+    "find_items_by_query",
+    "find_item_by_query",
+
+    "iter_items",
+    "iter_items_by_values",
+    "iter_items_by_type",
+    "iter_true_items",
+    "iter_false_items"
 ]
 
 # Default value to use when value not provided.
@@ -43,7 +65,16 @@ def create_item(_object, value=default_value, **kwargs):
     strict: Bool
         Forces `_reference` argumnet to be strictly Reference instance.
     '''
-    return items.Item(_object, value, **kwargs)
+    return items_.Item(_object, value, **kwargs)
+
+def create_compact_item(_object, value=default_value, **kwargs):
+    '''Creates compact item object containing object and its value.
+
+    Compact item stores object and value without wrapping them, using
+    less memory than item from `create_item()`. Arguments are same as 
+    for `create_item()`.
+    '''
+    return items_.CompactItem(_object, value, **kwargs)
 
 def create_block(items, **kwargs):
     '''Creates block object with value from items.
@@ -87,6 +118,8 @@ def create_deep_block(items, **kwargs):
         'median'.
     update_values: Bool
         Enables and disables updating of block and items values.
+    max_depth: Int
+        Levels of nested blocks to extract items from, default: None.
     
     Deep block is neccessay when items can contain block object
     which may contain other items. This function results in block object
@@ -97,9 +130,10 @@ def create_deep_block(items, **kwargs):
     block object. That makes it harder to access deep or low-level items
     within the nested block objects.
 
-    Note that extracted deep/low-level items are only copies of original.
-    Block object first copies items before performing anything on them.
-    Getting items throuh `.get_items()` will only return the copies.
+    Note that extracted deep/low-level items are same item objects as
+    in nested blocks, they are shared instead of being copied. Use
+    `.copy_items()` to get copies, copies share objects and values
+    until changed. Pass `deep=True` to get fully independent copies.
     '''
     return block.DeepBlock(items, **kwargs)
 
@@ -136,6 +170,38 @@ def create_mapping(items, flatten=False, **kwargs):
         return create_block(items, **kwargs)
 
 
+def create_block_from_pairs(pairs, flatten=False, **kwargs):
+    '''Creates block object from (value, object) pairs.
+
+    pairs: Iterator
+        Pairs of value and object, same as from `items_to_tuple()`.
+    flatten: Bool
+        Enables and disables creating deep block instead of block.
+    validate: Bool
+        Enables checking objects against type and 'strict' of block.
+    item_type: Type
+        Item class used to create items, e.g CompactItem.
+
+    Items are created directly from pairs without taking values from 
+    objects. This is faster than creating items before block.'''
+    block_type = block.DeepBlock if flatten else block.Block
+    return block_type.from_pairs(pairs, **kwargs)
+
+def create_block_from_dict(mapping, flatten=False, **kwargs):
+    '''Creates block object from dict mapping values to objects.
+
+    See `create_block_from_pairs()` for other arguments.'''
+    block_type = block.DeepBlock if flatten else block.Block
+    return block_type.from_dict(mapping, **kwargs)
+
+def create_block_from_columns(values, objects, flatten=False, **kwargs):
+    '''Creates block object from parallel values and objects.
+
+    See `create_block_from_pairs()` for other arguments.'''
+    block_type = block.DeepBlock if flatten else block.Block
+    return block_type.from_columns(values, objects, **kwargs)
+
+
 ######################################################################
 # Functions defined after here internally creates block object.
 # It may be better to manually create block object for performance.
@@ -143,19 +209,34 @@ def create_mapping(items, flatten=False, **kwargs):
 # Manually creating block object could result in few more advantages.
 ######################################################################
 
+def _is_mapping(items, flatten=False):
+    # Checks if items is block object that can be used as it is.
+    # Blocks without indexes(e.g MMapBlock) still answer queries with
+    # their own scans instead of being iterated in sorted order.
+    if flatten:
+        return isinstance(items, block.DeepBlock)
+    return isinstance(items, block.BaseBlock)
+
+def _get_mapping(items, flatten=False):
+    # Returns block object for items reusing items if already block.
+    # Reused block keeps indexes it built on previous calls.
+    if _is_mapping(items, flatten):
+        return items
+    return create_mapping(items, flatten=flatten, strict=False)
+
 def items_to_tuple(items, flatten=False):
     '''Convert items into map like tuple'''
-    block_object = create_mapping(items, flatten=flatten, strict=False)
+    block_object = _get_mapping(items, flatten=flatten)
     return block_object.to_tuple()
 
 def items_to_dict(items, flatten=False):
     '''Convert items into multi dict'''
-    block_object = create_mapping(items, flatten=flatten, strict=False)
+    block_object = _get_mapping(items, flatten=flatten)
     return block_object.to_dict()
 
 
 
-def flatten_items(items):
+def flatten_items(items, max_depth=None):
     '''Flattens items by exposing items within nested block objects.
     
     This function removes any block object within items while retaining
@@ -170,61 +251,180 @@ def flatten_items(items):
     Block can contain items containing other blocks and items can contain
     block objects. But items containg other items is something that wasnt
     planned for this library.
-    '''
-    block_object = create_deep_block(items)
-    return block_object.get_items()
 
-def sort_items_by_value(items):
-    '''Sorts items based on their values'''
-    block_object = create_block(items, strict=False)
-    return block_object.get_sorted_items()
+    'max_depth' limits levels of nested blocks to extract items from.
+    Items containing blocks deeper than that level are kept.
+    '''
+    items = [items_.Item.to_item(_item) for _item in items]
+    return block.DeepBlock._extract_deep_items(items, max_depth)
+
+def sort_items_by_value(items, key=None, reverse=False, tiebreak=None):
+    '''Sorts items based on their values.
+
+    key: Callable
+        Function applied to value of item to get its sort key.
+    reverse: Bool
+        Sorts items from largest to smallest, default: False.
+    tiebreak: Callable
+        Function applied to item to order items with equal keys.'''
+    block_object = _get_mapping(items)
+    return block_object.get_sorted_items(key, reverse, tiebreak)
+
+def find_top_items(items, k, largest=True, flatten=False):
+    '''Finds k items with largest(or smallest) values.
+
+    Items are ordered from largest value when 'largest' is True. Only k
+    items are kept at a time making this suitable for generators with
+    many items. Block objects select items with `Block.top_k()`.'''
+    if _is_mapping(items, flatten):
+        return items.top_k(k, largest)
+    value_getter = operator.methodcaller("get_value")
+    if largest:
+        return heapq.nlargest(k, iter_items(items, flatten), value_getter)
+    return heapq.nsmallest(k, iter_items(items, flatten), value_getter)
+
+def group_items(items, key=None, flatten=False):
+    '''Groups items by their keys(values by default).
+
+    Returns dict mapping keys to lists of items. Items are iterated once
+    making this suitable for generators. See `Block.group_by()` for 
+    'key' argument.'''
+    # Only Block and its sub classes group their items.
+    if _is_mapping(items, flatten) and isinstance(items, block.Block):
+        return items.group_by(key)
+    return grouping.group_items(iter_items(items, flatten), key)
+
+def aggregate_items(items, key=None, aggregations=("count",), 
+flatten=False):
+    '''Aggregates values and objects of items grouped by their keys.
+
+    Items are iterated once without being kept. See `Block.aggregate()`
+    for arguments.'''
+    if _is_mapping(items, flatten) and isinstance(items, block.Block):
+        return items.aggregate(key, aggregations)
+    return grouping.aggregate_items(iter_items(items, flatten), key,
+        aggregations)
 
 def extract_objects(items, flatten=False):
     '''Extracts objects within items'''
     #return [_item.get_object() for _item in items]
-    block_object = create_mapping(items, flatten=flatten, strict=False)
+    block_object = _get_mapping(items, flatten=flatten)
     return block_object.get_objects()
 
 
 
 def find_items_by_values(items, values, flatten=False):
     '''Finds items with values matching any of values'''
-    block_object = create_mapping(items, flatten=flatten, strict=False)
-    return block_object.get_items_by_values(values)
+    if _is_mapping(items, flatten):
+        return items.get_items_by_values(values)
+    return list(iter_items_by_values(items, values, flatten))
 
 def find_item_by_values(items, values, flatten=False):
     '''Finds item with value matching any of values'''
-    block_object = create_mapping(items, flatten=flatten, strict=False)
-    return block_object.get_item_by_values(values)
+    if _is_mapping(items, flatten):
+        return items.get_item_by_values(values)
+    return next(iter_items_by_values(items, values, flatten), None)
 
 
 
 def find_items_by_type(items, _type, flatten=False):
     '''Finds items with type matching provided type'''
-    block_object = create_mapping(items, flatten=flatten, strict=False)
-    return block_object.get_items_by_type(_type)
+    if _is_mapping(items, flatten):
+        return items.get_items_by_type(_type)
+    return list(iter_items_by_type(items, _type, flatten))
 
 def find_item_by_type(items, _type, flatten=False):
     '''Finds item with type matching provided type'''
-    block_object = create_mapping(items, flatten=flatten, strict=False)
-    return block_object.get_item_by_type(_type)
+    if _is_mapping(items, flatten):
+        return items.get_item_by_type(_type)
+    return next(iter_items_by_type(items, _type, flatten), None)
 
 def find_true_items(items, flatten=False):
     '''Gets items that evaluates to true.'''
-    block_object = create_mapping(items, flatten=flatten, strict=False)
-    return block_object.get_true_items()
+    if _is_mapping(items, flatten):
+        return items.get_true_items()
+    return list(iter_true_items(items, flatten))
 
 def find_true_item(items, flatten=False):
     '''Gets first item evaluating to true.'''
-    block_object = create_mapping(items, flatten=flatten, strict=False)
-    return block_object.get_true_item()
+    if _is_mapping(items, flatten):
+        return items.get_true_item()
+    return next(iter_true_items(items, flatten), None)
 
 def find_false_items(items, flatten=False):
     '''Gets items that evaluates to false.'''
-    block_object = create_mapping(items, flatten=flatten, strict=False)
-    return block_object.get_false_items()
+    if _is_mapping(items, flatten):
+        return items.get_false_items()
+    return list(iter_false_items(items, flatten))
 
 def find_false_item(items, flatten=False):
     '''Gets first item evaluating to false.'''
-    block_object = create_mapping(items, flatten=flatten, strict=False)
-    return block_object.get_false_item()
\ No newline at end of file
+    if _is_mapping(items, flatten):
+        return items.get_false_item()
+    return next(iter_false_items(items, flatten), None)
+
+def find_items_by_query(items, condition, limit=None, flatten=False):
+    '''Finds items matching condition, see `Block.query()`.
+
+    Items are tested in one pass and iteration stops once 'limit' items
+    were found.'''
+    if _is_mapping(items, flatten):
+        return items.query(condition, limit)
+    return query.select_items(iter_items(items, flatten), (condition,), 
+        limit)
+
+def find_item_by_query(items, condition, flatten=False):
+    '''Finds first item matching condition'''
+    if _is_mapping(items, flatten):
+        return items.query_first(condition)
+    return next(query.iter_matches(iter_items(items, flatten), 
+        (condition,)), None)
+
+
+######################################################################
+# Functions defined after here iterate items without block object.
+# Items are processed one at a time as they are requested.
+# They work with any iterable including generators without end.
+######################################################################
+
+def iter_items(items, flatten=False):
+    '''Iterates item objects from items.
+
+    Non item objects are converted to item objects as block would do.
+    When 'flatten' is True, items containing block object are replaced
+    by items within that block object. Items of block objects are
+    iterated in order of block.'''
+    if isinstance(items, block.BaseBlock):
+        items = items.get_items()
+    for _item in items:
+        _item = items_.Item.to_item(_item)
+        if flatten and isinstance(_item.get_value(), block.Block):
+            yield from block.DeepBlock._extract_deep_items([_item])
+        else:
+            yield _item
+
+def iter_items_by_values(items, values, flatten=False):
+    '''Iterates items with values matching any of values'''
+    for _item in iter_items(items, flatten):
+        if _item.get_value() in values:
+            yield _item
+
+def iter_items_by_type(items, _type, flatten=False):
+    '''Iterates items with type matching provided type'''
+    # Each class of objects is checked against type only once.
+    matches_type = util.get_type_matcher(_type)
+    for _item in iter_items(items, flatten):
+        if matches_type(_item.get_object()):
+            yield _item
+
+def iter_true_items(items, flatten=False):
+    '''Iterates items that evaluates to true.'''
+    for _item in iter_items(items, flatten):
+        if _item.get_value():
+            yield _item
+
+def iter_false_items(items, flatten=False):
+    '''Iterates items that evaluates to false.'''
+    for _item in iter_items(items, flatten):
+        if not _item.get_value():
+            yield _item
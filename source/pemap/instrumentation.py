@@ -0,0 +1,294 @@
+'''Opt-in counters and timings of items and blocks operations.
+
+Instrumentation is disabled by default and costs nothing then, methods
+of items and blocks are only replaced with instrumented ones while it
+is enabled. Originals are put back by `disable()`.
+
+Counters:
+    value_evaluations: calls getting value of item.
+    dynamic_value_evaluations: evaluations of values that are functions.
+    item_constructions: items created with objects and values setup.
+    item_copies: items created by `copy()`, sharing objects and values.
+    full_scans: queries that went through every item or value.
+    early_exit_scans: queries scanning items until first match.
+    index_hits: queries answered by value, type or sorted index.
+    index_builds: value, type and sorted indexes built.
+    flattens: calls extracting items of nested blocks.
+    flatten_depth: deepest level of nested blocks extracted.
+
+Calls of public methods of blocks and functions of highlevel module
+are timed and passed to hooks added with `add_hook()`.'''
+from pemap import asynchronous
+from pemap import block as block_
+from pemap import columnar
+from pemap import highlevel
+from pemap import items as items_
+from pemap import mapped
+from pemap import partitioned
+
+import collections
+import contextlib
+import functools
+import inspect
+import sys
+import time
+
+
+# Classes whose public methods get timed.
+block_types = (block_.BaseBlock, block_.Block, block_.DeepBlock,
+    columnar.ColumnarBlock, asynchronous.AsyncBlock, mapped.MMapBlock,
+    partitioned.PartitionedBlock)
+# Function used to time calls.
+_timer = time.perf_counter
+
+_enabled = False
+_counters = collections.Counter()
+# Number of calls and total seconds keyed by name of method.
+_timings = collections.defaultdict(lambda: [0, 0.0])
+_hooks = []
+# Replaced attributes as (owner, name, original) in order replaced.
+_patches = []
+
+
+def is_enabled():
+    return _enabled
+
+def get_counters():
+    '''Returns copy of counters as dict'''
+    return dict(_counters)
+
+def get_timings():
+    '''Returns (calls, seconds) of timed methods keyed by their names'''
+    return {name: tuple(timing) for name, timing in _timings.items()}
+
+def reset():
+    '''Discards counters and timings collected so far'''
+    _counters.clear()
+    _timings.clear()
+
+def add_hook(hook):
+    '''Adds function called as hook(name, seconds) after timed calls.
+
+    Name is qualified name of method or function, e.g
+    'Block.get_items_by_value'. Hooks are called on thread of call.'''
+    _hooks.append(hook)
+
+def remove_hook(hook):
+    _hooks.remove(hook)
+
+
+def _record_call(name, seconds):
+    # Records time of call passing it to hooks.
+    timing = _timings[name]
+    timing[0] += 1
+    timing[1] += seconds
+    for hook in _hooks:
+        hook(name, seconds)
+
+def _timed(name, func):
+    # Returns function recording time taken by calls to func.
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def timed(*args, **kwargs):
+            start = _timer()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _record_call(name, _timer() - start)
+    else:
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = _timer()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record_call(name, _timer() - start)
+    return timed
+
+def _counted(*counter_names):
+    # Returns decorator creating function incrementing counters.
+    def decorator(func):
+        @functools.wraps(func)
+        def counted(*args, **kwargs):
+            for counter_name in counter_names:
+                _counters[counter_name] += 1
+            return func(*args, **kwargs)
+        return counted
+    return decorator
+
+def _counted_mask(func):
+    # Counts masks of values array, each is scan of every value.
+    # Masks are not created when block falls back to other scans.
+    @functools.wraps(func)
+    def get_mask(self, *args, **kwargs):
+        mask = func(self, *args, **kwargs)
+        if mask is not None:
+            _counters["full_scans"] += 1
+        return mask
+    return get_mask
+
+def _counted_select(func):
+    # Counts scans of queries not narrowed down by index.
+    # Scans with limit may stop before going through every item.
+    @functools.wraps(func)
+    def select_items(self, items, conditions, limit=None):
+        if items is self._items:
+            if limit is None:
+                _counters["full_scans"] += 1
+            else:
+                _counters["early_exit_scans"] += 1
+        return func(self, items, conditions, limit)
+    return select_items
+
+def _counted_get_value(func):
+    @functools.wraps(func)
+    def get_value(self, *args, **kwargs):
+        _counters["value_evaluations"] += 1
+        if self.is_value_dynamic():
+            _counters["dynamic_value_evaluations"] += 1
+        return func(self, *args, **kwargs)
+    return get_value
+
+def _counted_lookup(func):
+    # Counts lookups answered by value or type index.
+    # Lookups not answered by index end up scanning items.
+    @functools.wraps(func)
+    def lookup(self, *args, **kwargs):
+        found_buckets = func(self, *args, **kwargs)
+        if found_buckets is not None:
+            _counters["index_hits"] += 1
+        return found_buckets
+    return lookup
+
+def _counted_value_index(func):
+    @functools.wraps(func)
+    def get_value_index(self):
+        if self._indexed and not self._value_index_built:
+            _counters["index_builds"] += 1
+        return func(self)
+    return get_value_index
+
+def _counted_type_index(func):
+    @functools.wraps(func)
+    def get_type_index(self):
+        if self._indexed and self._type_index is None:
+            _counters["index_builds"] += 1
+        return func(self)
+    return get_type_index
+
+def _counted_sorted_index(func):
+    @functools.wraps(func)
+    def get_sorted_index(self):
+        if self._sorted_index is None:
+            _counters["index_builds"] += 1
+        else:
+            _counters["index_hits"] += 1
+        return func(self)
+    return get_sorted_index
+
+def _counted_flatten(func):
+    # Replaces extraction of deep items with one reporting depth.
+    @functools.wraps(func)
+    def extract_deep_items(cls, items, max_depth=None):
+        deep_items, depth = cls._walk_deep_items(items, max_depth)
+        _counters["flattens"] += 1
+        _counters["flatten_depth"] = max(_counters["flatten_depth"], depth)
+        return deep_items
+    return extract_deep_items
+
+
+def _patch(owner, name, wrap):
+    # Replaces attribute of class or module with wrapped attribute.
+    original = vars(owner)[name]
+    if isinstance(original, (classmethod, staticmethod)):
+        wrapped = type(original)(wrap(original.__func__))
+    else:
+        wrapped = wrap(original)
+    setattr(owner, name, wrapped)
+    _patches.append((owner, name, original))
+
+def _patch_counters():
+    item_types = (items_.BaseItem, items_.CompactItem)
+    for item_type in item_types:
+        _patch(item_type, "get_value", _counted_get_value)
+        _patch(item_type, "_setup_value", _counted("item_constructions"))
+        _patch(item_type, "_from_object_value",
+            _counted("item_constructions"))
+        _patch(item_type, "copy", _counted("item_copies"))
+    _patch(block_.BaseBlock, "filter_items", _counted("full_scans"))
+    _patch(block_.BaseBlock, "_filter_item", _counted("early_exit_scans"))
+    _patch(block_.BaseBlock, "_select_items", _counted_select)
+    for name in ("_get_values_mask", "_get_value_mask", "_get_truth_mask"):
+        _patch(columnar.ColumnarBlock, name, _counted_mask)
+    _patch(mapped.MMapBlock, "_scan", _counted("full_scans"))
+    _patch(mapped.MMapBlock, "_scan_first", _counted("early_exit_scans"))
+    _patch(partitioned.PartitionedBlock, "_run_shards", 
+        _counted("full_scans"))
+    _patch(block_.Block, "_lookup_value_buckets", _counted_lookup)
+    _patch(block_.Block, "_get_value_index", _counted_value_index)
+    _patch(block_.Block, "_lookup_type_buckets", _counted_lookup)
+    _patch(block_.Block, "_get_type_index", _counted_type_index)
+    _patch(block_.Block, "_get_sorted_index", _counted_sorted_index)
+    _patch(block_.DeepBlock, "_extract_deep_items", _counted_flatten)
+
+def _is_public_method(name, attribute):
+    if name.startswith("_"):
+        return False
+    if isinstance(attribute, (classmethod, staticmethod)):
+        attribute = attribute.__func__
+    return inspect.isfunction(attribute)
+
+def _patch_timings():
+    for block_type in block_types:
+        for name, attribute in list(vars(block_type).items()):
+            if _is_public_method(name, attribute):
+                qualified_name = "{}.{}".format(block_type.__name__, name)
+                _patch(block_type, name,
+                    functools.partial(_timed, qualified_name))
+    # Functions are also replaced where they were imported by package.
+    package = sys.modules.get("pemap")
+    for name in highlevel.__all__:
+        function = getattr(highlevel, name)
+        wrap = functools.partial(_timed, "highlevel." + name)
+        _patch(highlevel, name, wrap)
+        if package is not None and vars(package).get(name) is function:
+            _patch(package, name, 
+                lambda _, name=name: getattr(highlevel, name))
+
+def enable(counting=True, timing=True):
+    '''Enables instrumentation of items and blocks.
+
+    counting: Bool
+        Enables counters of operations, default: True.
+    timing: Bool
+        Enables timing of public methods and functions, default: True.
+
+    Instrumentation is process wide. Counters are not exact when items
+    are used from many threads at same time.'''
+    global _enabled
+    disable()
+    if counting:
+        _patch_counters()
+    if timing:
+        _patch_timings()
+    _enabled = True
+
+def disable():
+    '''Disables instrumentation putting back original methods'''
+    global _enabled
+    while _patches:
+        owner, name, original = _patches.pop()
+        setattr(owner, name, original)
+    _enabled = False
+
+@contextlib.contextmanager
+def instrumented(counting=True, timing=True):
+    '''Enables instrumentation within with statement.
+
+    Counters and timings are reset when entering.'''
+    reset()
+    enable(counting, timing)
+    try:
+        yield
+    finally:
+        disable()
@@ -1,6 +1,9 @@
 from pemap import reference as reference_
 from pemap import value as value_
 
+import copy as copy_
+import inspect
+
 
 class BaseItem():
     '''Associates reference object with any python object/value.
@@ -17,6 +20,8 @@ class BaseItem():
     # Value class/type to use.
     _value_type = value_.Value
 
+    __slots__ = ("_type", "_strict", "_reference", "_value")
+
     def __init__(self, reference, value=_value_type.get_default_value(), 
     _type=object,  strict=False):
         '''
@@ -52,35 +57,48 @@ class BaseItem():
     def _setup_value(self, value):
         # Setup value for item.
         # This method is not meant to be overiden(take care)
-        if value == self._value_type.get_default_value():
-            # Sets up variables to be used to hget value
-            _object = self.get_object()
-            value_attr_name = self._value_type.get_value_attr_name()
-            value_method_name = self._value_type.get_value_method_name()
+        value = self._resolve_value(value)
+        # Now set value attribute using Value type.
+        self._value = self._value_type(value)
+
+    def _resolve_value(self, value):
+        # Returns value for item taking it from object if not provided.
+        # This method is not meant to be overiden(take care)
+        if value is self._value_type.get_default_value():
             # Attempt to get value from object.
-            if hasattr(_object, value_attr_name):
-                value = getattr(_object, value_attr_name)
-            elif hasattr(_object, value_method_name):
-                value = getattr(_object, value_method_name)()
-            else:
-                err_msg = "Cannot get {0} from object of type " +\
-                    "'{1}', please provide {0} or define " +\
-                    "'{2}()' or '{3}' attributes."
-                # Set string format variables
-                type_name = _object.__class__.__name__
-                value_name = self._value_type.get_name()
-                # Format string with those variables.
-                err_msg = err_msg.format(value_name, type_name, value_method_name, 
-                value_attr_name)
-                raise AttributeError(err_msg)
+            value = self._get_object_value(self.get_object())
         # Value for item cann
-        if self._value_type.get_default_value() == value:
+        self._check_value(self.get_object(), value)
+        return value
+
+    @classmethod
+    def _get_object_value(cls, _object):
+        # Gets value from object through its attribute or method.
+        # Exception is raised if object does not provide value.
+        value = cls._value_type.resolve_value(_object)
+        if value is value_._missing:
+            err_msg = "Cannot get {0} from object of type " +\
+                "'{1}', please provide {0} or define " +\
+                "'{2}()' or '{3}' attributes."
+            # Set string format variables
+            type_name = _object.__class__.__name__
+            value_name = cls._value_type.get_name()
+            value_attr_name = cls._value_type.get_value_attr_name()
+            value_method_name = cls._value_type.get_value_method_name()
+            # Format string with those variables.
+            err_msg = err_msg.format(value_name, type_name, value_method_name, 
+            value_attr_name)
+            raise AttributeError(err_msg)
+        return value
+
+    @classmethod
+    def _check_value(cls, _object, value):
+        # Raises exception if value cannot be used for item.
+        if cls._value_type.get_default_value() is value:
             type_name = _object.__class__.__name__
-            value_name = self._value_type.get_name().capitalize()
+            value_name = cls._value_type.get_name().capitalize()
             err_msg = "{} for item cannot be '{}'"
             raise ValueError(err_msg.format(value_name, type_name))
-        # Now set value attribute using Value type.
-        self._value = self._value_type(value)
 
     def _setup_reference(self, reference):
         # Creates reference object when neccessay
@@ -89,33 +107,86 @@ class BaseItem():
                 err_msg = "Reference needs to be instance of '{}' not " +\
                     "'{}' when 'strict' is enabled"
                 err_msg = err_msg.format(
-                    reference.Reference.__name__,
+                    reference_.Reference.__name__,
                     reference.__class__.__name__
                 )
                 raise TypeError(err_msg)
         else:
-            self._reference = reference_.Reference.to_reference(reference)
             if not isinstance(reference, self._type):
                 err_msg = "object should be type {}, not {}"
                 raise TypeError(err_msg.format(reference, self._type))
+            self._reference = reference_.Reference.to_reference(reference)
+
+    @classmethod
+    def _from_object_value(cls, _object, value):
+        # Creates item from object and value without checking them.
+        # Value is used as it is without being taken from object.
+        _item = cls.__new__(cls)
+        _item._type = object
+        _item._strict = False
+        _item._reference = reference_.Reference(_object)
+        _item._value = cls._value_type(value)
+        return _item
+
+    @classmethod
+    def _from_object(cls, _object):
+        # Creates item taking value from object without checking object.
+        # Same as cls(_object) for items not changing initialiser.
+        value = cls._get_object_value(_object)
+        cls._check_value(_object, value)
+        return cls._from_object_value(_object, value)
 
     @classmethod
     def to_item(cls, _object):
         # Creates item object from if not already item object
-        if isinstance(_object, Item):
+        if isinstance(_object, BaseItem):
             _item = _object
+        elif cls.__init__ in _plain_initialisers and \
+            not isinstance(_object, reference_.Reference):
+            # Item is created without calling initialiser.
+            _item = cls._from_object(_object)
         else:
             _item = cls(_object)
         return _item
 
+    def _new_value(self, value):
+        # Creates value object for item to replace existing one.
+        return self._value_type(value)
+
     def set_value(self, value):
         # Sets value/object behind item.
-        return self._value.set_value(value)
+        # Value object is replaced as copies of item may share it.
+        self._value = self._new_value(value)
+
+    def set_object(self, _object):
+        # Sets object behind item checking it same as initialiser.
+        # Reference is replaced as copies of item may share it.
+        self._setup_reference(_object)
     
     def get_value(self, *args, **kwargs):
         # Gets value behind this item.
         return self._value.get_value(*args, **kwargs)
 
+    async def aget_value(self, *args, **kwargs):
+        # Gets value behind this item awaiting it if awaitable.
+        # Value can be coroutine function(async def).
+        _value = self.get_value(*args, **kwargs)
+        if inspect.isawaitable(_value):
+            _value = await _value
+        return _value
+
+    def _get_raw_value(self):
+        # Gets value as it was set without calling it if function.
+        return self._value.get_object()
+
+    def is_value_dynamic(self):
+        # Checks if value of item is computed on each call.
+        return self._value.is_dynamic()
+
+    def invalidate_value(self):
+        # Discards remembered return value of value function if any.
+        self._value.invalidate()
+
     def get_reference(self):
         # Gets underling reference object
         return self._reference
@@ -128,17 +199,163 @@ class BaseItem():
         # Gets object of underlying reference
         return self._reference.get_object()
 
-    def copy(self):
-        # Creates a copy of item
-        return self.__class__(self._reference, self._value, self._type, 
-        self._strict)
+    def copy(self, deep=False):
+        # Creates a copy of item sharing reference and value objects.
+        # Shared objects are replaced(not changed) by set_value() and
+        # set_object() making them copy on write.
+        # Deep copy gets copies of object and value instead.
+        if self.__class__.__init__ in _plain_initialisers:
+            _item = self.__class__.__new__(self.__class__)
+            _item._type = self._type
+            _item._strict = self._strict
+            _item._reference = self._reference
+            _item._value = self._value
+        else:
+            # Initialiser may setup more than reference and value.
+            _item = self.__class__(self._reference, self._value, 
+                self._type, self._strict)
+        if deep:
+            self._deep_copy_into(_item)
+        return _item
+
+    def _deep_copy_into(self, _item):
+        # Sets copies of object and value of item to another item.
+        # Memo is shared so that object and value keep sharing parts.
+        memo = {}
+        if self._strict:
+            # Strict items only accept Reference objects as object.
+            _item.set_object(copy_.deepcopy(self.get_reference(), memo))
+        else:
+            _item.set_object(copy_.deepcopy(self.get_object(), memo))
+        _item.set_value(copy_.deepcopy(self._get_raw_value(), memo))
 
 
 class Item(BaseItem):    
+    __slots__ = ()
+
     def __init__(self, reference, value=..., *args, **kwargs):
         super().__init__(reference, value, *args, **kwargs) 
 
 
+class CachedItem(Item):
+    '''Varient of Item remembering return value of value function.
+
+    Function used as value is called once and its return value is 
+    reused until `invalidate_value()` or `set_value()` is called. Time 
+    to live in seconds can be set with 'ttl' argument.'''
+    _value_type = value_.CachedValue
+
+    __slots__ = ()
+
+    def __init__(self, reference, value=..., *args, ttl=None, **kwargs):
+        super().__init__(reference, value, *args, **kwargs) 
+        self._value.set_ttl(ttl)
+
+    def _new_value(self, value):
+        # Creates value object keeping time to live of existing one.
+        value_ = super()._new_value(value)
+        value_.set_ttl(self._value.get_ttl())
+        return value_
+
+
+class CompactItem(BaseItem):
+    '''Varient of Item that keeps object and value inline.
+
+    Item does not create Reference and Value objects but stores 
+    underlying object and value directly on its slots. This reduces 
+    memory used by each item, which matters when there are millions
+    of items.
+
+    Reference object is created on demand by `get_reference()` and
+    is not kept by item. Changes made to it wont reflect on item.'''
+    __slots__ = ("_object",)
+
+    def __init__(self, reference, value=..., *args, **kwargs):
+        super().__init__(reference, value, *args, **kwargs) 
+
+    @classmethod
+    def _from_object_value(cls, _object, value):
+        # Creates item from object and value without checking them.
+        _item = cls.__new__(cls)
+        _item._type = object
+        _item._strict = False
+        _item._object = _object
+        _item._value = value
+        return _item
+
+    def _setup_value(self, value):
+        # Stores value as it is without Value object.
+        self._value = self._resolve_value(value)
+
+    def _setup_reference(self, reference):
+        # Stores object underlying reference without Reference object.
+        super()._setup_reference(reference)
+        self._object = self._reference.get_object()
+        del self._reference
+
+    def set_value(self, value):
+        # Sets value/object behind item.
+        self._value = value
+
+    def get_value(self, *args, **kwargs):
+        # Gets value behind this item.
+        # Functions and methods are called same as Value does.
+        _value = self._value
+        if reference_.is_method_func(_value):
+            return _value(*args, **kwargs)
+        elif isinstance(_value, value_.Value):
+            return _value.get_value()
+        return _value
+
+    def _get_raw_value(self):
+        # Gets value as it was set without calling it if function.
+        if isinstance(self._value, value_.Value):
+            return self._value.get_object()
+        return self._value
+
+    def is_value_dynamic(self):
+        # Checks if value of item is computed on each call.
+        if isinstance(self._value, value_.Value):
+            return self._value.is_dynamic()
+        return reference_.is_method_func(self._value)
+
+    def invalidate_value(self):
+        # Discards remembered return value of value function if any.
+        if isinstance(self._value, value_.Value):
+            self._value.invalidate()
+
+    def get_reference(self):
+        # Creates reference object for underlying object.
+        return reference_.Reference(self._object)
+
+    def get_type(self):
+        # Gets type of underlying object
+        return self._object.__class__
+
+    def get_object(self):
+        # Gets underlying object
+        return self._object
+
+    def copy(self, deep=False):
+        # Creates a copy of item without checking object again.
+        # Object and value are replaced on change, so they are shared.
+        _item = self.__class__.__new__(self.__class__)
+        _item._object = self._object
+        _item._value = self._value
+        _item._type = self._type
+        _item._strict = self._strict
+        if deep:
+            self._deep_copy_into(_item)
+        return _item
+
+
+# Initialisers of items that only setup reference and value.
+# Items with these initialisers can be created from objects without
+# calling the initialiser.
+_plain_initialisers = frozenset((BaseItem.__init__, Item.__init__, 
+    CachedItem.__init__, CompactItem.__init__))
+
+
 if __name__ == "__main__":
     item = Item(10, lambda :34)
     item2 = Item(item)
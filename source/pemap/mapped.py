@@ -0,0 +1,362 @@
+from pemap import block as block_
+from pemap import items as items_
+
+import array
+import collections.abc
+import heapq
+import itertools
+import mmap
+import operator
+import os
+import pickle
+
+
+# Bytes at start of values file followed by typecode of values.
+# Header is 8 bytes keeping values aligned within file.
+_magic = b"PEMAPV"
+_header_size = 8
+# Typecodes of fixed width values keyed by type of value.
+_typecodes = {bool: "?", int: "q", float: "d"}
+# Types of values each typecode can keep without changing them.
+_typecode_types = {"?": (bool,), "q": (int,), "d": (int, float)}
+# Largest integer float column keeps exactly.
+_max_exact_float_int = 2 ** 53
+# Array typecodes values are written with when different from typecode
+# values are read with. Array has no typecode for bool.
+_array_typecodes = {"?": "B"}
+# Number of values and offsets written to files at once.
+_chunksize = 65536
+
+
+def _get_paths(path):
+    # Returns paths of values, offsets and objects files.
+    return (os.path.join(path, "values.bin"),
+        os.path.join(path, "offsets.bin"),
+        os.path.join(path, "objects.bin"))
+
+def _map_file(file):
+    # Returns read only memory map of file or empty bytes.
+    # Empty files cannot be memory mapped.
+    if os.fstat(file.fileno()).st_size == 0:
+        return b""
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class MappedItems(collections.abc.Sequence):
+    '''Sequence of items whose values and objects are kept in files.
+
+    Values are read from memory mapped column and objects are decoded
+    from objects file each time item is accessed. Items are not kept,
+    accessing same position twice returns different item objects.'''
+    # Type of items created on access.
+    _item_type = items_.CompactItem
+
+    def __init__(self, values, offsets, objects) -> None:
+        '''
+        values: Memoryview
+            Values of items cast to their typecode.
+        offsets: Memoryview
+            Start of each object within objects and end of last object.
+        objects: Buffer
+            Pickled objects one after another.
+        '''
+        self._values = values
+        self._offsets = offsets
+        self._objects = objects
+
+    def get_object(self, position):
+        # Decodes object of item at position.
+        start = self._offsets[position]
+        end = self._offsets[position + 1]
+        return pickle.loads(self._objects[start:end])
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            positions = range(*position.indices(len(self)))
+            return [self[_position] for _position in positions]
+        if position < 0:
+            position += len(self)
+        return self._item_type._from_object_value(
+            self.get_object(position), self._values[position])
+
+    def __len__(self):
+        return len(self._values)
+
+
+class MMapBlock(block_.BaseBlock):
+    '''Varient of BaseBlock keeping its items in files on disk.
+
+    Values are kept in fixed width column(bool, int or float) which is
+    memory mapped. Objects are pickled into separate file with offset of
+    each object kept in another memory mapped column. Operating system
+    decides which parts of files are kept in memory, allowing blocks
+    larger than memory.
+
+    Value queries scan the values column without decoding objects. Only
+    objects of items being returned get decoded. Use `create()` to write
+    files of block then open them with initialiser.'''
+
+    def __init__(self, path, _type=object) -> None:
+        '''
+        path: Str
+            Directory with files written by `create()`.
+        _type: Type
+            Type of items this block expectes, default: object
+        '''
+        values_path, offsets_path, objects_path = _get_paths(path)
+        self._values = None
+        self._offsets = None
+        self._files = [open(values_path, "rb"), open(offsets_path, "rb"),
+            open(objects_path, "rb")]
+        self._maps = [_map_file(file) for file in self._files]
+        values_map, offsets_map, objects_map = self._maps
+        if values_map[:len(_magic)] != _magic:
+            self.close()
+            err_msg = "'{}' does not contain values of mapped block"
+            raise ValueError(err_msg.format(path))
+        typecode = bytes(values_map[len(_magic):_header_size]).decode()
+        typecode = typecode.strip("\0")
+        self._values = memoryview(values_map)[_header_size:].cast(typecode)
+        self._offsets = memoryview(offsets_map).cast("q")
+        super().__init__(MappedItems(self._values, self._offsets, 
+            objects_map), _type)
+
+    @classmethod
+    def create(cls, path, items, typecode=None, **kwargs):
+        '''Writes items to files in directory and opens them as block.
+
+        path: Str
+            Directory to write files to, created if not existing.
+        items: Iterator
+            Collection of Item objects or objects with values.
+        typecode: Str
+            Array typecode of values('?', 'q' or 'd'), default: taken
+            from type of first value.
+
+        Items are written one chunk at a time and are not kept in
+        memory. Values of items are evaluated once when being written.
+        Objects need to be picklable. TypeError is raised if value does
+        not fit typecode(e.g float after int values, pass typecode 'd'
+        for such values), files written so far are then removed.'''
+        os.makedirs(path, exist_ok=True)
+        paths = _get_paths(path)
+        try:
+            cls._write_files(paths, items, typecode)
+        except BaseException:
+            for file_path in paths:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+            raise
+        return cls(path, **kwargs)
+
+    @classmethod
+    def _write_files(cls, paths, items, typecode=None):
+        # Writes values, offsets and objects of items to files.
+        values_path, offsets_path, objects_path = paths
+        with open(values_path, "wb") as values_file, \
+            open(offsets_path, "wb") as offsets_file, \
+            open(objects_path, "wb") as objects_file:
+            if typecode is not None:
+                cls._check_typecode(typecode)
+            values = None
+            offsets = array.array("q", [0])
+            offset = 0
+            for position, _item in enumerate(items):
+                _item = cls._item_type.to_item(_item)
+                _value = _item.get_value()
+                if typecode is None:
+                    typecode = cls._get_typecode(_value)
+                if values is None:
+                    values = cls._new_values(typecode)
+                cls._append_value(values, _value, typecode, position)
+                data = pickle.dumps(_item.get_object(),
+                    pickle.HIGHEST_PROTOCOL)
+                objects_file.write(data)
+                offset += len(data)
+                offsets.append(offset)
+                if len(values) >= _chunksize:
+                    cls._write_values(values_file, values, typecode)
+                    values = cls._new_values(typecode)
+                    offsets.tofile(offsets_file)
+                    offsets = array.array("q")
+            typecode = typecode or "q"
+            if values is None:
+                values = cls._new_values(typecode)
+            cls._write_values(values_file, values, typecode)
+            offsets.tofile(offsets_file)
+
+    @staticmethod
+    def _check_typecode(typecode):
+        if typecode not in _typecode_types:
+            err_msg = "typecode should be one of {} not {!r}"
+            raise ValueError(err_msg.format(tuple(_typecode_types), 
+                typecode))
+
+    @staticmethod
+    def _new_values(typecode):
+        # Returns array for values read with typecode.
+        return array.array(_array_typecodes.get(typecode, typecode))
+
+    @staticmethod
+    def _append_value(values, _value, typecode, position):
+        # Appends value to array raising TypeError if it does not fit.
+        fits = isinstance(_value, _typecode_types[typecode])
+        if fits and typecode == "d" and isinstance(_value, int):
+            fits = abs(_value) <= _max_exact_float_int
+        if fits:
+            try:
+                values.append(_value)
+                return
+            except OverflowError:
+                pass
+        err_msg = "Value {!r} of item at position {} does not fit " +\
+            "column of mapped block with typecode '{}'"
+        raise TypeError(err_msg.format(_value, position, typecode))
+
+    @staticmethod
+    def _get_typecode(_value):
+        # Returns typecode of column for value.
+        typecode = _typecodes.get(type(_value))
+        if typecode is None:
+            err_msg = "Values of mapped block should be bool, int or " +\
+                "float not '{}'"
+            raise TypeError(err_msg.format(_value.__class__.__name__))
+        return typecode
+
+    @staticmethod
+    def _write_values(file, values, typecode):
+        # Writes values to values file, writing header before first.
+        if file.tell() == 0:
+            header = _magic + typecode.encode()
+            file.write(header.ljust(_header_size, b"\0"))
+        values.tofile(file)
+
+    def close(self):
+        '''Releases memory maps and files of block'''
+        # Views need to be released before their memory maps.
+        if self._values is not None:
+            self._values.release()
+            self._offsets.release()
+        self._items = []
+        for _map in self._maps:
+            if isinstance(_map, mmap.mmap):
+                _map.close()
+        for file in self._files:
+            file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _get_positions_items(self, positions):
+        # Returns items at positions decoding their objects.
+        return [self._items[position] for position in positions]
+
+    def _scan(self, predicate):
+        # Returns positions of values for which predicate is true.
+        # Values column is scanned without decoding objects.
+        return list(itertools.compress(range(len(self._values)),
+            map(predicate, self._values)))
+
+    def _scan_first(self, predicate):
+        # Returns item of first value for which predicate is true.
+        for position, _value in enumerate(self._values):
+            if predicate(_value):
+                return self._items[position]
+
+    def _evaluate_values(self, items, executor=None):
+        # Values of block are read from column instead of items.
+        if items is self._items:
+            return self._values.tolist()
+        return super()._evaluate_values(items)
+
+    def get_values(self):
+        '''Gets values of block item objects'''
+        return self._values.tolist()
+
+    def to_tuple(self):
+        '''Returns tuple form of block with values and objects'''
+        objects = map(self._items.get_object, range(len(self._items)))
+        return tuple(zip(self._values.tolist(), objects))
+
+    def get_items_by_value(self, value):
+        '''Gets item objects matching value'''
+        predicate = lambda _value: _value == value
+        return self._get_positions_items(self._scan(predicate))
+
+    def get_item_by_value(self, value):
+        '''Gets first item matching value'''
+        return self._scan_first(lambda _value: _value == value)
+
+    def get_items_by_values(self, values):
+        '''Gets item objects matching any of values'''
+        predicate = lambda _value: _value in values
+        return self._get_positions_items(self._scan(predicate))
+
+    def get_item_by_values(self, values):
+        '''Gets first item matching any of values'''
+        return self._scan_first(lambda _value: _value in values)
+
+    def get_true_items(self):
+        # Gets items that evaluates to true.
+        return self._get_positions_items(self._scan(bool))
+
+    def get_true_item(self):
+        # Gets first item evaluating to true.
+        return self._scan_first(bool)
+
+    def get_false_items(self):
+        # Gets items that evaluates to false.
+        return self._get_positions_items(self._scan(operator.not_))
+
+    def get_false_item(self):
+        # Gets first item evaluating to false.
+        return self._scan_first(operator.not_)
+
+    def _get_sorted_positions_items(self, positions):
+        # Returns items at positions ordered by their values.
+        # Equal values keep order of block.
+        positions.sort(key=self._values.__getitem__)
+        return self._get_positions_items(positions)
+
+    def get_items_in_range(self, low, high):
+        '''Gets items with values between low and high(inclusive)'''
+        positions = self._scan(lambda _value: low <= _value <= high)
+        return self._get_sorted_positions_items(positions)
+
+    def get_items_below(self, value):
+        '''Gets items with values less than value'''
+        positions = self._scan(lambda _value: _value < value)
+        return self._get_sorted_positions_items(positions)
+
+    def get_items_above(self, value):
+        '''Gets items with values greater than value'''
+        positions = self._scan(lambda _value: _value > value)
+        return self._get_sorted_positions_items(positions)
+
+    def min_item(self):
+        '''Gets item with smallest value'''
+        if len(self._values):
+            positions = range(len(self._values))
+            return self._items[min(positions, key=self._values.__getitem__)]
+
+    def max_item(self):
+        '''Gets item with largest value'''
+        # Last of equal values is taken same as with sorted items.
+        if len(self._values):
+            positions = reversed(range(len(self._values)))
+            return self._items[max(positions, key=self._values.__getitem__)]
+
+    def top_k(self, k, largest=True):
+        '''Gets k items with largest(or smallest) values.
+
+        Only objects of selected items are decoded.'''
+        positions = range(len(self._values))
+        if largest:
+            positions = heapq.nlargest(k, positions, self._values.__getitem__)
+        else:
+            positions = heapq.nsmallest(k, positions,
+                self._values.__getitem__)
+        return self._get_positions_items(positions)
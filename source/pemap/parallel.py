@@ -0,0 +1,84 @@
+import operator
+import os
+
+
+class ValueEvaluationError(Exception):
+    '''Raised when values of some items could not be evaluated.
+
+    Errors are kept as (position, item, exception) in `errors` and
+    values that were evaluated are kept in `values` with None in place
+    of values that failed.'''
+    def __init__(self, errors, values) -> None:
+        self.errors = errors
+        self.values = values
+        err_msg = "Failed to evaluate values of {} item(s), first error: {!r}"
+        super().__init__(err_msg.format(len(errors), errors[0][2]))
+
+
+def _evaluate_chunk(items):
+    # Evaluates values of items reporting error of each item.
+    # This runs on worker thread or process.
+    results = []
+    for _item in items:
+        try:
+            results.append((True, _item.get_value()))
+        except Exception as error:
+            results.append((False, error))
+    return results
+
+def _get_chunksize(count):
+    # Returns chunk size giving each worker few chunks.
+    workers = os.cpu_count() or 1
+    return max(1, count // (workers * 4))
+
+def evaluate_values(items, executor=None, chunksize=None,
+value_getter=operator.methodcaller("get_value")):
+    '''Evaluates values of items returning them in order of items.
+
+    items: Iterator
+        Collection of item objects.
+    executor: Executor
+        ThreadPoolExecutor or ProcessPoolExecutor to evaluate values of
+        items whose values are functions, default: None.
+    chunksize: Int
+        Number of items sent to executor at once, default: None.
+    value_getter: Callable
+        Function for getting value of item when not using executor.
+
+    Items with values that are not functions are evaluated on calling
+    thread. Items sent to ProcessPoolExecutor and their values need to
+    be picklable. ValueEvaluationError is raised after all values
+    were evaluated if any of them failed.'''
+    items = list(items)
+    if executor is None:
+        return list(map(value_getter, items))
+    values = [None] * len(items)
+    dynamic_positions = []
+    for position, _item in enumerate(items):
+        if _item.is_value_dynamic():
+            dynamic_positions.append(position)
+        else:
+            values[position] = value_getter(_item)
+    if chunksize is None:
+        chunksize = _get_chunksize(len(dynamic_positions))
+    # Chunks are submitted at once and collected in order.
+    futures = []
+    for start in range(0, len(dynamic_positions), chunksize):
+        positions = dynamic_positions[start:start + chunksize]
+        chunk = [items[position] for position in positions]
+        futures.append((positions, executor.submit(_evaluate_chunk, chunk)))
+    errors = []
+    for positions, future in futures:
+        try:
+            results = future.result()
+        except Exception as error:
+            # Whole chunk failed e.g items could not be pickled.
+            results = [(False, error)] * len(positions)
+        for position, (succeeded, result) in zip(positions, results):
+            if succeeded:
+                values[position] = result
+            else:
+                errors.append((position, items[position], result))
+    if errors:
+        raise ValueEvaluationError(errors, values)
+    return values
@@ -0,0 +1,343 @@
+from pemap import block as block_
+from pemap import grouping
+from pemap import util
+
+import array
+import numbers
+import os
+import weakref
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Shared memory is not available before python 3.8.
+    shared_memory = None
+
+
+# Largest integer float can represent exactly.
+_max_exact_float_int = 2 ** 53
+# Range of integers kept in 64 bits column.
+_min_int, _max_int = -2 ** 63, 2 ** 63 - 1
+
+
+def _attach(name):
+    # Attaches to shared memory created by block.
+    # Memory is not tracked as block is responsible for removing it.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # 'track' argument is not available before python 3.13. Workers
+        # share resource tracker of block so memory is tracked once.
+        return shared_memory.SharedMemory(name=name)
+
+def _scan_shard(task):
+    # Scans shard of column in shared memory returning its results.
+    # This runs on worker process or thread.
+    name, typecode, count, start, end, operation, argument = task
+    memory = _attach(name)
+    try:
+        column = memory.buf[:count * 8].cast(typecode)
+        try:
+            return _run_operation(column, start, end, operation, argument)
+        finally:
+            column.release()
+    finally:
+        memory.close()
+
+def _run_operation(column, start, end, operation, argument):
+    # Returns positions of column matching operation or its groups.
+    positions = range(start, end)
+    shard = column[start:end]
+    try:
+        if operation == "equal":
+            return [position for position, _value in zip(positions, shard)
+                if _value == argument]
+        elif operation == "in":
+            return [position for position, _value in zip(positions, shard)
+                if _value in argument]
+        elif operation == "true":
+            return [position for position, _value in zip(positions, shard)
+                if _value]
+        elif operation == "false":
+            return [position for position, _value in zip(positions, shard)
+                if not _value]
+        elif operation == "group":
+            # Groups are [count, first position, last position].
+            groups = {}
+            for position, _value in zip(positions, shard):
+                group = groups.get(_value)
+                if group is None:
+                    groups[_value] = [1, position, position]
+                else:
+                    group[0] += 1
+                    group[2] = position
+            return groups
+        raise ValueError("Unknown operation {!r}".format(operation))
+    finally:
+        shard.release()
+
+
+class _SharedColumn():
+    # Column of numbers kept in shared memory.
+    # Memory is removed once column is released or garbage collected.
+
+    def __init__(self, values, typecode) -> None:
+        self.typecode = typecode
+        self.count = len(values)
+        column = array.array(typecode, values)
+        # Shared memory cannot be empty.
+        self.memory = shared_memory.SharedMemory(create=True,
+            size=max(column.itemsize * len(column), 1))
+        self.memory.buf[:len(column) * column.itemsize] = \
+            memoryview(column).cast("B")
+        self._finalizer = weakref.finalize(self, self._remove, self.memory)
+
+    @staticmethod
+    def _remove(memory):
+        memory.close()
+        memory.unlink()
+
+    def release(self):
+        self._finalizer()
+
+    def get_task(self, start, end, operation, argument=None):
+        # Returns task for worker to run operation on shard.
+        return (self.memory.name, self.typecode, self.count, start, end,
+            operation, argument)
+
+
+class PartitionedBlock(block_.Block):
+    '''Varient of Block filtering shards of items in parallel.
+
+    Values(when all are numbers) and type codes of objects are copied
+    into columns in shared memory. Filters and aggregations run on
+    shards of those columns with executor set by `set_executor()`
+    without pickling items. Results of shards are merged in order of
+    block.
+
+    Blocks smaller than 'min_size', without executor or with values that
+    are not numbers use same methods as Block. Built value index is also
+    used instead of scanning shards.'''
+
+    def __init__(self, items, _type=object, strict=True, indexed=True,
+    value_cache=None, partitions=None, min_size=100000):
+        '''
+        items: Iterator
+            Collection of Item objects
+        _type: Type
+            Type of items this block expectes, default: object
+        strict: Bool
+            Prevents block from containing items containing other blocks.
+        indexed: Bool
+            Enables lazily built indexes for value lookups, default: True.
+        value_cache: ValueCache
+            Cache remembering values of items that are functions.
+        partitions: Int
+            Number of shards items are split into, default: number of
+            processors.
+        min_size: Int
+            Minimum number of items for using shards, default: 100000.
+        '''
+        if shared_memory is None:
+            err_msg = "Shared memory is required for '{}'"
+            raise ImportError(err_msg.format(self.__class__.__name__))
+        self._partitions = partitions
+        self._min_size = min_size
+        self._value_column = None
+        self._type_column = None
+        self._column_types = None
+        self._columns_built = False
+        super().__init__(items, _type, strict, indexed, value_cache)
+
+    def _get_init_kwargs(self):
+        init_kwargs = super()._get_init_kwargs()
+        init_kwargs["partitions"] = self._partitions
+        init_kwargs["min_size"] = self._min_size
+        return init_kwargs
+
+    def set_partitions(self, partitions=None, min_size=None):
+        '''Sets number of shards and minimum size for using them'''
+        self._partitions = partitions
+        if min_size is not None:
+            self._min_size = min_size
+
+    def get_partitions(self):
+        # Returns number of shards items are split into.
+        return self._partitions or os.cpu_count() or 1
+
+    def reset_indexes(self):
+        super().reset_indexes()
+        self._on_items_changed()
+
+    def _on_items_changed(self):
+        # Columns are rebuilt on next query as they have fixed size.
+        super()._on_items_changed()
+        self.release_columns()
+
+    def release_columns(self):
+        '''Removes columns of block from shared memory'''
+        for column in (self._value_column, self._type_column):
+            if column is not None:
+                column.release()
+        self._value_column = None
+        self._type_column = None
+        self._column_types = None
+        self._columns_built = False
+
+    @staticmethod
+    def _get_typecode(values):
+        # Returns typecode of column for values or None if values
+        # cannot be kept in column without changing how they compare.
+        if all(type(_value) is int and _min_int <= _value <= _max_int
+            for _value in values):
+            return "q"
+        for _value in values:
+            if not isinstance(_value, (int, float)) or _value != _value:
+                # NaN is only found by identity which column loses.
+                return None
+            if isinstance(_value, int) and \
+                abs(_value) > _max_exact_float_int:
+                return None
+        return "d"
+
+    def _build_columns(self):
+        # Builds columns of values and of type codes of objects.
+        if self._are_values_static():
+            values = list(map(self._value_getter, self._items))
+            typecode = self._get_typecode(values)
+            if typecode is not None:
+                self._value_column = _SharedColumn(values, typecode)
+        types = {}
+        codes = [types.setdefault(_item.get_type(), len(types))
+            for _item in self._items]
+        self._column_types = list(types)
+        self._type_column = _SharedColumn(codes, "q")
+
+    def _can_partition(self):
+        # Checks if shards should be used for queries.
+        return self._executor is not None and \
+            len(self._items) >= self._min_size
+
+    def _get_column(self, column_name):
+        # Returns column building columns when not yet built.
+        if not self._columns_built:
+            self._build_columns()
+            self._columns_built = True
+        return getattr(self, column_name)
+
+    def _get_shards(self):
+        # Returns (start, end) of shards of items.
+        count = len(self._items)
+        partitions = min(self.get_partitions(), count) or 1
+        size, remainder = divmod(count, partitions)
+        shards = []
+        start = 0
+        for partition in range(partitions):
+            end = start + size + (partition < remainder)
+            shards.append((start, end))
+            start = end
+        return shards
+
+    def _run_shards(self, column, operation, argument=None):
+        # Runs operation on shards with executor returning results.
+        # Results are in order of shards.
+        tasks = [column.get_task(start, end, operation, argument)
+            for start, end in self._get_shards()]
+        return list(self._executor.map(_scan_shard, tasks))
+
+    def _filter_shards(self, column, operation, argument=None):
+        # Returns items at positions found by shards in order of block.
+        items = self._items
+        return [items[position] for positions
+            in self._run_shards(column, operation, argument)
+            for position in positions]
+
+    def _get_value_column(self):
+        # Returns values column if shards should be used for values.
+        if not self._can_partition():
+            return None
+        if self._value_index_built and self._value_index is not None:
+            # Lookups through index are faster than scanning.
+            return None
+        return self._get_column("_value_column")
+
+    def get_items_by_value(self, value):
+        '''Gets item objects matching value'''
+        column = self._get_value_column()
+        if column is None or not isinstance(value, numbers.Real):
+            return super().get_items_by_value(value)
+        return self._filter_shards(column, "equal", value)
+
+    def get_items_by_values(self, values):
+        '''Gets item objects matching any of values'''
+        column = self._get_value_column()
+        if column is None or \
+            not isinstance(values, self._indexable_values_types):
+            return super().get_items_by_values(values)
+        try:
+            values = frozenset(values)
+        except TypeError:
+            return super().get_items_by_values(values)
+        return self._filter_shards(column, "in", values)
+
+    def get_true_items(self):
+        # Gets items that evaluates to true.
+        column = self._get_value_column()
+        if column is None:
+            return super().get_true_items()
+        return self._filter_shards(column, "true")
+
+    def get_false_items(self):
+        # Gets items that evaluates to false.
+        column = self._get_value_column()
+        if column is None:
+            return super().get_false_items()
+        return self._filter_shards(column, "false")
+
+    def get_items_by_type(self, _type):
+        '''Gets item objects of provided type'''
+        if not self._can_partition() or self._type_index is not None \
+            or not util.is_plain_type(_type):
+            # Lookups through built type index are faster than scanning.
+            # Types not plain classes are checked on each object.
+            return super().get_items_by_type(_type)
+        column = self._get_column("_type_column")
+        # Types are checked once here and shards match their codes.
+        codes = frozenset(code for code, object_type
+            in enumerate(self._column_types)
+            if util.is_subtype(object_type, _type))
+        return self._filter_shards(column, "in", codes)
+
+    def aggregate(self, key=None, aggregations=("count",)):
+        '''Aggregates values and objects of items grouped by keys.
+
+        Shards are used when grouping by values, see `Block.aggregate()`
+        for arguments.'''
+        column = None
+        if key is None or key == "value":
+            column = self._get_value_column()
+        # Keys and sums only match Block when values are all integers.
+        if column is None or column.typecode != "q":
+            return super().aggregate(key, aggregations)
+        # Validates aggregations before running shards.
+        aggregations = tuple(aggregations)
+        grouping.aggregate_items([], None, aggregations)
+        # States are [count, sum, min, max, first item, last item].
+        states = {}
+        for groups in self._run_shards(column, "group"):
+            for _value, (count, first, last) in groups.items():
+                state = states.get(_value)
+                if state is None:
+                    states[_value] = [count, None, _value, _value, first,
+                        last]
+                else:
+                    state[0] += count
+                    state[5] = last
+        results = {}
+        for _value, state in states.items():
+            state[1] = _value * state[0]
+            state[4] = self._items[state[4]]
+            state[5] = self._items[state[5]]
+            results[_value] = grouping._finish_aggregations(state,
+                aggregations)
+        return results
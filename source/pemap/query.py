@@ -0,0 +1,308 @@
+'''Conditions combined into queries of items.
+
+Conditions are combined with & (and), | (or) and ~ (not), e.g
+`value_in([1, 2]) & of_type(str) & truthy()`, and passed to
+`Block.query()`. Whole condition is tested on each item in one pass
+evaluating value of item at most once, conditions not needing values
+are tested first.'''
+import itertools
+import operator
+
+
+class Condition():
+    '''Base of conditions items are tested against.'''
+
+    # Whether testing needs value of item.
+    uses_value = False
+
+    def compile(self):
+        '''Returns function test(item, value) checking condition'''
+        raise NotImplementedError
+
+    def get_values(self):
+        # Returns values matched by condition if it can be answered by
+        # looking up values in value index, otherwise None.
+        return None
+
+    def get_type(self):
+        # Returns type matched by condition if it can be answered by
+        # looking up classes of objects in type index, otherwise None.
+        return None
+
+    def get_range(self):
+        # Returns (low, high) of values matched by condition if it can
+        # be answered by sorted index, otherwise None.
+        return None
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+
+class ValueIn(Condition):
+    uses_value = True
+
+    def __init__(self, values) -> None:
+        self._values = tuple(values)
+        try:
+            # Sets find values faster but only hold hashable values.
+            self._lookup_values = frozenset(self._values)
+        except TypeError:
+            self._lookup_values = None
+
+    def compile(self):
+        values, lookup_values = self._values, self._lookup_values
+        if lookup_values is None:
+            return lambda _item, _value: _value in values
+        def test(_item, _value):
+            try:
+                return _value in lookup_values
+            except TypeError:
+                # Unhashable values are compared with each of values.
+                return _value in values
+        return test
+
+    def get_values(self):
+        if self._lookup_values is None:
+            return None
+        return self._values
+
+    def __repr__(self):
+        return "value_in({!r})".format(list(self._values))
+
+
+class ValueBetween(Condition):
+    uses_value = True
+
+    def __init__(self, low=None, high=None) -> None:
+        self._low = low
+        self._high = high
+
+    def compile(self):
+        low, high = self._low, self._high
+        if low is None and high is None:
+            return lambda _item, _value: True
+        if low is None:
+            return lambda _item, _value: _value <= high
+        if high is None:
+            return lambda _item, _value: low <= _value
+        return lambda _item, _value: low <= _value <= high
+
+    def get_range(self):
+        return self._low, self._high
+
+    def __repr__(self):
+        return "value_between({!r}, {!r})".format(self._low, self._high)
+
+
+class OfType(Condition):
+    def __init__(self, _type) -> None:
+        self._type = _type
+
+    def compile(self):
+        _type = self._type
+        return lambda _item, _value: isinstance(_item.get_object(), _type)
+
+    def get_type(self):
+        return self._type
+
+    def __repr__(self):
+        return "of_type({!r})".format(self._type)
+
+
+class Truthy(Condition):
+    uses_value = True
+
+    def compile(self):
+        return lambda _item, _value: bool(_value)
+
+    def __repr__(self):
+        return "truthy()"
+
+
+class Falsy(Condition):
+    uses_value = True
+
+    def compile(self):
+        return lambda _item, _value: not _value
+
+    def __repr__(self):
+        return "falsy()"
+
+
+class Where(Condition):
+    def __init__(self, func) -> None:
+        self._func = func
+
+    def compile(self):
+        func = self._func
+        return lambda _item, _value: func(_item)
+
+    def __repr__(self):
+        return "where({!r})".format(self._func)
+
+
+class And(Condition):
+    def __init__(self, *conditions) -> None:
+        # Nested conditions are flattened to be planned together.
+        self.conditions = split_conditions(conditions)
+        self.uses_value = any(condition.uses_value
+            for condition in self.conditions)
+
+    def compile(self):
+        tests = tuple(condition.compile() for condition in self.conditions)
+        def test(_item, _value):
+            for condition_test in tests:
+                if not condition_test(_item, _value):
+                    return False
+            return True
+        return test
+
+    def __repr__(self):
+        return " & ".join(map(repr, self.conditions))
+
+
+class Or(Condition):
+    def __init__(self, *conditions) -> None:
+        self.conditions = []
+        for condition in conditions:
+            if isinstance(condition, Or):
+                self.conditions.extend(condition.conditions)
+            else:
+                self.conditions.append(condition)
+        self.uses_value = any(condition.uses_value
+            for condition in self.conditions)
+
+    def compile(self):
+        tests = tuple(condition.compile() for condition in self.conditions)
+        def test(_item, _value):
+            for condition_test in tests:
+                if condition_test(_item, _value):
+                    return True
+            return False
+        return test
+
+    def get_values(self):
+        # Values of all conditions are looked up together.
+        values = []
+        for condition in self.conditions:
+            condition_values = condition.get_values()
+            if condition_values is None:
+                return None
+            values.extend(condition_values)
+        return values
+
+    def get_type(self):
+        # Types of all conditions are looked up as tuple of types.
+        types = []
+        for condition in self.conditions:
+            _type = condition.get_type()
+            if _type is None:
+                return None
+            types.append(_type)
+        return tuple(types)
+
+    def __repr__(self):
+        return "({})".format(" | ".join(map(repr, self.conditions)))
+
+
+class Not(Condition):
+    def __init__(self, condition) -> None:
+        self.condition = condition
+        self.uses_value = condition.uses_value
+
+    def compile(self):
+        condition_test = self.condition.compile()
+        return lambda _item, _value: not condition_test(_item, _value)
+
+    def __repr__(self):
+        return "~{!r}".format(self.condition)
+
+
+def value_in(values):
+    '''Matches items whose values are any of values'''
+    return ValueIn(values)
+
+def value_equals(value):
+    '''Matches items whose values equal value'''
+    return ValueIn((value,))
+
+def value_between(low=None, high=None):
+    '''Matches items with values between low and high(inclusive).
+
+    None leaves low or high end open.'''
+    return ValueBetween(low, high)
+
+def of_type(_type):
+    '''Matches items whose objects are instances of type'''
+    return OfType(_type)
+
+def truthy():
+    '''Matches items whose values evaluate to true'''
+    return Truthy()
+
+def falsy():
+    '''Matches items whose values evaluate to false'''
+    return Falsy()
+
+def where(func):
+    '''Matches items for which func(item) returns true'''
+    return Where(func)
+
+
+def split_conditions(conditions):
+    # Returns list of conditions that all need to match.
+    # Conditions combined with & are flattened into one list.
+    split = []
+    for condition in conditions:
+        if not isinstance(condition, Condition):
+            err_msg = "Expected Condition not {!r}"
+            raise TypeError(err_msg.format(condition))
+        if isinstance(condition, And):
+            split.extend(condition.conditions)
+        else:
+            split.append(condition)
+    return split
+
+def _compile_conditions(conditions):
+    # Returns test of conditions or None if there are no conditions.
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0].compile()
+    return And(*conditions).compile()
+
+def iter_matches(items, conditions, value_getter=None):
+    '''Yields items matching all of conditions in one pass.
+
+    Conditions not needing values are tested first and value of item is
+    only evaluated once for items passing them.'''
+    conditions = split_conditions(conditions)
+    item_test = _compile_conditions([condition
+        for condition in conditions if not condition.uses_value])
+    value_test = _compile_conditions([condition
+        for condition in conditions if condition.uses_value])
+    if value_test is None:
+        if item_test is None:
+            return iter(items)
+        return (_item for _item in items if item_test(_item, None))
+    get_value = value_getter or operator.methodcaller("get_value")
+    if item_test is None:
+        return (_item for _item in items
+            if value_test(_item, get_value(_item)))
+    return (_item for _item in items if item_test(_item, None)
+        and value_test(_item, get_value(_item)))
+
+def select_items(items, conditions, limit=None, value_getter=None):
+    '''Returns list of items matching all of conditions.
+
+    Scan stops once 'limit' items were found.'''
+    matches = iter_matches(items, conditions, value_getter)
+    if limit is not None:
+        matches = itertools.islice(matches, max(limit, 0))
+    return list(matches)
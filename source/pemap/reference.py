@@ -2,8 +2,26 @@ import collections
 import inspect
 
 
+# Results of is_method_func() keyed by type of object.
+_method_func_types = {}
+
+
+def is_method_func(_object):
+    # Checks if object is function or method.
+    # Result is remembered for type of object.
+    object_type = type(_object)
+    try:
+        return _method_func_types[object_type]
+    except KeyError:
+        result = inspect.isfunction(_object) or inspect.ismethod(_object)
+        _method_func_types[object_type] = result
+        return result
+
+
 class Reference():
     # Wraps object and provide methods for operating on it.
+    __slots__ = ("_object",)
+
     def __init__(self, _object) -> None:
         # _object: Any python object
         self._object = _object
@@ -33,12 +51,7 @@ class Reference():
 
     def is_method_func(self):
         # Checks if object if value is function or method.
-        if self.is_callable():
-            if inspect.isfunction(self._object):
-                return True
-            else:
-                return inspect.ismethod(self._object)
-        return False
+        return is_method_func(self._object)
 
     def is_iterable(self):
         # Checks if underlying object is iterable
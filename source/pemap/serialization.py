@@ -0,0 +1,170 @@
+import array
+import io
+import pickle
+import sys
+
+
+# Bytes at start of serialized block identifying the format.
+_magic = b"PEMAPBLK"
+# Version of format, increased when sections change.
+_format_version = 1
+# Protocol 5 passes numeric columns as buffers without copying them.
+_protocol = pickle.HIGHEST_PROTOCOL
+# PickleBuffer is not available before python 3.8.
+_pickle_buffer = getattr(pickle, "PickleBuffer", None)
+# Array typecodes for values of exact types.
+_column_typecodes = {int: "q", float: "d"}
+
+
+def _get_column_typecode(values):
+    # Returns typecode of array that can hold values without change.
+    # None is returned if values need to be kept as list.
+    if not values:
+        return None
+    typecode = _column_typecodes.get(type(values[0]))
+    if typecode is None:
+        return None
+    value_type = type(values[0])
+    for _value in values:
+        if type(_value) is not value_type:
+            return None
+    return typecode
+
+def _to_column(values, typecode=None):
+    # Returns section for values packing numbers into array buffer.
+    # Array is passed as PickleBuffer so it can be out-of-band.
+    if typecode is None:
+        typecode = _get_column_typecode(values)
+    if typecode is None:
+        return ("list", values)
+    try:
+        column = array.array(typecode, values)
+    except OverflowError:
+        # Integers outside range of 64 bits.
+        return ("list", values)
+    if _pickle_buffer is None:
+        return ("array", typecode, sys.byteorder, column.tobytes())
+    return ("array", typecode, sys.byteorder, _pickle_buffer(column))
+
+def _from_column(section):
+    # Returns list of values from section created by _to_column().
+    if section[0] == "list":
+        return section[1]
+    _, typecode, byteorder, data = section
+    column = array.array(typecode)
+    # Out-of-band buffers may keep format of array they came from.
+    column.frombytes(memoryview(data).cast("B"))
+    if byteorder != sys.byteorder:
+        column.byteswap()
+    return column.tolist()
+
+def _get_state(block_object, index=True):
+    # Returns sections of block as dict of plain python objects.
+    items = block_object.get_items()
+    item_types = list(dict.fromkeys(_item.__class__ for _item in items))
+    if len(item_types) > 1:
+        type_positions = {item_type: position for position, item_type
+            in enumerate(item_types)}
+        type_codes = _to_column([type_positions[_item.__class__]
+            for _item in items], "q")
+    else:
+        type_codes = None
+    # Value cache remembers values of this process only.
+    init_kwargs = block_object._get_init_kwargs()
+    init_kwargs.pop("value_cache", None)
+    state = {
+        "version": _format_version,
+        "block_type": block_object.__class__,
+        "init_kwargs": init_kwargs,
+        "item_types": item_types,
+        "type_codes": type_codes,
+        "values": _to_column([_item._get_raw_value() for _item in items]),
+        "objects": block_object.extract_objects_from_items(items),
+        "sorted_positions": None
+    }
+    sorted_index = block_object._sorted_index
+    if index and sorted_index is not None:
+        # Positions are stored instead of items of sorted index.
+        positions = {id(_item): position for position, _item
+            in enumerate(items)}
+        state["sorted_positions"] = _to_column([positions[id(_item)]
+            for _item in sorted_index[1]], "q")
+    return state
+
+def _from_state(state, block_type):
+    # Creates block from sections returned by _get_state().
+    if state.get("version") != _format_version:
+        err_msg = "Unsupported version of serialized block: {!r}"
+        raise ValueError(err_msg.format(state.get("version")))
+    saved_type = state["block_type"]
+    if not issubclass(saved_type, block_type):
+        err_msg = "Serialized block is '{}' not '{}'"
+        raise TypeError(err_msg.format(saved_type.__name__,
+            block_type.__name__))
+    values = _from_column(state["values"])
+    objects = state["objects"]
+    item_types = state["item_types"]
+    if state["type_codes"] is None:
+        item_type = item_types[0] if item_types else saved_type._item_type
+        items = list(map(item_type._from_object_value, objects, values))
+    else:
+        type_codes = _from_column(state["type_codes"])
+        items = [item_types[code]._from_object_value(_object, _value)
+            for code, _object, _value in zip(type_codes, objects, values)]
+    block_object = saved_type([], **state["init_kwargs"])
+    block_object._restore_items(items)
+    if state["sorted_positions"] is not None:
+        positions = _from_column(state["sorted_positions"])
+        block_object._restore_sorted_index(positions)
+    return block_object
+
+def _get_buffer_kwargs(**kwargs):
+    # Returns out-of-band arguments that were provided.
+    # Pickle before protocol 5 does not accept them.
+    return {name: argument for name, argument in kwargs.items()
+        if argument is not None}
+
+
+def dump_block(block_object, file, index=True, buffer_callback=None):
+    '''Writes block to binary file object.
+
+    block_object: Block
+        Block to write, its values and objects need to be picklable.
+    file: IO
+        File object opened in binary mode.
+    index: Bool
+        Enables writing sorted index if already built, default: True.
+    buffer_callback: Callable
+        Receives PickleBuffer of numeric values instead of writing it
+        to file(see pickle protocol 5), default: None.
+    '''
+    file.write(_magic)
+    pickler = pickle.Pickler(file, _protocol,
+        **_get_buffer_kwargs(buffer_callback=buffer_callback))
+    pickler.dump(_get_state(block_object, index))
+
+def load_block(file, block_type, buffers=None):
+    '''Reads block written by `dump_block()` from binary file object.
+
+    block_type: Type
+        Expected type of block, block can also be of its sub class.
+    buffers: Iterator
+        Buffers passed to 'buffer_callback' of `dump_block()`.
+
+    Objects of block are not checked again as they were checked when
+    block was created.'''
+    if file.read(len(_magic)) != _magic:
+        raise ValueError("Data is not a serialized block")
+    unpickler = pickle.Unpickler(file,
+        **_get_buffer_kwargs(buffers=buffers))
+    return _from_state(unpickler.load(), block_type)
+
+def dumps_block(block_object, index=True, buffer_callback=None):
+    '''Returns bytes of block, see `dump_block()`'''
+    file = io.BytesIO()
+    dump_block(block_object, file, index, buffer_callback)
+    return file.getvalue()
+
+def loads_block(data, block_type, buffers=None):
+    '''Creates block from bytes of `dumps_block()`'''
+    return load_block(io.BytesIO(data), block_type, buffers)
@@ -1,3 +1,5 @@
+import bisect
+import operator
 
 
 def rename_attribute(object_, old_attr_name, new_attr_name):
@@ -9,3 +11,121 @@ def copy_attribute(object_, old_attr_name, new_attr_name):
     # Creates copy of attribute with new name.
     setattr(object_, new_attr_name, getattr(object_, old_attr_name))
 
+def is_plain_type(_type):
+    # Checks if type is class or tuple of classes created by type.
+    # Instances of such types can be matched through their classes.
+    # Abstract classes and protocols may match objects differently
+    # or change what they match(e.g register()).
+    if isinstance(_type, tuple):
+        return all(map(is_plain_type, _type))
+    return type(_type) is type
+
+def is_subtype(object_type, _type):
+    # Checks if instances of object type are instances of plain type.
+    # Classes are found in __mro__, tuples are checked with issubclass().
+    if type(_type) is type:
+        return _type in object_type.__mro__
+    return issubclass(object_type, _type)
+
+def is_plain_subtype(sub_type, _type):
+    # Checks if instances of plain sub type are instances of plain type.
+    # Sub type can be tuple whose types all need to be sub types.
+    if isinstance(sub_type, tuple):
+        return all(is_plain_subtype(member, _type) for member in sub_type)
+    return issubclass(sub_type, _type)
+
+def get_type_matcher(_type):
+    '''Returns function checking if objects are instances of type.
+
+    Result is remembered for each class of objects so that objects of
+    class checked before are matched with dict lookup. Types that are
+    not plain classes are checked with isinstance() on each object.'''
+    if not is_plain_type(_type):
+        return lambda _object: isinstance(_object, _type)
+    matches = {}
+    def matches_type(_object):
+        object_type = _object.__class__
+        found = matches.get(object_type)
+        if found is None:
+            found = is_subtype(object_type, _type)
+            matches[object_type] = found
+        return found
+    return matches_type
+
+
+class KeyMap():
+    '''Maps keys to values supporting keys that cannot be hashed.
+
+    Values with same key are kept in order they were provided. Hashable
+    keys are kept in dict. Other keys are kept sorted and searched with
+    bisect, or are scanned if they cannot be sorted.'''
+
+    def __init__(self, keys, values=None) -> None:
+        '''
+        keys: Iterator
+            Keys of values.
+        values: Iterator
+            Values in same order as keys, default: keys.
+        '''
+        if values is None:
+            values = keys
+        self._hashed = {}
+        unhashable = []
+        for key, _value in zip(keys, values):
+            try:
+                self._hashed.setdefault(key, []).append(_value)
+            except TypeError:
+                unhashable.append((key, _value))
+        try:
+            # Sorting is stable keeping order of values of same key.
+            unhashable.sort(key=operator.itemgetter(0))
+            self._sorted = True
+        except TypeError:
+            self._sorted = False
+        self._unhashable = unhashable
+        self._unhashable_keys = [key for key, _ in unhashable]
+
+    def add(self, key, _value=None):
+        '''Adds value of key, key itself is added if value is None'''
+        if _value is None:
+            _value = key
+        try:
+            self._hashed.setdefault(key, []).append(_value)
+            return
+        except TypeError:
+            pass
+        if self._sorted:
+            try:
+                # Value goes after values of same key keeping their order.
+                position = bisect.bisect_right(self._unhashable_keys, key)
+            except TypeError:
+                self._sorted = False
+            else:
+                self._unhashable_keys.insert(position, key)
+                self._unhashable.insert(position, (key, _value))
+                return
+        self._unhashable_keys.append(key)
+        self._unhashable.append((key, _value))
+
+    def get(self, key, default=None):
+        '''Gets list of values of key or default'''
+        try:
+            return self._hashed.get(key, default)
+        except TypeError:
+            pass
+        if self._sorted:
+            try:
+                start = bisect.bisect_left(self._unhashable_keys, key)
+                end = bisect.bisect_right(self._unhashable_keys, key, start)
+            except TypeError:
+                # Key cannot be compared with sorted keys.
+                pass
+            else:
+                values = [_value for _key, _value 
+                    in self._unhashable[start:end] if _key == key]
+                return values or default
+        values = [_value for _key, _value in self._unhashable if _key == key]
+        return values or default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
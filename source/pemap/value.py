@@ -1,5 +1,49 @@
 from pemap import reference
 
+import operator
+import time
+
+
+# Marks cached value that was not yet computed.
+# Also returned by resolvers when object does not provide value.
+_missing = object()
+
+
+def _build_value_resolver(object_type, attr_name, method_name):
+    # Returns function getting value from objects of type.
+    # Decision on where to get value is made once for the type.
+    # None is returned if type needs to be checked for each object.
+    if hasattr(object_type, "__getattr__") or \
+        object_type.__getattribute__ is not object.__getattribute__:
+        # Attributes may be computed differently for each object.
+        return None
+    # Instances without __dict__ cannot get attributes of their own.
+    has_instance_dict = getattr(object_type, "__dictoffset__", 1) != 0
+    if hasattr(object_type, attr_name):
+        return operator.attrgetter(attr_name)
+    if hasattr(object_type, method_name):
+        if not has_instance_dict:
+            return operator.methodcaller(method_name)
+        def resolve(_object):
+            # Value attribute of object has priority over method.
+            _value = _object.__dict__.get(attr_name, _missing)
+            if _value is _missing:
+                return getattr(_object, method_name)()
+            return _value
+        return resolve
+    if not has_instance_dict:
+        return lambda _object: _missing
+    def resolve(_object):
+        # Method may be set on object itself as class does not have it.
+        _dict = _object.__dict__
+        _value = _dict.get(attr_name, _missing)
+        if _value is _missing:
+            method = _dict.get(method_name, _missing)
+            if method is not _missing:
+                return method()
+        return _value
+    return resolve
+
     
 class Value(reference.Reference):
     '''Defines value to be used with item'''
@@ -14,6 +58,15 @@ class Value(reference.Reference):
     # Used for getting value for object.
     _default_value_attr_names = ("value", "get_value") 
     _value_attr_names = _default_value_attr_names
+    # Functions for getting value from objects keyed by their type.
+    # Each sub class gets own resolvers as attribute names may differ.
+    _value_resolvers = {}
+
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._value_resolvers = {}
 
     def __init__(self, value) -> None:
         super().__init__(value)
@@ -38,6 +91,36 @@ class Value(reference.Reference):
     def get_value_method_name(cls):
         return cls._value_attr_names[1]
 
+    @classmethod
+    def resolve_value(cls, _object):
+        '''Gets value from object using its value attribute or method.
+
+        Where to get value from is decided once for each type of object
+        and reused for other objects of that type. `_missing` is 
+        returned if object does not provide value.'''
+        resolver = cls._value_resolvers.get(_object.__class__)
+        if resolver is None:
+            resolver = _build_value_resolver(_object.__class__, 
+                *cls._value_attr_names)
+            if resolver is None:
+                resolver = cls._resolve_value_slowly
+            cls._value_resolvers[_object.__class__] = resolver
+        try:
+            return resolver(_object)
+        except AttributeError:
+            # e.g property raising AttributeError or empty slot.
+            return cls._resolve_value_slowly(_object)
+
+    @classmethod
+    def _resolve_value_slowly(cls, _object):
+        # Gets value from object checking its attributes each time.
+        attr_name, method_name = cls._value_attr_names
+        if hasattr(_object, attr_name):
+            return getattr(_object, attr_name)
+        elif hasattr(_object, method_name):
+            return getattr(_object, method_name)()
+        return _missing
+
     def get_value(self, *args, **kwargs):
         # Gets value behind this object.
         # Object of method or function will result in return value
@@ -52,4 +135,68 @@ class Value(reference.Reference):
     def set_value(self, value):
         self._object = value
 
+    def invalidate(self):
+        # Discards remembered result of function(nothing to discard).
+        pass
+
+    def is_dynamic(self):
+        # Checks if value is computed on each call(function or method).
+        # Value wrapped by other value is checked on its wrapped value.
+        if isinstance(self._object, Value):
+            return self._object.is_dynamic()
+        return self.is_method_func()
+
 
+
+
+class CachedValue(Value):
+    '''Varient of Value remembering return value of function or method.
+
+    Function is called on first access and its return value is reused
+    until `invalidate()` is called, value is changed or time to live
+    expires. Functions called with arguments are not cached.'''
+    __slots__ = ("_ttl", "_cached_value", "_cached_time")
+    # Function used to get current time for time to live.
+    _timer = time.monotonic
+
+    def __init__(self, value, ttl=None) -> None:
+        '''
+        value: Any
+            Any object to be associated with item.  
+        ttl: Float
+            Seconds cached return value is valid for, default: None.
+        '''
+        super().__init__(value)
+        self._ttl = ttl
+        self.invalidate()
+
+    def set_ttl(self, ttl):
+        self._ttl = ttl
+
+    def get_ttl(self):
+        return self._ttl
+
+    def invalidate(self):
+        # Discards remembered return value of function.
+        self._cached_value = _missing
+        self._cached_time = None
+
+    def _is_cache_valid(self):
+        # Checks if remembered return value can still be used.
+        if self._cached_value is _missing:
+            return False
+        if self._ttl is None:
+            return True
+        return self._timer() - self._cached_time < self._ttl
+
+    def get_value(self, *args, **kwargs):
+        if args or kwargs or not self.is_dynamic():
+            return super().get_value(*args, **kwargs)
+        if not self._is_cache_valid():
+            self._cached_value = super().get_value()
+            self._cached_time = self._timer()
+        return self._cached_value
+
+    def set_value(self, value):
+        super().set_value(value)
+        self.invalidate()
@@ -0,0 +1,63 @@
+import asyncio
+import unittest
+
+from pemap import asynchronous as _asynchronous
+from pemap import items as _items
+
+
+class TestAsyncBlock(unittest.TestCase):
+    def setUp(self) -> None:
+        self._running = 0
+        self._max_running = 0
+        self._marry_item = _items.Item("Marry", self._value_func(30))
+        self._john_item = _items.Item("John", 10)
+        self._ricky_item = _items.Item("Ricky", self._value_func(40))
+        self._items = [self._marry_item, self._john_item, self._ricky_item]
+        self._block = _asynchronous.AsyncBlock(self._items, concurrency=1)
+
+    def _value_func(self, value):
+        # Returns coroutine function returning value.
+        async def func():
+            self._running += 1
+            self._max_running = max(self._max_running, self._running)
+            await asyncio.sleep(0)
+            self._running -= 1
+            return value
+        return func
+
+    def _run(self, coroutine):
+        return asyncio.run(coroutine)
+
+    def test_aget_value(self):
+        self.assertEqual(self._run(self._marry_item.aget_value()), 30)
+        self.assertEqual(self._run(self._john_item.aget_value()), 10)
+
+    def test_aget_values(self):
+        self.assertEqual(self._run(self._block.aget_values()), [30, 10, 40])
+        self.assertEqual(self._max_running, 1)
+
+    def test_concurrency(self):
+        block = _asynchronous.AsyncBlock(self._items)
+        self._run(block.aget_values())
+        self.assertEqual(self._max_running, 2)
+
+    def test_aget_items_by_value(self):
+        items = self._run(self._block.aget_items_by_values([30, 10]))
+        self.assertEqual(items, [self._marry_item, self._john_item])
+        item = self._run(self._block.aget_item_by_value(40))
+        self.assertEqual(item, self._ricky_item)
+
+    def test_aiter(self):
+        async def collect():
+            return [item async for item in self._block]
+        self.assertEqual(self._run(collect()), 
+            [self._john_item, self._marry_item, self._ricky_item])
+
+    def test_value_cache(self):
+        block = _asynchronous.AsyncBlock(self._items, value_cache=True)
+        self.assertEqual(self._run(block.ato_tuple())[0], (30, "Marry"))
+        self.assertEqual(block.get_values(), [30, 10, 40])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,17 +1,27 @@
+import abc
+import numbers
+import typing
 import unittest
 
 from pemap import block as _block
 from pemap import items as _items
+from pemap import query as _query
+
+
+@typing.runtime_checkable
+class _HasUpper(typing.Protocol):
+    upper: object
 
 
 class TestBaseBlock(unittest.TestCase):
     _block_type = _block.BaseBlock
+    _item_type = _items.Item
 
     def setUp(self) -> None:
-        self._marry_item = _items.Item("Marry", 30)
-        self._john_item = _items.Item("John", 10)
-        self._ben_item = _items.Item("Ben", 30)
-        self._ricky_item = _items.Item("Ricky", 40)
+        self._marry_item = self._item_type("Marry", 30)
+        self._john_item = self._item_type("John", 10)
+        self._ben_item = self._item_type("Ben", 30)
+        self._ricky_item = self._item_type("Ricky", 40)
 
         self._items = [self._marry_item, self._john_item, 
             self._ricky_item, self._ben_item]
@@ -36,6 +46,11 @@ class TestBaseBlock(unittest.TestCase):
 
     def test_get_items(self):
         self.assertCountEqual(self._block.get_items(), self._items)     
+
+    def test_copy_items_deep(self):
+        items = self._block.copy_items(deep=True)
+        self.assertEqual(self._block.extract_objects_from_items(items),
+            self._block.get_objects())
     
     def get_objects(self):
         self.assertCountEqual(self._block.get_objects(), self._objects)
@@ -48,6 +63,46 @@ class TestBaseBlock(unittest.TestCase):
         items = self._block_type.sort_items_by_value(self._items)
         self.assertEqual(items, self._sorted_items)
 
+    def test_get_sorted_items(self):
+        self.assertEqual(self._block.get_sorted_items(), self._sorted_items)
+        self.assertEqual(list(self._block), self._sorted_items)
+
+    def test_query(self):
+        condition = _query.value_in([30, 40]) & _query.of_type(str) & \
+            _query.where(lambda item: item.get_object() != "Ricky")
+        self.assertEqual(self._block.query(condition), 
+            [self._marry_item, self._ben_item])
+        self.assertEqual(self._block.query(condition, limit=1), 
+            [self._marry_item])
+        condition = _query.value_equals(10) | _query.value_between(35)
+        self.assertEqual(self._block.query(condition), 
+            [self._john_item, self._ricky_item])
+        condition = ~_query.value_between(20, 35) & _query.truthy()
+        self.assertEqual(self._block.query_first(condition), 
+            self._john_item)
+        self.assertIsNone(self._block.query_first(_query.falsy()))
+        with self.assertRaises(TypeError):
+            self._block.query(lambda item: True)
+
+    def test_get_sorted_items_options(self):
+        items = self._block.get_sorted_items(reverse=True)
+        self.assertEqual(items, sorted(self._items, 
+            key=lambda i: i.get_value(), reverse=True))
+        items = self._block.get_sorted_items(key=lambda v: -v)
+        self.assertEqual(items[0], self._ricky_item)
+        items = self._block.get_sorted_items(
+            tiebreak=lambda i: i.get_object())
+        self.assertEqual(items[1:3], [self._ben_item, self._marry_item])
+
+    def test_top_k(self):
+        items = self._block.top_k(3)
+        self.assertEqual(items, 
+            [self._ricky_item, self._marry_item, self._ben_item])
+        items = self._block.top_k(2, largest=False)
+        self.assertEqual(items, [self._john_item, self._marry_item])
+        self.assertEqual(self._block.top_k(0), [])
+        self.assertEqual(len(self._block.top_k(10)), 4)
+
     def test_filter_items(self, key=None, limit=None):
         self.assertEqual(self._block.filter_items(), self._items)
         items = self._block.filter_items(limit=2)
@@ -84,10 +139,390 @@ class TestBlock(TestBaseBlock):
         item = self._block.get_item_by_values([10])
         self.assertEqual(item, self._john_item)
 
+    def test_get_items_by_values_index(self):
+        items = self._block.get_items_by_values([30, 40, 30])
+        self.assertEqual(items, 
+            [self._marry_item, self._ricky_item, self._ben_item])
+        items = self._block.get_items_by_values([[30]])
+        self.assertEqual(items, [])
+
+    def test_get_items_by_value_unhashable(self):
+        list_item = self._item_type("Lucy", [30])
+        block = self._block_type(self._items + [list_item])
+        self.assertEqual(block.get_items_by_value([30]), [list_item])
+        self.assertEqual(block.get_items_by_value(10), [self._john_item])
+
+    def test_get_items_by_value_dynamic(self):
+        func_item = self._item_type("Lucy", lambda: 10)
+        block = self._block_type(self._items + [func_item])
+        items = block.get_items_by_value(10)
+        self.assertEqual(items, [self._john_item, func_item])
+
+    def test_block_from_block(self):
+        self._block.get_items_by_value(10)
+        self._block.get_sorted_items()
+        block = self._block_type(self._block)
+        self.assertEqual(block.get_items(), self._items)
+        self.assertIsNot(block.get_items(), self._block.get_items())
+        self.assertEqual(block._sorted_index, self._block._sorted_index)
+        block.add_item(self._item_type("Lucy", 10))
+        self.assertEqual(len(block.get_items_by_value(10)), 2)
+        self.assertEqual(len(self._block.get_items_by_value(10)), 1)
+        self.assertEqual(len(self._block.get_sorted_items()), 4)
+        with self.assertRaises(TypeError):
+            self._block_type(self._block, _type=int)
+
+    def test_block_of_tuple_type(self):
+        block = self._block_type(self._items, _type=(str, int))
+        self.assertEqual(self._block_type(block).get_items(), self._items)
+        self.assertEqual(block.intersection(block).get_items(), 
+            self._items[:3])
+        self.assertEqual(len(block.symmetric_difference(block)), 0)
+        self.assertEqual(len(self._block_type(block, _type=str)), 4)
+        with self.assertRaises(TypeError):
+            self._block_type(block, _type=int)
+
+    def test_block_of_abstract_type(self):
+        class Posing():
+            __class__ = int
+        block = self._block_type(self._items, _type=_HasUpper)
+        self.assertEqual(block.get_items(), self._items)
+        item = self._item_type(Posing(), 1)
+        block = self._block_type([item], _type=int)
+        self.assertEqual(block.get_items(), [item])
+        with self.assertRaises(TypeError):
+            self._block_type(self._items, _type=typing.Sized).add_item(
+                self._item_type(1, 1))
+
+    def _make_other_block(self):
+        self._lucy_item = self._item_type("Lucy", 10)
+        self._ken_item = self._item_type("Ken", 50)
+        return self._block_type([self._lucy_item, self._ken_item])
+
+    def test_union(self):
+        block = self._block.union(self._make_other_block())
+        self.assertEqual(block.get_items(), [self._marry_item, 
+            self._john_item, self._ricky_item, self._ken_item])
+        self.assertIsInstance(block, self._block_type)
+        block = self._block.union(self._make_other_block(), key="object")
+        self.assertEqual(len(block), 6)
+        items = [self._item_type("Lucy", 50), self._item_type("Ken", 50),
+            self._item_type("Sam", [1]), self._item_type("Tom", [1])]
+        block = self._block.union(_block.Block(items), key="object")
+        self.assertEqual(block.get_items(), self._items + items)
+        block = self._block_type(items).union(self._block)
+        self.assertEqual(block.get_items(), [items[0], items[2], 
+            self._marry_item, self._john_item, self._ricky_item])
+
+    def test_intersection(self):
+        block = self._block.intersection(self._make_other_block())
+        self.assertEqual(block.get_items(), [self._john_item])
+        block = self._block.intersection(self._block, 
+            key=lambda item: item.get_object()[0])
+        self.assertEqual(block.get_items(), self._items)
+
+    def test_difference(self):
+        block = self._block.difference(self._make_other_block())
+        self.assertEqual(block.get_items(), 
+            [self._marry_item, self._ricky_item])
+        block = self._block.symmetric_difference(self._make_other_block())
+        self.assertEqual(block.get_items(), 
+            [self._marry_item, self._ricky_item, self._ken_item])
+        with self.assertRaises(ValueError):
+            self._block.difference(self._block, key="type")
+
+    def test_set_operations_unhashable(self):
+        list_item = self._item_type("Lucy", [30])
+        block = self._block_type([list_item, self._john_item])
+        other_block = self._block_type([self._item_type("Ken", [30])])
+        self.assertEqual(block.intersection(other_block).get_items(), 
+            [list_item])
+        self.assertEqual(block.difference(other_block).get_items(), 
+            [self._john_item])
+
+    def test_join(self):
+        other_block = self._make_other_block()
+        pairs = self._block.join(other_block)
+        self.assertEqual(pairs, [(self._john_item, self._lucy_item)])
+        pairs = self._block.join(other_block, how="left")
+        self.assertEqual(len(pairs), 4)
+        self.assertEqual(pairs[0], (self._marry_item, None))
+        pairs = self._block.join(other_block, how="outer")
+        self.assertEqual(pairs[-1], (None, self._ken_item))
+        with self.assertRaises(ValueError):
+            self._block.join(other_block, how="right")
+
+    def test_join_sorted(self):
+        other_block = self._make_other_block()
+        pairs = self._block.join(other_block, how="outer", sort=True)
+        self.assertEqual(pairs, [(self._john_item, self._lucy_item), 
+            (self._marry_item, None), (self._ben_item, None), 
+            (self._ricky_item, None), (None, self._ken_item)])
+        pairs = self._block.join(self._block, sort=True)
+        self.assertEqual(len(pairs), 6)
+        # Built sorted indexes do not change order of pairs.
+        self.assertEqual(self._block.join(other_block, how="outer")[0], 
+            (self._marry_item, None))
+        with self.assertRaises(ValueError):
+            self._block.join(other_block, on="object", sort=True)
+
+    def test_join_sorted_incomparable(self):
+        other_block = _block.Block([self._item_type("Lucy", "a")])
+        other_block.get_sorted_items()
+        self._block.get_sorted_items()
+        pairs = self._block.join(other_block, how="outer", sort=True)
+        self.assertEqual(len(pairs), 5)
+        self.assertEqual(pairs[0], (self._marry_item, None))
+
+    def test_join_sorted_unordered(self):
+        block = self._block_type([self._item_type("Lucy", frozenset({1}))])
+        other_block = _block.Block([self._item_type("Ken", frozenset({2}))])
+        self.assertEqual(block.join(other_block, sort=True), [])
+        block = self._block_type([self._item_type("Lucy", float("nan"))])
+        other_block = _block.Block([self._item_type("Ken", float("nan"))])
+        self.assertEqual(block.join(other_block, sort=True), [])
+
+    def test_join_as_block(self):
+        block = self._block.join(self._make_other_block(), 
+            on=lambda item: item.get_value() > 20, as_block=True)
+        self.assertEqual(block.get_objects()[0], ("Marry", "Ken"))
+        self.assertEqual(block.get_values(), [True, False, True, True])
+
+    def test_query_sorted_index(self):
+        self.assertEqual(self._block.query(_query.value_between()), 
+            self._items)
+        self._block.get_sorted_items()
+        self._block.get_items_by_value(10)
+        condition = _query.value_between(25, 40) & _query.of_type(str)
+        self.assertEqual(self._block.query(condition), 
+            [self._marry_item, self._ricky_item, self._ben_item])
+        condition = _query.value_between(high=10) | _query.value_equals(40)
+        self.assertEqual(self._block.query(condition), 
+            [self._john_item, self._ricky_item])
+
+    def test_query_unhashable_values(self):
+        items = [self._item_type("Sam", [1]), self._item_type("Lucy", 1)]
+        block = self._block_type(items, indexed=False)
+        self.assertEqual(block.query(_query.value_in([1, 2])), items[1:])
+        self.assertEqual(block.query(_query.value_in([[1]])), items[:1])
+        condition = _query.value_in([1, 2]) | _query.of_type(int)
+        self.assertEqual(block.query(condition), items[1:])
+
+    def test_query_index(self):
+        condition = _query.value_in([30, 40]) & _query.value_equals(40)
+        self.assertEqual(self._block.query(condition), [self._ricky_item])
+        # Queries scan items instead of building index.
+        self.assertFalse(self._block._value_index_built)
+        self._block.get_items_by_value(10)
+        self.assertEqual(self._block.query(condition), [self._ricky_item])
+        condition = _query.value_in([[30]]) | _query.value_equals(10)
+        self.assertEqual(self._block.query(condition), [self._john_item])
+
+    def test_group_by(self):
+        groups = self._block.group_by()
+        self.assertEqual(groups, {30: [self._marry_item, self._ben_item], 
+            10: [self._john_item], 40: [self._ricky_item]})
+        self._block.get_items_by_value(10)
+        self.assertEqual(self._block.group_by(), groups)
+        groups = self._block.group_by(lambda item: len(item.get_object()))
+        self.assertEqual(groups[4], [self._john_item])
+
+    def test_group_by_blocks(self):
+        groups = self._block.group_by("object", as_blocks=True)
+        self.assertEqual(len(groups), 4)
+        block = groups["Marry"]
+        self.assertIsInstance(block, self._block_type)
+        self.assertIs(groups["Marry"], block)
+        self.assertEqual(block.get_items(), [self._marry_item])
+
+    def test_aggregate(self):
+        results = self._block.aggregate(
+            lambda item: item.get_value() > 20, 
+            ["count", "sum", "min", "max", "mean", "first", "last"])
+        self.assertEqual(results[True], {"count": 3, "sum": 100, "min": 30,
+            "max": 40, "mean": 100 / 3, "first": "Marry", "last": "Ben"})
+        self.assertEqual(self._block.aggregate()[30], {"count": 2})
+        with self.assertRaises(ValueError):
+            self._block.aggregate(aggregations=["median"])
+
+    def test_reset_indexes(self):
+        self.assertEqual(self._block.get_items_by_value(50), [])
+        self._john_item.set_value(50)
+        self._block.reset_indexes()
+        self.assertEqual(self._block.get_items_by_value(50), 
+            [self._john_item])
+
+    def test_sorted_index_replaced_value(self):
+        self.assertEqual(self._block.get_sorted_items(), self._sorted_items)
+        self._marry_item.set_value(0)
+        self.assertEqual(self._block.get_sorted_items()[0], 
+            self._marry_item)
+        self.assertEqual(list(self._block), 
+            [self._marry_item, self._john_item, self._ben_item, 
+            self._ricky_item])
+        self.assertEqual(self._block.min_item(), self._marry_item)
+
+    def test_sorted_order_cache(self):
+        key = lambda value: -value
+        items = self._block.get_sorted_items(key)
+        self.assertEqual(self._block.get_sorted_items(key), items)
+        self._block.get_items()[0].set_value(0)
+        self.assertEqual(self._block.get_sorted_items(key)[-1], 
+            self._block.get_items()[0])
+        item = self._item_type("Lucy", 50)
+        self._block.add_item(item)
+        self.assertEqual(self._block.get_sorted_items(key)[0], item)
+
+    def test_top_k_sorted_index(self):
+        self._block.get_sorted_items()
+        self.assertIsNotNone(self._block._sorted_index)
+        self.test_top_k()
+
+    def test_get_items_in_range(self):
+        items = self._block.get_items_in_range(20, 40)
+        self.assertEqual(items, self._sorted_items[1:])
+        self.assertEqual(self._block.get_items_in_range(50, 60), [])
+
+    def test_get_items_below(self):
+        items = self._block.get_items_below(30)
+        self.assertEqual(items, [self._john_item])
+
+    def test_get_items_above(self):
+        items = self._block.get_items_above(30)
+        self.assertEqual(items, [self._ricky_item])
+
+    def test_min_item(self):
+        self.assertEqual(self._block.min_item(), self._john_item)
+        self.assertIsNone(self._block_type([]).min_item())
+
+    def test_max_item(self):
+        self.assertEqual(self._block.max_item(), self._ricky_item)
+
+    def test_from_pairs(self):
+        block = self._block_type.from_pairs(self._tuple, 
+            item_type=self._item_type)
+        self.assertEqual(block.to_tuple(), self._tuple)
+        self.assertIsInstance(block.get_items()[0], self._item_type)
+        with self.assertRaises(TypeError):
+            self._block_type.from_pairs(self._tuple, _type=int)
+        block = self._block_type.from_pairs(self._tuple, validate=False, 
+            _type=int)
+        self.assertEqual(len(block), len(self._tuple))
+
+    def test_from_dict(self):
+        block = self._block_type.from_dict(dict(self._tuple))
+        self.assertEqual(block.to_dict(), dict(self._tuple))
+
+    def test_from_columns(self):
+        block = self._block_type.from_columns(self._values, self._objects)
+        self.assertEqual(block.to_tuple(), self._tuple)
+        with self.assertRaises(ValueError):
+            self._block_type.from_columns(self._values, [])
+
+    def test_add_item(self):
+        # Indexes are built before adding to check they get updated.
+        self._block.get_items_by_value(10)
+        self._block.get_sorted_items()
+        item = self._item_type("Lucy", 20)
+        self._block.add_item(item)
+        self.assertEqual(self._block.get_items()[-1], item)
+        self.assertEqual(self._block.get_items_by_values([20, 10]), 
+            [self._john_item, item])
+        self.assertEqual(self._block.get_sorted_items()[1], item)
+        with self.assertRaises(TypeError):
+            self._block_type([], _type=int).add_item(item)
+
+    def test_extend(self):
+        self._block.get_items_by_value(10)
+        items = [self._item_type("Lucy", 10), self._item_type("Sam", [1])]
+        self._block.extend(items)
+        self.assertEqual(self._block.get_items_by_value(10), 
+            [self._john_item, items[0]])
+        self.assertEqual(self._block.get_items_by_value([1]), items[1:])
+
+    def test_remove_item(self):
+        self._block.get_items_by_value(30)
+        self._block.get_sorted_items()
+        self._block.remove_item(self._marry_item)
+        self.assertEqual(self._block.get_items_by_value(30), 
+            [self._ben_item])
+        self.assertNotIn(self._marry_item, self._block.get_sorted_items())
+        self.assertEqual(len(self._block), 3)
+        with self.assertRaises(ValueError):
+            self._block.remove_item(self._marry_item)
+
+    def test_remove_items_by_value(self):
+        self._block.get_sorted_items()
+        items = self._block.remove_items_by_value(30)
+        self.assertEqual(items, [self._marry_item, self._ben_item])
+        self.assertEqual(self._block.get_items(), 
+            [self._john_item, self._ricky_item])
+        self.assertEqual(self._block.get_items_by_value(30), [])
+        self.assertEqual(self._block.get_sorted_items(), 
+            [self._john_item, self._ricky_item])
+
+    def test_remove_uncomparable_value(self):
+        _item = self._item_type("Lucy", None)
+        block = self._block_type([_item])
+        block.min_item()
+        block.remove_item(_item)
+        self.assertEqual(list(block), [])
+        self.assertEqual(len(block), 0)
+        block.add_item(_item)
+        block.min_item()
+        self.assertEqual(block.remove_items_by_value(None), [_item])
+        self.assertEqual(list(block), [])
+
+    def test_type_index(self):
+        items = [self._item_type(5, 1), self._item_type(True, 2), 
+            self._item_type(2.5, 3)]
+        self._block.extend(items[:2])
+        self.assertEqual(self._block.get_items_by_type(int), items[:2])
+        self.assertIsNotNone(self._block._type_index)
+        self._block.extend(items[2:])
+        self.assertEqual(self._block.get_items_by_type(numbers.Number), 
+            items)
+        self.assertEqual(self._block.get_items_by_type((bool, float)), 
+            items[1:])
+        self.assertEqual(self._block.get_item_by_type(float), items[2])
+        self._block.remove_item(items[0])
+        self.assertEqual(self._block.get_items_by_type(int), items[1:2])
+        self._block.remove_items_by_value(30)
+        self.assertEqual(self._block.get_items_by_type(str), 
+            [self._john_item, self._ricky_item])
+        self.assertIsNone(self._block.get_item_by_type(list))
+        self.assertEqual(len(self._block.get_items_by_type(object)), 4)
+
+    def test_query_type_index(self):
+        self._block.extend([self._item_type(5, 30)])
+        condition = _query.value_in([30]) & _query.of_type(int)
+        self.assertEqual(self._block.query(condition)[0].get_object(), 5)
+        self.assertIsNone(self._block._type_index)
+        self._block.get_item_by_type(int)
+        self.assertEqual(self._block.query(condition)[0].get_object(), 5)
+
+    def test_clear(self):
+        self._block.clear()
+        self.assertEqual(len(self._block), 0)
+        self.assertEqual(self._block.get_items_by_value(10), [])
+
     def test_get_items_by_type(self):
         items = self._block.get_items_by_type(str)
         self.assertEqual(items, self._items)
 
+    def test_get_items_by_abstract_type(self):
+        class Registered(abc.ABC):
+            pass
+        self._block.get_items_by_type(str)
+        self.assertEqual(self._block.get_items_by_type(_HasUpper), 
+            self._items)
+        self.assertEqual(self._block.get_items_by_type(Registered), [])
+        Registered.register(str)
+        self.assertEqual(self._block.get_items_by_type(Registered), 
+            self._items)
+        self.assertEqual(self._block.get_item_by_type((int, Registered)), 
+            self._marry_item)
+
     def test_get_item_by_type(self):
         item = self._block.get_item_by_type(str)
         self.assertEqual(item, self._items[0])
@@ -105,5 +540,51 @@ class TestBlock(TestBaseBlock):
             self.assertTrue(set(objects).issubset(self._objects))
 
 
+class TestCompactBlock(TestBlock):
+    _item_type = _items.CompactItem
+
+
+class TestDeepBlock(TestBlock):
+    _block_type = _block.DeepBlock
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._nested_block = _block.Block(self._items)
+        self._nested_item = self._item_type("Nested", self._nested_block)
+
+    def test_extract_deep_items(self):
+        block = self._block_type([self._nested_item])
+        self.assertEqual(block.get_items(), self._items)
+
+    def test_shared_block(self):
+        block = self._block_type([self._nested_item, self._nested_item])
+        self.assertEqual(block.get_items(), self._items + self._items)
+
+    def test_max_depth(self):
+        item = self._item_type("Top", _block.Block([self._nested_item]))
+        block = self._block_type([item], max_depth=1)
+        self.assertEqual(block.get_items(), [self._nested_item])
+        block = self._block_type([item], max_depth=2)
+        self.assertEqual(block.get_items(), self._items)
+
+    def test_deep_nesting(self):
+        item = self._john_item
+        for _ in range(5000):
+            item = self._item_type("Level", _block.Block([item]))
+        block = self._block_type([item])
+        self.assertEqual(block.get_items(), [self._john_item])
+
+    def test_add_nested_item(self):
+        block = self._block_type([self._john_item])
+        block.add_item(self._nested_item)
+        self.assertEqual(block.get_items(), [self._john_item] + self._items)
+
+    def test_cyclic_nesting(self):
+        item = self._item_type("Cycle", 1)
+        item.set_value(_block.Block([item]))
+        with self.assertRaises(ValueError):
+            self._block_type([item])
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,77 @@
+import unittest
+
+from pemap import block as _block
+from pemap import cache as _cache
+from pemap import items as _items
+
+
+class TestValueCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self._calls = 0
+        self._items = [_items.Item(name, self._value_func) 
+            for name in ("Marry", "John", "Ricky")]
+        self._cache = _cache.ValueCache()
+
+    def _value_func(self):
+        self._calls += 1
+        return self._calls
+
+    def test_get_value(self):
+        self.assertEqual(self._cache.get_value(self._items[0]), 1)
+        self.assertEqual(self._cache.get_value(self._items[0]), 1)
+        self.assertIn(self._items[0], self._cache)
+
+    def test_static_value(self):
+        item = _items.Item("Ben", 10)
+        self.assertEqual(self._cache.get_value(item), 10)
+        self.assertNotIn(item, self._cache)
+
+    def test_invalidate(self):
+        self._cache.get_value(self._items[0])
+        self._cache.get_value(self._items[1])
+        self._cache.invalidate(self._items[:1])
+        self.assertNotIn(self._items[0], self._cache)
+        self.assertIn(self._items[1], self._cache)
+        self._cache.invalidate()
+        self.assertEqual(len(self._cache), 0)
+
+    def test_maxsize(self):
+        value_cache = _cache.ValueCache(maxsize=2)
+        for item in self._items:
+            value_cache.get_value(item)
+        self.assertEqual(len(value_cache), 2)
+        self.assertNotIn(self._items[0], value_cache)
+
+    def test_ttl(self):
+        value_cache = _cache.ValueCache(ttl=0)
+        value_cache.get_value(self._items[0])
+        self.assertEqual(value_cache.get_value(self._items[0]), 2)
+
+    def test_block_value_cache(self):
+        block = _block.Block(self._items, value_cache=True)
+        self.assertEqual(block.get_values(), [1, 2, 3])
+        self.assertEqual(block.get_values(), [1, 2, 3])
+        self.assertEqual(block.get_items_by_value(2), self._items[1:2])
+        block.invalidate_values()
+        self.assertEqual(block.get_values(), [4, 5, 6])
+
+    def test_remove_items(self):
+        block = _block.Block(self._items, value_cache=True)
+        block.get_values()
+        value_cache = block.get_value_cache()
+        block.remove_item(self._items[0])
+        self.assertNotIn(self._items[0], value_cache)
+        block.remove_items_by_value(2)
+        self.assertEqual(len(value_cache), 1)
+        block.clear()
+        self.assertEqual(len(value_cache), 0)
+
+    def test_materialize_values(self):
+        block = _block.Block(self._items).materialize_values()
+        self.assertEqual(block.get_values(), [1, 2, 3])
+        self.assertEqual(block.get_values(), [1, 2, 3])
+        self.assertEqual(block.get_objects(), ["Marry", "John", "Ricky"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from pemap import columnar as _columnar
+from pemap import items as _items
+
+from tests import test_block
+
+
+@unittest.skipIf(_columnar.numpy is None, "NumPy is not installed")
+class TestColumnarBlock(test_block.TestBlock):
+    _block_type = _columnar.ColumnarBlock
+
+    def test_get_values_types(self):
+        block = self._block_type([_items.Item("Marry", True), 
+            _items.Item("John", 2.5)])
+        self.assertIs(block.get_values()[0], True)
+
+    def test_get_true_items(self):
+        block = self._block_type([_items.Item("Marry", 0), 
+            _items.Item("John", 2.5), _items.Item("Ben", False)])
+        self.assertEqual(block.get_objects(), ["Marry", "John", "Ben"])
+        items = block.get_true_items()
+        self.assertEqual(block.extract_objects_from_items(items), ["John"])
+        items = block.get_false_items()
+        self.assertEqual(block.extract_objects_from_items(items), 
+            ["Marry", "Ben"])
+        self.assertEqual(block.get_false_item().get_object(), "Marry")
+
+    def test_non_numeric_values(self):
+        block = self._block_type([_items.Item("Marry", "a"), 
+            _items.Item("John", 1)])
+        self.assertEqual(block.get_items_by_value("a"), 
+            block.get_items()[:1])
+        self.assertEqual(block.get_items_by_values([1]), 
+            block.get_items()[1:])
+
+    def test_large_int_values(self):
+        large = 2 ** 53
+        block = self._block_type([_items.Item("Marry", large + 1), 
+            _items.Item("John", .5), _items.Item("Ben", large)])
+        items = block.get_items_by_value(large + 1)
+        self.assertEqual(block.extract_objects_from_items(items), ["Marry"])
+        items = block.get_items_in_range(large, large)
+        self.assertEqual(block.extract_objects_from_items(items), ["Ben"])
+        # Floats compare with integers array as floats.
+        block = self._block_type([_items.Item("Marry", large + 1), 
+            _items.Item("John", 1)])
+        self.assertEqual(block.get_items_by_values([float(large)]), [])
+        self.assertEqual(len(block.get_items_by_value(large + 1)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import asyncio
+import tempfile
+import unittest
+
+import pemap
+from pemap import asynchronous as _asynchronous
+from pemap import block as _block
+from pemap import columnar as _columnar
+from pemap import instrumentation as _instrumentation
+from pemap import items as _items
+from pemap import mapped as _mapped
+from pemap import query as _query
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self) -> None:
+        self._items = [_items.Item("Marry", 30), _items.Item("John", 10),
+            _items.Item("Ricky", lambda: 40)]
+
+    def tearDown(self) -> None:
+        _instrumentation.disable()
+
+    def test_disabled(self):
+        get_items = _block.Block.get_items_by_value
+        with _instrumentation.instrumented():
+            self.assertTrue(_instrumentation.is_enabled())
+            self.assertIsNot(_block.Block.get_items_by_value, get_items)
+        self.assertFalse(_instrumentation.is_enabled())
+        self.assertIs(_block.Block.get_items_by_value, get_items)
+        self.assertIs(pemap.find_true_items, 
+            pemap.highlevel.find_true_items)
+        _block.Block(self._items).get_values()
+        self.assertEqual(_instrumentation.get_counters(), {})
+
+    def test_count_values(self):
+        with _instrumentation.instrumented(timing=False):
+            block = _block.Block(self._items)
+            block.get_values()
+            block.copy_items()
+        counters = _instrumentation.get_counters()
+        self.assertEqual(counters["value_evaluations"], 3)
+        self.assertEqual(counters["dynamic_value_evaluations"], 1)
+        self.assertEqual(counters["item_copies"], 3)
+        self.assertNotIn("item_constructions", counters)
+
+    def test_count_scans(self):
+        with _instrumentation.instrumented(timing=False):
+            block = _block.Block(self._items)
+            # Values that are functions prevent index being built.
+            block.get_items_by_value(10)
+            block = _block.Block(self._items[:2])
+            block.get_items_by_value(10)
+            block.get_items_by_value(30)
+        counters = _instrumentation.get_counters()
+        self.assertEqual(counters["full_scans"], 1)
+        self.assertEqual(counters["index_hits"], 2)
+        self.assertEqual(counters["index_builds"], 2)
+
+    def test_count_block_scans(self):
+        items = self._items[:2]
+        with tempfile.TemporaryDirectory() as path, \
+            _instrumentation.instrumented(timing=False):
+            _block.Block(items, indexed=False).get_item_by_type(int)
+            with _mapped.MMapBlock.create(path, items) as block:
+                block.get_items_by_value(10)
+                block.get_item_by_value(10)
+        counters = _instrumentation.get_counters()
+        self.assertEqual(counters["full_scans"], 1)
+        self.assertEqual(counters["early_exit_scans"], 2)
+
+    @unittest.skipIf(_columnar.numpy is None, "NumPy is not installed")
+    def test_count_columnar_scans(self):
+        with _instrumentation.instrumented(timing=False):
+            _columnar.ColumnarBlock(self._items[:2]).get_true_items()
+        counters = _instrumentation.get_counters()
+        self.assertEqual(counters["full_scans"], 1)
+
+    def test_count_query_scans(self):
+        block = _block.Block(self._items[:2], indexed=False)
+        condition = _query.truthy() & _query.of_type(str)
+        with _instrumentation.instrumented(timing=False):
+            block.query(condition)
+            block.query_first(condition)
+        counters = _instrumentation.get_counters()
+        self.assertEqual(counters["full_scans"], 1)
+        self.assertEqual(counters["early_exit_scans"], 1)
+        block = _block.Block(self._items[:2])
+        block.get_item_by_value(10)
+        with _instrumentation.instrumented(timing=False):
+            block.query(_query.value_in([10]))
+        counters = _instrumentation.get_counters()
+        self.assertEqual(counters["index_hits"], 1)
+        self.assertNotIn("full_scans", counters)
+        self.assertNotIn("index_builds", counters)
+
+    def test_count_type_index(self):
+        block = _block.Block(self._items[:2])
+        with _instrumentation.instrumented(timing=False):
+            block.get_items_by_type(str)
+            block.get_item_by_type(int)
+        counters = _instrumentation.get_counters()
+        self.assertEqual(counters["index_builds"], 1)
+        self.assertEqual(counters["index_hits"], 2)
+        self.assertNotIn("full_scans", counters)
+
+    def test_flatten_depth(self):
+        nested_block = _block.Block(self._items)
+        item = _items.Item("Ben", _block.Block([_items.Item("Ken", 
+            nested_block)], strict=False))
+        with _instrumentation.instrumented(timing=False):
+            block = _block.DeepBlock([item])
+        self.assertEqual(len(block), 3)
+        counters = _instrumentation.get_counters()
+        self.assertEqual(counters["flatten_depth"], 2)
+        self.assertEqual(counters["flattens"], 1)
+
+    def test_timings(self):
+        calls = []
+        _instrumentation.add_hook(lambda name, seconds: calls.append(name))
+        try:
+            with _instrumentation.instrumented(counting=False):
+                pemap.find_true_items(self._items)
+                _block.Block.from_columns([1], ["Marry"])
+        finally:
+            _instrumentation._hooks.clear()
+        timings = _instrumentation.get_timings()
+        self.assertEqual(timings["highlevel.find_true_items"][0], 1)
+        self.assertEqual(timings["Block.from_columns"][0], 1)
+        self.assertIn("highlevel.iter_true_items", calls)
+
+    def test_async_timings(self):
+        block = _asynchronous.AsyncBlock(self._items)
+        with _instrumentation.instrumented(counting=False):
+            values = asyncio.run(block.aget_values())
+        self.assertEqual(values, [30, 10, 40])
+        timings = _instrumentation.get_timings()
+        self.assertEqual(timings["AsyncBlock.aget_values"][0], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,19 @@
 import unittest
 
 from pemap import items as _items
+from pemap import reference as _reference
 
 
 class TestItem(unittest.TestCase):
+    _item_type = _items.Item
+
     def setUp(self) -> None:
         self.object = "age"
         self._value = 12
         self._value_callable = lambda: self._value
-        self._item = _items.Item(self.object, self._value)
-        self._item_callable = _items.Item(self.object, self._value_callable)
+        self._item = self._item_type(self.object, self._value)
+        self._item_callable = self._item_type(self.object, 
+            self._value_callable)
     
     def test_get_value(self):
         self.assertEqual(self._item.get_value(), self._value)
@@ -22,6 +26,117 @@ class TestItem(unittest.TestCase):
     def test_get_object(self):
         self.assertEqual(self._item.get_object(), self.object)
 
+    def test_copy(self):
+        item = self._item.copy()
+        self.assertEqual(item.get_object(), self.object)
+        item.set_value(20)
+        self.assertEqual(item.get_value(), 20)
+        self.assertEqual(self._item.get_value(), self._value)
+
+    def test_copy_on_write(self):
+        item = self._item.copy()
+        self.assertIs(item.get_object(), self._item.get_object())
+        item.set_object("height")
+        self.assertEqual(item.get_object(), "height")
+        self.assertEqual(self._item.get_object(), self.object)
+        with self.assertRaises(TypeError):
+            self._item_type(self.object, 1, _type=str).set_object(1)
+
+    def test_deep_copy(self):
+        _object, value = ["age"], [12]
+        item = self._item_type(_object, value)
+        deep_item = item.copy(deep=True)
+        self.assertEqual(deep_item.get_object(), _object)
+        self.assertIsNot(deep_item.get_object(), _object)
+        self.assertIsNot(deep_item.get_value(), value)
+        item = self._item_callable.copy(deep=True)
+        self.assertEqual(item.get_value(), self._value)
+        item = self._item_type(_reference.Reference(_object), value,
+            strict=True)
+        deep_item = item.copy(deep=True)
+        self.assertEqual(deep_item.get_object(), _object)
+        self.assertIsNot(deep_item.get_object(), _object)
+
+
+class _AttrValue():
+    def __init__(self, value):
+        self.value = value
+
+
+class _MethodValue():
+    def get_value(self):
+        return 5
+
+
+class _SlotsValue():
+    __slots__ = ("value",)
+
+
+class TestResolveValue(unittest.TestCase):
+    def test_instance_attribute(self):
+        self.assertEqual(_items.Item(_AttrValue(3)).get_value(), 3)
+        self.assertEqual(_items.Item(_AttrValue(4)).get_value(), 4)
+
+    def test_method(self):
+        self.assertEqual(_items.Item(_MethodValue()).get_value(), 5)
+        _object = _MethodValue()
+        _object.value = 6
+        self.assertEqual(_items.Item(_object).get_value(), 6)
+
+    def test_instance_method(self):
+        _object = _AttrValue.__new__(_AttrValue)
+        _object.get_value = lambda: 5
+        self.assertEqual(_items.Item(_object).get_value(), 5)
+        _object.value = 6
+        self.assertEqual(_items.Item(_object).get_value(), 6)
+
+    def test_slots(self):
+        _object = _SlotsValue()
+        with self.assertRaises(AttributeError):
+            _items.Item(_object)
+        _object.value = 7
+        self.assertEqual(_items.Item(_object).get_value(), 7)
+
+    def test_missing(self):
+        with self.assertRaises(AttributeError):
+            _items.Item("age")
+        with self.assertRaises(AttributeError):
+            _items.Item(_AttrValue.__new__(_AttrValue))
+
+
+class TestCachedItem(TestItem):
+    _item_type = _items.CachedItem
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._calls = 0
+
+    def _value_func(self):
+        self._calls += 1
+        return self._calls
+
+    def test_cached_value(self):
+        item = self._item_type(self.object, self._value_func)
+        self.assertEqual(item.get_value(), 1)
+        self.assertEqual(item.get_value(), 1)
+        item.invalidate_value()
+        self.assertEqual(item.get_value(), 2)
+
+    def test_cached_value_ttl(self):
+        item = self._item_type(self.object, self._value_func, ttl=0)
+        self.assertEqual(item.get_value(), 1)
+        self.assertEqual(item.get_value(), 2)
+        item.set_value(self._value_func)
+        self.assertEqual(item.get_value(), 3)
+        self.assertEqual(item.get_value(), 4)
+
+
+class TestCompactItem(TestItem):
+    _item_type = _items.CompactItem
+
+    def test_no_dict(self):
+        self.assertFalse(hasattr(self._item, "__dict__"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+
+import pemap
+from pemap import items as _items
+from pemap import mapped as _mapped
+
+
+class TestMMapBlock(unittest.TestCase):
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = self._directory.name
+        self._items = [_items.Item("Marry", 30), _items.Item("John", 10),
+            _items.Item("Ricky", 40), _items.Item("Ben", 30),
+            _items.Item("Lucy", 0)]
+        self._block = _mapped.MMapBlock.create(self._path, self._items)
+
+    def tearDown(self) -> None:
+        self._block.close()
+        self._directory.cleanup()
+
+    def _get_objects(self, items):
+        return self._block.extract_objects_from_items(items)
+
+    def test_create(self):
+        self.assertEqual(len(self._block), 5)
+        self.assertEqual(self._block.get_values(), [30, 10, 40, 30, 0])
+        self.assertEqual(self._block.get_objects(),
+            ["Marry", "John", "Ricky", "Ben", "Lucy"])
+        self.assertEqual(self._block.to_tuple()[1], (10, "John"))
+
+    def test_get_items_by_value(self):
+        items = self._block.get_items_by_value(30)
+        self.assertEqual(self._get_objects(items), ["Marry", "Ben"])
+        items = self._block.get_items_by_values([10, 40])
+        self.assertEqual(self._get_objects(items), ["John", "Ricky"])
+        self.assertEqual(self._block.get_item_by_value(40).get_object(),
+            "Ricky")
+        self.assertIsNone(self._block.get_item_by_value(50))
+
+    def test_get_true_items(self):
+        items = self._block.get_false_items()
+        self.assertEqual(self._get_objects(items), ["Lucy"])
+        self.assertEqual(len(self._block.get_true_items()), 4)
+        self.assertEqual(self._block.get_true_item().get_object(), "Marry")
+
+    def test_range_queries(self):
+        items = self._block.get_items_in_range(10, 30)
+        self.assertEqual(self._get_objects(items), ["John", "Marry", "Ben"])
+        items = self._block.get_items_below(10)
+        self.assertEqual(self._get_objects(items), ["Lucy"])
+        items = self._block.get_items_above(30)
+        self.assertEqual(self._get_objects(items), ["Ricky"])
+        self.assertEqual(self._block.min_item().get_object(), "Lucy")
+        self.assertEqual(self._block.max_item().get_object(), "Ricky")
+
+    def test_sorting(self):
+        items = self._block.top_k(2)
+        self.assertEqual(self._get_objects(items), ["Ricky", "Marry"])
+        items = self._block.get_sorted_items()
+        self.assertEqual(self._get_objects(items)[:2], ["Lucy", "John"])
+
+    def test_chunks(self):
+        _mapped._chunksize, chunksize = 2, _mapped._chunksize
+        try:
+            path = os.path.join(self._path, "chunks")
+            with _mapped.MMapBlock.create(path, self._items) as block:
+                self.assertEqual(block.get_values(), self._block.get_values())
+                self.assertEqual(block.get_items()[-1].get_object(), "Lucy")
+        finally:
+            _mapped._chunksize = chunksize
+
+    def test_float_values(self):
+        path = os.path.join(self._path, "floats")
+        items = [_items.Item("Marry", 1.5), _items.Item("John", 2)]
+        with _mapped.MMapBlock.create(path, items) as block:
+            self.assertEqual(block.get_values(), [1.5, 2.0])
+        with _mapped.MMapBlock.create(path, []) as block:
+            self.assertEqual(len(block), 0)
+            self.assertIsNone(block.min_item())
+
+    def test_invalid_values(self):
+        path = os.path.join(self._path, "strings")
+        with self.assertRaises(TypeError):
+            _mapped.MMapBlock.create(path, [_items.Item("Marry", "a")])
+
+    def test_highlevel(self):
+        self.assertEqual(pemap.find_true_item(self._block).get_object(), 
+            "Marry")
+        items = pemap.find_items_by_values(self._block, [10, 30])
+        self.assertEqual(self._get_objects(items), ["Marry", "John", "Ben"])
+        groups = pemap.group_items(self._block)
+        self.assertEqual(self._get_objects(groups[30]), ["Marry", "Ben"])
+        self.assertEqual(pemap.extract_objects(self._block)[0], "Marry")
+
+    def test_bool_values(self):
+        path = os.path.join(self._path, "bools")
+        items = [_items.Item("Marry", True), _items.Item("John", False)]
+        with _mapped.MMapBlock.create(path, items) as block:
+            self.assertEqual(block.get_values(), [True, False])
+            self.assertEqual(block.get_true_item().get_object(), "Marry")
+            self.assertEqual(self._get_objects(block.get_false_items()), 
+                ["John"])
+
+    def test_mixed_values(self):
+        path = os.path.join(self._path, "mixed")
+        items = [_items.Item("Marry", 1), _items.Item("John", 2.5)]
+        with self.assertRaisesRegex(TypeError, "position 1"):
+            _mapped.MMapBlock.create(path, items)
+        # Files written before error are removed.
+        self.assertEqual(os.listdir(path), [])
+        with _mapped.MMapBlock.create(path, items, typecode="d") as block:
+            self.assertEqual(block.get_values(), [1.0, 2.5])
+        with self.assertRaises(TypeError):
+            _mapped.MMapBlock.create(path, [_items.Item("Ben", 2 ** 64)])
+
+
+if __name__ == "__main__":
+    unittest.main()
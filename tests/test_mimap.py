@@ -1,7 +1,13 @@
+import typing
 import unittest
 import pemap
 
 
+@typing.runtime_checkable
+class _HasUpper(typing.Protocol):
+    upper: object
+
+
 class BaseTest(unittest.TestCase):
     def setUp(self) -> None:
         marry_item = pemap.create_item("Marry", 30)
@@ -10,4 +16,86 @@ class BaseTest(unittest.TestCase):
 
         # List of items to use with block
         items = [marry_item, john_item, ricky_item]
-        items_block = pemap.create_block(items)
\ No newline at end of file
+        items_block = pemap.create_block(items)
+
+class TestIterItems(unittest.TestCase):
+    def setUp(self) -> None:
+        self._marry_item = pemap.create_item("Marry", 0)
+        self._john_item = pemap.create_item("John", 10)
+        self._ricky_item = pemap.create_item("Ricky", 40)
+        self._items = [self._marry_item, self._john_item, self._ricky_item]
+
+    def _iter_forever(self):
+        # Yields items without end after items of test.
+        yield from self._items
+        while True:
+            yield pemap.create_item("Ben", 1)
+
+    def test_find_item_by_values(self):
+        item = pemap.find_item_by_values(self._iter_forever(), [40])
+        self.assertEqual(item, self._ricky_item)
+        self.assertIsNone(pemap.find_item_by_values(self._items, [5]))
+
+    def test_find_true_item(self):
+        item = pemap.find_true_item(self._iter_forever())
+        self.assertEqual(item, self._john_item)
+        block = pemap.create_block(self._items)
+        self.assertEqual(pemap.find_true_item(block), self._john_item)
+
+    def test_find_items_by_type(self):
+        items = pemap.find_items_by_type(self._items, str)
+        self.assertEqual(items, self._items)
+        items = pemap.find_items_by_type(self._items, _HasUpper)
+        self.assertEqual(items, self._items)
+
+    def test_find_top_items(self):
+        objects = (pemap.create_item(name, value) for name, value in 
+            [("Ben", 1), ("Lucy", 50), ("Ken", 20)])
+        items = pemap.find_top_items(objects, 2)
+        self.assertEqual(pemap.extract_objects(items), ["Lucy", "Ken"])
+        block = pemap.create_block(self._items)
+        items = pemap.find_top_items(block, 1, largest=False)
+        self.assertEqual(items, [self._marry_item])
+
+    def test_group_items(self):
+        items = (pemap.create_item(name, len(name)) 
+            for name in ["Ben", "Lucy", "Ken"])
+        groups = pemap.group_items(items)
+        self.assertEqual(pemap.extract_objects(groups[3]), ["Ben", "Ken"])
+        results = pemap.aggregate_items(self._items, key="object", 
+            aggregations=["sum"])
+        self.assertEqual(results["John"], {"sum": 10})
+
+    def test_find_items_by_query(self):
+        condition = pemap.value_between(5) & pemap.of_type(str)
+        item = pemap.find_item_by_query(self._iter_forever(), condition)
+        self.assertEqual(item, self._john_item)
+        items = pemap.find_items_by_query(self._iter_forever(), 
+            pemap.truthy(), limit=3)
+        self.assertEqual(pemap.extract_objects(items), 
+            ["John", "Ricky", "Ben"])
+        items = [pemap.create_item("Sam", [1]), self._john_item]
+        self.assertEqual(pemap.find_items_by_query(items, 
+            pemap.value_in([10])), [self._john_item])
+        block = pemap.create_block(self._items)
+        items = pemap.find_items_by_query(block, pemap.falsy())
+        self.assertEqual(items, [self._marry_item])
+
+    def test_iter_false_items(self):
+        items = list(pemap.iter_false_items(self._items))
+        self.assertEqual(items, [self._marry_item])
+
+    def test_iter_items_flatten(self):
+        block = pemap.create_block(self._items)
+        items = [pemap.create_item("Ben", 1), pemap.create_item("x", block)]
+        objects = pemap.extract_objects(pemap.iter_items(items, True))
+        self.assertEqual(objects, ["Ben", "Marry", "John", "Ricky"])
+
+
+class TestPackage(unittest.TestCase):
+    def test_lazy_blocks(self):
+        from pemap import asynchronous
+        self.assertIs(pemap.AsyncBlock, asynchronous.AsyncBlock)
+        self.assertTrue(issubclass(pemap.PartitionedBlock, pemap.Block))
+        with self.assertRaises(AttributeError):
+            pemap.UnknownBlock
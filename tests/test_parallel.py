@@ -0,0 +1,55 @@
+import concurrent.futures
+import unittest
+
+from pemap import block as _block
+from pemap import items as _items
+from pemap import parallel as _parallel
+
+
+def _ten():
+    return 10
+
+def _fail():
+    raise RuntimeError("failed")
+
+
+class TestEvaluateValues(unittest.TestCase):
+    def setUp(self) -> None:
+        self._items = [_items.Item("Marry", _ten), _items.Item("John", 5),
+            _items.Item("Ricky", lambda: 20)]
+        self._executor = concurrent.futures.ThreadPoolExecutor(2)
+
+    def tearDown(self) -> None:
+        self._executor.shutdown()
+
+    def test_evaluate_values(self):
+        values = _parallel.evaluate_values(self._items, self._executor, 1)
+        self.assertEqual(values, [10, 5, 20])
+        self.assertEqual(_parallel.evaluate_values(self._items), [10, 5, 20])
+
+    def test_evaluate_values_errors(self):
+        items = self._items + [_items.Item("Ben", _fail)]
+        with self.assertRaises(_parallel.ValueEvaluationError) as context:
+            _parallel.evaluate_values(items, self._executor)
+        position, item, error = context.exception.errors[0]
+        self.assertEqual((position, item), (3, items[3]))
+        self.assertIsInstance(error, RuntimeError)
+        self.assertEqual(context.exception.values, [10, 5, 20, None])
+
+    def test_block_executor(self):
+        block = _block.Block(self._items, value_cache=True)
+        block.set_executor(self._executor)
+        self.assertEqual(block.get_values(), [10, 5, 20])
+        self.assertEqual(block.to_tuple()[0], (10, "Marry"))
+        self.assertEqual(block.get_objects(value_sort=True), 
+            ["John", "Marry", "Ricky"])
+
+    def test_process_executor(self):
+        items = [_items.Item("Marry", _ten), _items.Item("John", 5)]
+        with concurrent.futures.ProcessPoolExecutor(1) as executor:
+            values = _parallel.evaluate_values(items, executor)
+        self.assertEqual(values, [10, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import concurrent.futures
+import unittest
+
+from pemap import items as _items
+from pemap import partitioned as _partitioned
+
+
+class TestPartitionedBlock(unittest.TestCase):
+    def setUp(self) -> None:
+        self._executor = concurrent.futures.ThreadPoolExecutor(2)
+        self._items = [_items.Item("Marry", 30), _items.Item("John", 10),
+            _items.Item("Ricky", 40), _items.Item("Ben", 30),
+            _items.Item(5, 0), _items.Item(6.5, 30)]
+        self._block = _partitioned.PartitionedBlock(self._items,
+            partitions=4, min_size=0)
+        self._block.set_executor(self._executor)
+
+    def tearDown(self) -> None:
+        self._block.release_columns()
+        self._executor.shutdown()
+
+    def _get_objects(self, items):
+        return self._block.extract_objects_from_items(items)
+
+    def test_get_items_by_value(self):
+        items = self._block.get_items_by_value(30)
+        self.assertEqual(self._get_objects(items), ["Marry", "Ben", 6.5])
+        self.assertIsNotNone(self._block._value_column)
+        items = self._block.get_items_by_values([10, 0])
+        self.assertEqual(self._get_objects(items), ["John", 5])
+        self.assertEqual(self._block.get_items_by_value("30"), [])
+
+    def test_get_true_items(self):
+        items = self._block.get_true_items()
+        self.assertEqual(self._get_objects(items), 
+            ["Marry", "John", "Ricky", "Ben", 6.5])
+        self.assertEqual(self._get_objects(self._block.get_false_items()), 
+            [5])
+
+    def test_get_items_by_type(self):
+        items = self._block.get_items_by_type(str)
+        self.assertEqual(self._get_objects(items), 
+            ["Marry", "John", "Ricky", "Ben"])
+        items = self._block.get_items_by_type((int, float))
+        self.assertEqual(self._get_objects(items), [5, 6.5])
+
+    def test_aggregate(self):
+        results = self._block.aggregate(
+            aggregations=("count", "sum", "first", "last"))
+        self.assertEqual(results[30], 
+            {"count": 3, "sum": 90, "first": "Marry", "last": 6.5})
+        self.assertEqual(list(results), [30, 10, 40, 0])
+
+    def test_items_changed(self):
+        self._block.get_items_by_value(30)
+        self._block.add_item(_items.Item("Lucy", 30))
+        self.assertIsNone(self._block._value_column)
+        items = self._block.get_items_by_value(30)
+        self.assertEqual(self._get_objects(items), 
+            ["Marry", "Ben", 6.5, "Lucy"])
+
+    def test_fallback(self):
+        # Values that are not numbers are not put into shared memory.
+        block = _partitioned.PartitionedBlock(
+            [_items.Item("A", "a"), _items.Item("B", "b")], min_size=0)
+        block.set_executor(self._executor)
+        self.assertEqual(block.get_items_by_value("b")[0].get_object(), 
+            "B")
+        self.assertIsNone(block._value_column)
+        block.release_columns()
+        # Small blocks do not use shared memory.
+        block = _partitioned.PartitionedBlock(self._items, min_size=10)
+        block.set_executor(self._executor)
+        self.assertEqual(len(block.get_items_by_value(30)), 3)
+        self.assertFalse(block._columns_built)
+
+    def test_process_executor(self):
+        with concurrent.futures.ProcessPoolExecutor(2) as executor:
+            self._block.set_executor(executor)
+            items = self._block.get_items_by_values([30, 40])
+            self.assertEqual(self._get_objects(items), 
+                ["Marry", "Ricky", "Ben", 6.5])
+            items = self._block.get_items_by_type(float)
+            self.assertEqual(self._get_objects(items), [6.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
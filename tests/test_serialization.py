@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from pemap import block as _block
+from pemap import items as _items
+from pemap import serialization as _serialization
+
+
+class TestSerialization(unittest.TestCase):
+    def setUp(self) -> None:
+        self._items = [_items.Item("Marry", 30), _items.Item("John", 10),
+            _items.CompactItem("Ricky", 40.5), _items.Item("Ben", "a")]
+        self._block = _block.Block(self._items[:3], indexed=False)
+
+    def test_dumps_loads(self):
+        block = _block.Block.loads(self._block.dumps())
+        self.assertEqual(block.to_tuple(), self._block.to_tuple())
+        self.assertIsInstance(block.get_items()[2], _items.CompactItem)
+        self.assertIsInstance(block.get_items()[0], _items.Item)
+        self.assertFalse(block._indexed)
+
+    def test_sorted_index(self):
+        block = _block.Block(self._items[:2])
+        block.get_sorted_items()
+        block = _block.Block.loads(block.dumps())
+        self.assertEqual(block._sorted_index[0], [10, 30])
+        block = _block.Block.loads(_block.Block(self._items).dumps())
+        self.assertIsNone(block._sorted_index)
+
+    def test_out_of_band_buffers(self):
+        block = _block.Block.from_columns(range(100), range(100))
+        buffers = []
+        data = block.dumps(buffer_callback=buffers.append)
+        self.assertEqual(len(buffers), 1)
+        block = _block.Block.loads(data, buffers=buffers)
+        self.assertEqual(block.get_values(), list(range(100)))
+
+    def test_to_column(self):
+        self.assertEqual(_serialization._to_column([1, True])[0], "list")
+        self.assertEqual(_serialization._to_column([2**70])[0], "list")
+        section = _serialization._to_column([1.5, 2.0])
+        self.assertEqual(_serialization._from_column(section), [1.5, 2.0])
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "block.bin")
+            self._block.save(path)
+            block = _block.Block.load(path)
+        self.assertEqual(block.get_objects(), ["Marry", "John", "Ricky"])
+
+    def test_load_deep_block(self):
+        nested_block = _block.Block(self._items[:2])
+        block = _block.DeepBlock([_items.Item("Ben", nested_block)],
+            max_depth=0)
+        block = _block.Block.loads(block.dumps())
+        self.assertIsInstance(block, _block.DeepBlock)
+        self.assertEqual(len(block), 1)
+
+    def test_invalid_data(self):
+        with self.assertRaises(ValueError):
+            _block.Block.loads(b"data")
+        with self.assertRaises(TypeError):
+            _block.DeepBlock.loads(self._block.dumps())
+
+
+if __name__ == "__main__":
+    unittest.main()